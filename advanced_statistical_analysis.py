@@ -5,7 +5,6 @@
 건물 유형별, 조류 종별, 위험도 분석
 """
 
-import sqlite3
 import pandas as pd
 import numpy as np
 import json
@@ -13,28 +12,28 @@ from collections import Counter, defaultdict
 import math
 from datetime import datetime
 
-def advanced_building_analysis(file_path):
+from analytics_cube import load_collision_cube
+from risk_scoring import all_rows, score_facility_risk, score_species_risk
+
+OUTPUT_PATH = '/Users/suntaekim/nie/advanced_analysis_data.json'
+
+def advanced_building_analysis(file_path, cube=None):
     """건물 유형별 상세 사고 분석"""
     print("=" * 60)
     print("🏢 건물 유형별 사고 상세 분석")
     print("=" * 60)
     
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
-    table_name = "조류유리창_충돌사고_2023_2024_전국"
+    if cube is None:
+        cube = load_collision_cube(file_path)
     
     # 1. 시설물 유형별 기본 통계
-    cursor.execute(f"""
-        SELECT 시설물유형명, COUNT(*) as total_accidents,
-               COUNT(DISTINCT 시도명) as affected_regions,
-               COUNT(DISTINCT 한글보통명) as affected_species
-        FROM `{table_name}` 
-        WHERE 시설물유형명 IS NOT NULL AND 시설물유형명 != ''
-        GROUP BY 시설물유형명 
-        ORDER BY total_accidents DESC
-    """)
-    
-    facility_stats = cursor.fetchall()
+    facility_mask = cube.mask('시설물유형명', exclude=[''])
+    region_counts = cube.group_distinct('시설물유형명', '시도명', facility_mask)
+    species_counts = cube.group_distinct('시설물유형명', '한글보통명', facility_mask)
+    facility_stats = [
+        (facility, accidents, region_counts.get(facility, 0), species_counts.get(facility, 0))
+        for facility, accidents in cube.group_count('시설물유형명', facility_mask)
+    ]
     
     print("📊 시설물 유형별 기본 통계:")
     for facility, accidents, regions, species in facility_stats:
@@ -42,124 +41,88 @@ def advanced_building_analysis(file_path):
         print(f"      - 총 사고: {accidents:,}건")
         print(f"      - 영향 지역: {regions}개 시도")
         print(f"      - 영향 조류: {species}종")
-        print(f"      - 전체 대비: {(accidents/15118)*100:.1f}%")
+        print(f"      - 전체 대비: {(accidents/cube.n_rows)*100:.1f}%")
         print()
     
-    # 2. 시설물별 지역 분포
+    # 2. 시설물별 지역 분포 (시설물×시도 한 번에 집계)
     print("🗺️  시설물별 지역 분포 분석:")
+    facility_region = defaultdict(list)
+    for (facility, region), count in cube.group_count(['시설물유형명', '시도명']):
+        facility_region[facility].append((region, count))
+    
     for facility, _, _, _ in facility_stats:
-        cursor.execute(f"""
-            SELECT 시도명, COUNT(*) as count
-            FROM `{table_name}` 
-            WHERE 시설물유형명 = ? AND 시도명 IS NOT NULL
-            GROUP BY 시도명 
-            ORDER BY count DESC 
-            LIMIT 5
-        """, (facility,))
-        
-        region_data = cursor.fetchall()
+        region_data = facility_region[facility][:5]
         print(f"\n   📍 {facility} 상위 5개 지역:")
         for region, count in region_data:
             print(f"      - {region}: {count:,}건")
     
-    # 3. 시설물별 조류 피해 분석
+    # 3. 시설물별 조류 피해 분석 (시설물×종)
     print("\n🐦 시설물별 조류 피해 분석:")
     facility_species_analysis = {}
+    facility_species = defaultdict(list)
+    for (facility, species), count in cube.group_count(['시설물유형명', '한글보통명'],
+                                                       cube.mask('한글보통명', exclude=['동정불가'])):
+        facility_species[facility].append((species, count))
     
     for facility, _, _, _ in facility_stats:
-        cursor.execute(f"""
-            SELECT 한글보통명, COUNT(*) as count
-            FROM `{table_name}` 
-            WHERE 시설물유형명 = ? AND 한글보통명 IS NOT NULL AND 한글보통명 != '동정불가'
-            GROUP BY 한글보통명 
-            ORDER BY count DESC 
-            LIMIT 5
-        """, (facility,))
-        
-        species_data = cursor.fetchall()
+        species_data = facility_species[facility][:5]
         facility_species_analysis[facility] = species_data
         
         print(f"\n   🦅 {facility} 주요 피해 조류:")
         for species, count in species_data:
             print(f"      - {species}: {count:,}건")
     
-    # 4. 시설물별 계절성 분석
+    # 4. 시설물별 계절성 분석 (시설물×계절)
     print("\n📅 시설물별 계절성 분석:")
+    facility_season = defaultdict(list)
+    for (facility, season), count in cube.group_count(['시설물유형명', '계절']):
+        facility_season[facility].append((season, count))
+    
     for facility, _, _, _ in facility_stats[:3]:  # 상위 3개만
-        cursor.execute(f"""
-            SELECT 
-                CASE 
-                    WHEN CAST(strftime('%m', 관찰일자) AS INTEGER) IN (3,4,5) THEN '봄'
-                    WHEN CAST(strftime('%m', 관찰일자) AS INTEGER) IN (6,7,8) THEN '여름'
-                    WHEN CAST(strftime('%m', 관찰일자) AS INTEGER) IN (9,10,11) THEN '가을'
-                    WHEN CAST(strftime('%m', 관찰일자) AS INTEGER) IN (12,1,2) THEN '겨울'
-                    ELSE '미분류'
-                END as season,
-                COUNT(*) as count
-            FROM `{table_name}` 
-            WHERE 시설물유형명 = ? AND 관찰일자 IS NOT NULL
-            GROUP BY season 
-            ORDER BY count DESC
-        """, (facility,))
-        
-        seasonal_data = cursor.fetchall()
+        seasonal_data = facility_season[facility]
         print(f"\n   🌱 {facility} 계절별 사고:")
         for season, count in seasonal_data:
             if season != '미분류':
                 print(f"      - {season}: {count:,}건")
     
-    conn.close()
     return facility_stats, facility_species_analysis
 
-def species_risk_analysis(file_path):
+def species_risk_analysis(file_path, cube=None):
     """조류 종별 충돌 위험도 분석"""
     print("\n" + "=" * 60)
     print("🐦 조류 종별 충돌 위험도 분석")
     print("=" * 60)
     
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
-    table_name = "조류유리창_충돌사고_2023_2024_전국"
-    
-    # 1. 조류 종별 기본 통계
-    cursor.execute(f"""
-        SELECT 한글보통명, 철새유형명, COUNT(*) as accident_count,
-               COUNT(DISTINCT 시도명) as regions,
-               COUNT(DISTINCT 시설물유형명) as facility_types
-        FROM `{table_name}` 
-        WHERE 한글보통명 IS NOT NULL AND 한글보통명 != '' AND 한글보통명 != '동정불가'
-        GROUP BY 한글보통명, 철새유형명
-        ORDER BY accident_count DESC 
-        LIMIT 20
-    """)
+    if cube is None:
+        cube = load_collision_cube(file_path)
     
-    species_stats = cursor.fetchall()
+    # 1. 조류 종별 기본 통계 (종×철새유형 조합마다 영향 지역/시설물 수, 사고건수 상위 20개)
+    # 철새유형이 NULL인 행도 별도 그룹 (SQL GROUP BY와 동일)
+    ranked = score_species_risk(cube, {'전체': all_rows(cube)}, top=20, rank_by='accidents')['전체']
     
     print("📊 조류 종별 위험도 순위 (상위 20종):")
     print(f"{'순위':<4} {'조류명':<15} {'철새유형':<10} {'사고건수':<8} {'영향지역':<6} {'시설물종류':<8} {'위험도점수':<8}")
     print("-" * 70)
     
     species_risk_scores = []
-    for i, (species, migratory_type, accidents, regions, facilities) in enumerate(species_stats, 1):
-        # 위험도 점수 계산: 사고건수 + 지역분포 + 시설물다양성
-        risk_score = accidents + (regions * 10) + (facilities * 5)
+    for row in ranked:
+        # 위험도 점수: 사고건수 + 지역분포 + 시설물다양성 (risk_scoring.SPECIES_RISK_WEIGHTS)
+        species, migratory_type = row['species'], row['migratory_type']
+        accidents, regions, facilities, risk_score = row['accidents'], row['regions'], row['facilities'], row['risk_score']
         species_risk_scores.append((species, migratory_type, accidents, regions, facilities, risk_score))
         
-        print(f"{i:<4} {species:<15} {migratory_type or '미분류':<10} {accidents:<8} {regions:<6} {facilities:<8} {risk_score:<8}")
+        print(f"{row['rank']:<4} {species:<15} {migratory_type or '미분류':<10} {accidents:<8} {regions:<6} {facilities:<8} {risk_score:<8}")
     
     # 2. 철새 유형별 위험도 분석
     print(f"\n🦅 철새 유형별 위험도 분석:")
-    cursor.execute(f"""
-        SELECT 철새유형명, COUNT(*) as total_accidents,
-               COUNT(DISTINCT 한글보통명) as species_count,
-               AVG(CAST(개체수 AS FLOAT)) as avg_individuals
-        FROM `{table_name}` 
-        WHERE 철새유형명 IS NOT NULL AND 철새유형명 != ''
-        GROUP BY 철새유형명 
-        ORDER BY total_accidents DESC
-    """)
-    
-    migratory_stats = cursor.fetchall()
+    migratory_mask = cube.mask('철새유형명', exclude=[''])
+    type_species = cube.group_distinct('철새유형명', '한글보통명', migratory_mask)
+    type_individuals = cube.group_mean('철새유형명', cube.numeric['개체수'], migratory_mask)
+    migratory_stats = [
+        (migratory_type, accidents, type_species.get(migratory_type, 0), type_individuals.get(migratory_type))
+        for migratory_type, accidents in cube.group_count('철새유형명', migratory_mask)
+    ]
+    
     for migratory_type, accidents, species_count, avg_individuals in migratory_stats:
         print(f"   🔸 {migratory_type}:")
         print(f"      - 총 사고: {accidents:,}건")
@@ -167,20 +130,16 @@ def species_risk_analysis(file_path):
         print(f"      - 평균 개체수: {avg_individuals:.1f}마리")
         print(f"      - 종당 평균 사고: {accidents/species_count:.1f}건")
     
-    # 3. 고위험 조류의 시설물별 선호도
+    # 3. 고위험 조류의 시설물별 선호도 (종×시설물 한 번에 집계)
     print(f"\n🎯 고위험 조류의 시설물별 선호도:")
     high_risk_species = [species[0] for species in species_risk_scores[:5]]
+    preferences = defaultdict(list)
+    for (species, facility), count in cube.group_count(['한글보통명', '시설물유형명'],
+                                                       cube.mask('한글보통명', isin=high_risk_species)):
+        preferences[species].append((facility, count))
     
     for species in high_risk_species:
-        cursor.execute(f"""
-            SELECT 시설물유형명, COUNT(*) as count
-            FROM `{table_name}` 
-            WHERE 한글보통명 = ? AND 시설물유형명 IS NOT NULL
-            GROUP BY 시설물유형명 
-            ORDER BY count DESC
-        """, (species,))
-        
-        facility_preference = cursor.fetchall()
+        facility_preference = preferences[species]
         total_accidents = sum(count for _, count in facility_preference)
         
         print(f"\n   🦅 {species} (총 {total_accidents}건):")
@@ -188,30 +147,22 @@ def species_risk_analysis(file_path):
             percentage = (count / total_accidents) * 100
             print(f"      - {facility}: {count}건 ({percentage:.1f}%)")
     
-    conn.close()
     return species_risk_scores, migratory_stats
 
-def building_risk_factor_analysis(file_path):
+def building_risk_factor_analysis(file_path, cube=None):
     """건물 유형별 위험 요소 분석"""
     print("\n" + "=" * 60)
     print("⚠️  건물 유형별 위험 요소 분석")
     print("=" * 60)
     
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
-    table_name = "조류유리창_충돌사고_2023_2024_전국"
+    if cube is None:
+        cube = load_collision_cube(file_path)
     
     # 1. 시설물별 버드세이버 설치 현황
-    cursor.execute(f"""
-        SELECT 시설물유형명, 버드세이버여부,
-               COUNT(*) as count
-        FROM `{table_name}` 
-        WHERE 시설물유형명 IS NOT NULL AND 버드세이버여부 IS NOT NULL
-        GROUP BY 시설물유형명, 버드세이버여부
-        ORDER BY 시설물유형명, count DESC
-    """)
-    
-    bird_saver_stats = cursor.fetchall()
+    bird_saver_stats = sorted(
+        ((facility, bird_saver, count)
+         for (facility, bird_saver), count in cube.group_count(['시설물유형명', '버드세이버여부'])),
+        key=lambda row: row[0])
     
     print("🛡️  시설물별 버드세이버 설치 현황:")
     facility_bird_saver = defaultdict(dict)
@@ -228,18 +179,9 @@ def building_risk_factor_analysis(file_path):
     
     # 2. 서식지 유형별 위험도 분석
     print(f"\n🌳 서식지 유형별 위험도 분석:")
-    cursor.execute(f"""
-        SELECT 서식지유형명, 시설물유형명, COUNT(*) as count
-        FROM `{table_name}` 
-        WHERE 서식지유형명 IS NOT NULL AND 시설물유형명 IS NOT NULL
-        GROUP BY 서식지유형명, 시설물유형명
-        ORDER BY 서식지유형명, count DESC
-    """)
-    
-    habitat_facility_stats = cursor.fetchall()
     habitat_analysis = defaultdict(list)
-    
-    for habitat, facility, count in habitat_facility_stats:
+    for (habitat, facility), count in sorted(cube.group_count(['서식지유형명', '시설물유형명']),
+                                             key=lambda row: row[0][0]):
         habitat_analysis[habitat].append((facility, count))
     
     for habitat, facilities in habitat_analysis.items():
@@ -249,56 +191,22 @@ def building_risk_factor_analysis(file_path):
             percentage = (count / total) * 100
             print(f"      - {facility}: {count:,}건 ({percentage:.1f}%)")
     
-    # 3. 위험도 지수 계산
+    # 3. 위험도 지수 계산 (시설물별 지표를 한 번에 계산)
     print(f"\n📊 시설물별 종합 위험도 지수:")
     
-    risk_factors = {}
-    for facility, _, _, _ in [(f, 0, 0, 0) for f in ['방음벽', '건물', '기타']]:
-        # 사고 빈도
-        cursor.execute(f"""
-            SELECT COUNT(*) FROM `{table_name}` 
-            WHERE 시설물유형명 = ?
-        """, (facility,))
-        accident_freq = cursor.fetchone()[0]
-        
-        # 지역 분산도
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT 시도명) FROM `{table_name}` 
-            WHERE 시설물유형명 = ?
-        """, (facility,))
-        region_spread = cursor.fetchone()[0]
-        
-        # 조류 다양성
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT 한글보통명) FROM `{table_name}` 
-            WHERE 시설물유형명 = ? AND 한글보통명 != '동정불가'
-        """, (facility,))
-        species_diversity = cursor.fetchone()[0]
-        
-        # 버드세이버 미설치율
-        cursor.execute(f"""
-            SELECT 
-                COUNT(CASE WHEN 버드세이버여부 = 'N' THEN 1 END) * 100.0 / COUNT(*) as no_bird_saver_rate
-            FROM `{table_name}` 
-            WHERE 시설물유형명 = ? AND 버드세이버여부 IN ('Y', 'N')
-        """, (facility,))
-        no_bird_saver_rate = cursor.fetchone()[0] or 0
-        
-        # 종합 위험도 지수 계산 (정규화)
-        risk_index = (
-            (accident_freq / 15118) * 40 +  # 사고빈도 40%
-            (region_spread / 17) * 20 +     # 지역분산 20%
-            (species_diversity / 200) * 20 + # 종다양성 20%
-            (no_bird_saver_rate / 100) * 20  # 버드세이버미설치 20%
-        ) * 100
-        
-        risk_factors[facility] = {
-            'accident_freq': accident_freq,
-            'region_spread': region_spread,
-            'species_diversity': species_diversity,
-            'no_bird_saver_rate': no_bird_saver_rate,
-            'risk_index': risk_index
-        }
+    # 정규화 분모(전체 사고/시도/종 수)는 같은 호출에서 데이터로부터 계산
+    scores = score_facility_risk(cube, {'전체': all_rows(cube)})
+    denominators = scores.to_records()[0]['denominators']
+    print(f"   (정규화 기준: 사고 {denominators['total_accidents']:,}건, "
+          f"{denominators['regions']}개 시도, {denominators['species']}종)")
+    
+    risk_factors = scores.slice_factors('전체')
+    for facility, factors in risk_factors.items():
+        accident_freq = factors['accident_freq']
+        region_spread = factors['region_spread']
+        species_diversity = factors['species_diversity']
+        no_bird_saver_rate = factors['no_bird_saver_rate']
+        risk_index = factors['risk_index']
         
         print(f"\n   ⚠️  {facility}:")
         print(f"      - 사고 빈도: {accident_freq:,}건")
@@ -307,19 +215,22 @@ def building_risk_factor_analysis(file_path):
         print(f"      - 버드세이버 미설치율: {no_bird_saver_rate:.1f}%")
         print(f"      - 🔥 종합 위험도 지수: {risk_index:.1f}/100")
     
-    conn.close()
     return risk_factors
 
-def generate_advanced_analysis_report(file_path):
-    """고급 분석 결과 종합 보고서 생성"""
+def generate_advanced_analysis_report(file_path, cube=None, output_path=OUTPUT_PATH):
+    """고급 분석 결과 종합 보고서 생성 (cube: 이미 로드한 CollisionCube - 없으면 file_path에서 로드)"""
     print("\n" + "=" * 60)
     print("📋 고급 분석 종합 보고서 생성")
     print("=" * 60)
     
+    # 테이블은 한 번만 스캔하고 모든 분석은 메모리 큐브에서 집계
+    if cube is None:
+        cube = load_collision_cube(file_path)
+    
     # 분석 실행
-    facility_stats, facility_species = advanced_building_analysis(file_path)
-    species_risk_scores, migratory_stats = species_risk_analysis(file_path)
-    risk_factors = building_risk_factor_analysis(file_path)
+    facility_stats, facility_species = advanced_building_analysis(file_path, cube)
+    species_risk_scores, migratory_stats = species_risk_analysis(file_path, cube)
+    risk_factors = building_risk_factor_analysis(file_path, cube)
     
     # JSON 데이터 생성
     advanced_analysis_data = {
@@ -330,7 +241,7 @@ def generate_advanced_analysis_report(file_path):
                     "accidents": accidents,
                     "regions": regions,
                     "species": species,
-                    "percentage": round((accidents/15118)*100, 1)
+                    "percentage": round((accidents/cube.n_rows)*100, 1)
                 }
                 for facility, accidents, regions, species in facility_stats
             ],
@@ -364,15 +275,15 @@ def generate_advanced_analysis_report(file_path):
         },
         "risk_factors": risk_factors,
         "analysis_metadata": {
-            "total_accidents": 15118,
+            "total_accidents": cube.n_rows,
             "analysis_date": datetime.now().strftime("%Y-%m-%d"),
             "data_period": "2023-2024",
-            "regions_covered": 17
+            "regions_covered": len(cube.categories('시도명'))
         }
     }
     
     # JSON 파일 저장
-    with open('/Users/suntaekim/nie/advanced_analysis_data.json', 'w', encoding='utf-8') as f:
+    with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(advanced_analysis_data, f, ensure_ascii=False, indent=2)
     
     print("✅ 고급 분석 데이터 JSON 파일 생성: advanced_analysis_data.json")
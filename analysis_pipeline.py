@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+분석 산출물 파이프라인 (DAG)
+산출물마다 입력(원본 GeoPackage, 다른 산출물, 생성 코드)을 선언하고 입력 해시가 그대로인 단계는 건너뜀
+GeoPackage는 한 번만 읽어 모든 단계가 공유하고, 서로 의존하지 않는 단계는 프로세스 풀에서 동시에 실행
+
+사용 예:
+    python analysis_pipeline.py                  # 입력이 바뀐 단계만 실행
+    python analysis_pipeline.py --dry-run        # 실행/건너뜀 계획만 출력
+    python analysis_pipeline.py --force          # 전체 다시 생성
+    python analysis_pipeline.py --only comprehensive_policy_document.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from analytics_cube import CATEGORICAL_COLUMNS, TABLE_NAME, cube_from_frame, read_collision_frame
+
+SOURCE_GPKG = "조류유리창_충돌사고_2023_2024_전국.gpkg"
+STATE_FILE = ".pipeline_state.json"
+LOG_DIR = ".pipeline_logs"
+# 해시 방식/단계 구성 규칙이 바뀌면 올려서 전체 재생성
+PIPELINE_VERSION = 1
+
+# 입력 이름: 공유 데이터셋(원본 GeoPackage 테이블)
+DATASET = "@dataset"
+# 공유 데이터셋 컬럼 (모든 단계가 쓰는 컬럼의 합집합)
+DATASET_COLUMNS = CATEGORICAL_COLUMNS + ["개체수", "위도", "경도"]
+# 공유 데이터셋을 만드는 코드 (읽기 함수, 컬럼 목록/단계 연결) - DATASET을 쓰는 모든 단계의 code 입력
+DATASET_CODE = ["analytics_cube.py", "analysis_pipeline.py"]
+
+_CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stage:
+    """산출물 하나와 그 입력 선언
+
+    build: 워커 프로세스에서 실행할 함수 이름 (STAGE_BUILDERS 키)
+    inputs: DATASET 또는 다른 산출물 이름
+    code: 결과에 영향을 주는 소스 파일 (바뀌면 다시 생성)
+    """
+
+    def __init__(self, artifact, build, inputs=(), code=()):
+        self.artifact = artifact
+        self.build = build
+        self.inputs = tuple(inputs)
+        self.code = tuple(code)
+
+    @property
+    def dependencies(self):
+        return [name for name in self.inputs if name != DATASET]
+
+    @property
+    def uses_dataset(self):
+        return DATASET in self.inputs
+
+
+STAGES = [
+    Stage("advanced_analysis_data.json", "advanced_analysis", inputs=[DATASET],
+          code=["advanced_statistical_analysis.py", "risk_scoring.py", *DATASET_CODE]),
+    Stage("bird_statistics.json", "map_statistics", inputs=[DATASET],
+          code=["extract_geojson.py", *DATASET_CODE]),
+    Stage("bird_collision_data.geojson", "map_geojson", inputs=[DATASET],
+          code=["extract_geojson.py", *DATASET_CODE]),
+    Stage("bird_analysis_results.json", "dashboard_data", inputs=[DATASET],
+          code=["generate_dashboard_data.py", *DATASET_CODE]),
+    Stage("comprehensive_policy_document.json", "policy_document", inputs=["advanced_analysis_data.json"],
+          code=["policy_guidelines_generator.py"]),
+]
+
+
+# ---- 워커 프로세스 쪽 ----
+
+_shared = {}
+
+
+def _shared_dataset(dataset_path):
+    """공유 데이터셋 (워커 프로세스당 한 번 읽음) -> {'source', 'frame'}"""
+    if _shared.get("path") != dataset_path:
+        with open(dataset_path, "rb") as f:
+            _shared.clear()
+            _shared.update(pickle.load(f))
+            _shared["path"] = dataset_path
+    return _shared
+
+
+def _shared_cube(dataset_path):
+    dataset = _shared_dataset(dataset_path)
+    if "cube" not in dataset:
+        dataset["cube"] = cube_from_frame(dataset["frame"])
+    return dataset["cube"]
+
+
+def _build_advanced_analysis(output_path, input_paths, dataset_path):
+    from advanced_statistical_analysis import generate_advanced_analysis_report
+    generate_advanced_analysis_report(_shared_dataset(dataset_path)["source"], cube=_shared_cube(dataset_path),
+                                      output_path=output_path)
+
+
+def _build_map_statistics(output_path, input_paths, dataset_path):
+    from extract_geojson import get_statistics_for_map
+    get_statistics_for_map(_shared_dataset(dataset_path)["source"], cube=_shared_cube(dataset_path),
+                           output_path=output_path)
+
+
+def _build_map_geojson(output_path, input_paths, dataset_path):
+    from extract_geojson import extract_bird_data_to_geojson
+    dataset = _shared_dataset(dataset_path)
+    extract_bird_data_to_geojson(dataset["source"], sample_size=2000, frame=dataset["frame"],
+                                 output_path=output_path)
+
+
+def _build_dashboard_data(output_path, input_paths, dataset_path):
+    from generate_dashboard_data import generate_dashboard_data
+    dataset = _shared_dataset(dataset_path)
+    # 시뮬레이션 데이터로 대체되면 '생성됨'으로 기록되어 원본이 바뀔 때까지 남으므로 실패로 처리
+    generate_dashboard_data(dataset["source"], frame=dataset["frame"], output_path=output_path, strict=True)
+
+
+def _build_policy_document(output_path, input_paths, dataset_path):
+    from policy_guidelines_generator import create_comprehensive_policy_document
+    create_comprehensive_policy_document(input_paths["advanced_analysis_data.json"], output_path)
+
+
+STAGE_BUILDERS = {
+    "advanced_analysis": _build_advanced_analysis,
+    "map_statistics": _build_map_statistics,
+    "map_geojson": _build_map_geojson,
+    "dashboard_data": _build_dashboard_data,
+    "policy_document": _build_policy_document,
+}
+
+
+def _run_stage(build, output_path, input_paths, dataset_path, log_path):
+    """워커에서 단계 하나 실행 - 출력은 단계별 로그 파일로 (동시 실행 단계의 출력이 섞이지 않도록)
+
+    반환: (성공 여부, 소요 시간, 오류 메시지)
+    """
+    started = time.perf_counter()
+    log = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(log):
+        try:
+            # 쓰다 실패해도 이전 산출물이 남도록 임시 파일에 쓴 뒤 교체
+            partial_path = output_path + ".partial"
+            STAGE_BUILDERS[build](partial_path, input_paths, dataset_path)
+            os.replace(partial_path, output_path)
+        except Exception as e:
+            traceback.print_exc(file=log)
+            error = f"{type(e).__name__}: {e}"
+            with contextlib.suppress(OSError):
+                os.remove(partial_path)
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.write(log.getvalue())
+    return error is None, time.perf_counter() - started, error
+
+
+# ---- 부모 프로세스 쪽 ----
+
+def _file_digest(path, state):
+    """파일 sha256 (크기/mtime이 그대로면 상태 파일에 기록된 값 재사용) - 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = os.path.abspath(path)
+    cached = state["files"].get(key)
+    if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+        return cached["sha256"]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    state["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def _load_state(output_dir):
+    try:
+        with open(os.path.join(output_dir, STATE_FILE), encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == PIPELINE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": PIPELINE_VERSION, "files": {}, "artifacts": {}}
+
+
+def _save_state(output_dir, state):
+    path = os.path.join(output_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _select_stages(only):
+    """--only 산출물과 그 상위 단계 (선언 순서 유지)"""
+    by_name = {stage.artifact: stage for stage in STAGES}
+    if not only:
+        return list(STAGES)
+    unknown = [name for name in only if name not in by_name]
+    if unknown:
+        raise ValueError(f"알 수 없는 산출물: {', '.join(unknown)}")
+    wanted = set()
+    pending = list(only)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].dependencies)
+    return [stage for stage in STAGES if stage.artifact in wanted]
+
+
+def _check_graph(stages):
+    """의존 대상이 먼저 선언되어 있는지 확인 (순환 방지)"""
+    seen = set()
+    for stage in stages:
+        missing = [name for name in stage.dependencies if name not in seen]
+        if missing:
+            raise ValueError(f"{stage.artifact}: 먼저 선언되지 않은 입력 {', '.join(missing)}")
+        seen.add(stage.artifact)
+
+
+class PipelineRunner:
+    def __init__(self, source=SOURCE_GPKG, output_dir=".", jobs=None, force=False, table_name=TABLE_NAME):
+        self.source = source
+        self.output_dir = output_dir
+        self.jobs = jobs or min(len(STAGES), os.cpu_count() or 1)
+        self.force = force
+        self.table_name = table_name
+        self.state = _load_state(output_dir)
+        self._dataset_path = None
+
+    def output_path(self, artifact):
+        return os.path.join(self.output_dir, artifact)
+
+    def input_hash(self, stage):
+        """단계 입력 해시 (입력 파일/상위 산출물/코드/파이프라인 버전) - 입력 파일이 없으면 None"""
+        inputs = {}
+        for name in stage.inputs:
+            path = self.source if name == DATASET else self.output_path(name)
+            inputs[name] = _file_digest(path, self.state)
+            if inputs[name] is None:
+                return None
+        payload = {
+            "version": PIPELINE_VERSION,
+            "artifact": stage.artifact,
+            "build": stage.build,
+            "inputs": inputs,
+            "table": self.table_name if stage.uses_dataset else None,
+            "code": {name: _file_digest(os.path.join(_CODE_DIR, name), self.state) for name in stage.code},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def is_fresh(self, stage, input_hash):
+        """입력 해시가 기록과 같고 산출물이 그때 그대로면 건너뜀"""
+        if self.force or input_hash is None:
+            return False
+        record = self.state["artifacts"].get(stage.artifact)
+        return (record is not None and record["input_hash"] == input_hash
+                and _file_digest(self.output_path(stage.artifact), self.state) == record["output_hash"])
+
+    def _dataset(self):
+        """공유 데이터셋을 한 번만 읽어 워커가 읽을 임시 파일로 저장 (필요한 단계가 있을 때만)"""
+        if self._dataset_path is None:
+            started = time.perf_counter()
+            frame = read_collision_frame(self.source, self.table_name, columns=DATASET_COLUMNS, with_rowid=True)
+            fd, path = tempfile.mkstemp(prefix="pipeline_dataset_", suffix=".pkl", dir=self.output_dir)
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"source": self.source, "frame": frame}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._dataset_path = path
+            print(f"📦 데이터셋 로드: {len(frame):,}개 레코드, 1회 스캔 ({time.perf_counter() - started:.2f}초)")
+        return self._dataset_path
+
+    def plan(self, only=None):
+        """실행하지 않고 단계별 예정 상태 -> [(산출물, 상태)]"""
+        stages = _select_stages(only)
+        _check_graph(stages)
+        plan = {}
+        for stage in stages:
+            if any(plan[name] != "skip" for name in stage.dependencies if name in plan):
+                plan[stage.artifact] = "after-upstream"
+            elif self.is_fresh(stage, self.input_hash(stage)):
+                plan[stage.artifact] = "skip"
+            elif any(_file_digest(self.output_path(n), self.state) is None for n in stage.dependencies) \
+                    or (stage.uses_dataset and not os.path.exists(self.source)):
+                plan[stage.artifact] = "missing-input"
+            else:
+                plan[stage.artifact] = "run"
+        return list(plan.items())
+
+    def run(self, only=None):
+        """DAG 실행 -> {산출물: 결과 dict}"""
+        stages = _select_stages(only)
+        _check_graph(stages)
+        os.makedirs(os.path.join(self.output_dir, LOG_DIR), exist_ok=True)
+        results = {}
+        waiting = list(stages)
+        running = {}
+        context = multiprocessing.get_context("spawn")
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=self.jobs, mp_context=context) as pool:
+                while waiting or running:
+                    for stage in list(waiting):
+                        statuses = [results.get(name, {}).get("status") for name in stage.dependencies]
+                        if any(status in ("failed", "blocked") for status in statuses):
+                            waiting.remove(stage)
+                            results[stage.artifact] = {"status": "blocked"}
+                            print(f"⛔ {stage.artifact}: 상위 단계 실패로 건너뜀")
+                            continue
+                        if not all(status in ("built", "skipped") for status in statuses):
+                            continue
+                        waiting.remove(stage)
+                        self._start(pool, stage, running, results)
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, input_hash = running.pop(future)
+                        self._finish(stage, input_hash, future, results)
+        finally:
+            if self._dataset_path is not None:
+                os.remove(self._dataset_path)
+                self._dataset_path = None
+            _save_state(self.output_dir, self.state)
+
+        built = sum(1 for r in results.values() if r["status"] == "built")
+        skipped = sum(1 for r in results.values() if r["status"] == "skipped")
+        failed = len(results) - built - skipped
+        print(f"\n🏁 파이프라인 완료 ({time.perf_counter() - started:.1f}초): "
+              f"생성 {built}개, 건너뜀 {skipped}개, 실패 {failed}개")
+        return results
+
+    def _start(self, pool, stage, running, results):
+        input_hash = self.input_hash(stage)
+        if self.is_fresh(stage, input_hash):
+            results[stage.artifact] = {"status": "skipped"}
+            print(f"⏭️  {stage.artifact}: 입력 변경 없음")
+            return
+        if input_hash is None:
+            results[stage.artifact] = {"status": "failed", "error": "입력 파일이 없습니다."}
+            print(f"❌ {stage.artifact}: 입력 파일이 없습니다.")
+            return
+        dataset_path = self._dataset() if stage.uses_dataset else None
+        input_paths = {name: self.output_path(name) for name in stage.dependencies}
+        log_path = os.path.join(self.output_dir, LOG_DIR, stage.artifact + ".log")
+        print(f"▶️  {stage.artifact}: 실행")
+        future = pool.submit(_run_stage, stage.build, self.output_path(stage.artifact), input_paths,
+                             dataset_path, log_path)
+        running[future] = (stage, input_hash)
+
+    def _finish(self, stage, input_hash, future, results):
+        try:
+            ok, seconds, error = future.result()
+        except Exception as e:  # 워커 프로세스 비정상 종료 등
+            ok, seconds, error = False, 0.0, f"{type(e).__name__}: {e}"
+        if not ok:
+            results[stage.artifact] = {"status": "failed", "error": error}
+            self.state["artifacts"].pop(stage.artifact, None)
+            print(f"❌ {stage.artifact}: {error} (로그: {os.path.join(LOG_DIR, stage.artifact + '.log')})")
+            return
+        self.state["artifacts"][stage.artifact] = {
+            "input_hash": input_hash,
+            "output_hash": _file_digest(self.output_path(stage.artifact), self.state),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(seconds, 2),
+        }
+        results[stage.artifact] = {"status": "built", "seconds": seconds}
+        print(f"✅ {stage.artifact}: 생성 ({seconds:.1f}초)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 산출물 DAG 파이프라인")
+    parser.add_argument("--source", default=SOURCE_GPKG, help="원본 GeoPackage 경로")
+    parser.add_argument("--output-dir", default=".", help="산출물 디렉토리")
+    parser.add_argument("--jobs", type=int, default=None, help="동시에 실행할 단계 수 (기본: CPU 수)")
+    parser.add_argument("--force", action="store_true", help="입력 해시와 관계없이 전부 다시 생성")
+    parser.add_argument("--only", nargs="+", metavar="ARTIFACT", help="이 산출물(과 상위 단계)만 실행")
+    parser.add_argument("--dry-run", action="store_true", help="실행 계획만 출력")
+    args = parser.parse_args()
+
+    runner = PipelineRunner(args.source, args.output_dir, args.jobs, args.force)
+    try:
+        if args.dry_run:
+            labels = {"run": "실행", "skip": "건너뜀 (입력 변경 없음)",
+                      "after-upstream": "상위 단계 결과에 따라 결정", "missing-input": "입력 파일 없음"}
+            print("📋 파이프라인 계획:")
+            for artifact, status in runner.plan(args.only):
+                print(f"   • {artifact}: {labels[status]}")
+            _save_state(args.output_dir, runner.state)
+            return 0
+        results = runner.run(args.only)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    return 1 if any(r["status"] in ("failed", "blocked") for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+조류 충돌사고 인메모리 분석 큐브
+GeoPackage 테이블을 한 번만 읽어 범주형 컬럼은 딕셔너리 인코딩(NumPy 코드 배열), 수치 컬럼은 배열로 보관
+시설물×시도, 시설물×종, 시설물×계절 등 집계는 모두 이 배열에서 벡터화 group-by로 계산
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+TABLE_NAME = "조류유리창_충돌사고_2023_2024_전국"
+
+# 분석에 쓰는 범주형 컬럼 (NULL은 코드 -1, 빈 문자열은 일반 값 - SQL의 IS NOT NULL / != '' 구분 유지)
+CATEGORICAL_COLUMNS = [
+    "시설물유형명", "시도명", "한글보통명", "철새유형명",
+    "서식지유형명", "버드세이버여부", "조사연도", "관찰일자",
+]
+
+# MCP 데이터베이스(sqlite_mcp_setup.py의 bird_collisions 테이블) 컬럼 -> 큐브 컬럼 이름
+MCP_TABLE_NAME = "bird_collisions"
+MCP_COLUMN_MAP = {
+    "시설물유형명": "facility_type", "시도명": "province", "한글보통명": "korean_name",
+    "철새유형명": "migratory_type", "서식지유형명": "habitat_type", "버드세이버여부": "bird_saver",
+    "조사연도": "survey_year", "관찰일자": "observation_date", "개체수": "individual_count",
+}
+
+SEASONS = ["봄", "여름", "가을", "겨울", "미분류"]
+_MONTH_TO_SEASON = {3: 0, 4: 0, 5: 0, 6: 1, 7: 1, 8: 1, 9: 2, 10: 2, 11: 2, 12: 3, 1: 3, 2: 3}
+
+# SQLite strftime이 인식하는 날짜 앞부분 (YYYY-MM-DD)
+_DATE_PATTERN = r"^\s*(\d{4})-(\d{2})-(\d{2})"
+# SQLite CAST(x AS FLOAT)처럼 앞쪽 숫자 부분만 사용 (숫자가 없으면 0.0)
+_NUMERIC_PREFIX = r"^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+
+
+class CollisionCube:
+    """딕셔너리 인코딩된 컬럼 집합과 벡터화 집계 함수"""
+
+    def __init__(self, codes, categories, numeric):
+        self._codes = codes
+        self._categories = categories
+        self.numeric = numeric
+        self.n_rows = len(next(iter(codes.values()))) if codes else 0
+
+    # 컬럼 접근
+    def codes(self, column):
+        return self._codes[column]
+
+    def categories(self, column):
+        return self._categories[column]
+
+    def code_of(self, column, value):
+        """값의 코드 (없는 값이면 None)"""
+        matches = np.flatnonzero(self._categories[column] == value)
+        return int(matches[0]) if len(matches) else None
+
+    def mask(self, column, exclude=(), equals=None, isin=None):
+        """NULL이 아닌 행 마스크 (+ 제외/일치 조건) - SQL WHERE 절과 같은 의미"""
+        codes = self._codes[column]
+        result = codes >= 0
+        if equals is not None:
+            code = self.code_of(column, equals)
+            return result & (codes == code) if code is not None else np.zeros(self.n_rows, bool)
+        if isin is not None:
+            wanted = [c for c in (self.code_of(column, v) for v in isin) if c is not None]
+            result &= np.isin(codes, wanted)
+        for value in exclude:
+            code = self.code_of(column, value)
+            if code is not None:
+                result &= codes != code
+        return result
+
+    # 집계
+    def _group_index(self, columns, mask=None, keep_null=()):
+        """그룹 키 -> 평탄화 인덱스 (keep_null 컬럼의 NULL은 마지막 칸, 나머지 NULL 행은 제외)"""
+        valid = np.ones(self.n_rows, bool) if mask is None else mask.copy()
+        shape = []
+        for column in columns:
+            size = len(self._categories[column])
+            if column in keep_null:
+                size += 1
+            else:
+                valid &= self._codes[column] >= 0
+            shape.append(size)
+        index = tuple(
+            np.where(self._codes[column][valid] >= 0, self._codes[column][valid], shape[i] - 1)
+            for i, column in enumerate(columns)
+        )
+        return np.ravel_multi_index(index, shape).astype(np.int64), valid, tuple(shape)
+
+    def _key(self, columns, shape, flat, single):
+        parts = np.unravel_index(flat, shape)
+        values = tuple(
+            self._categories[column][part] if part < len(self._categories[column]) else None
+            for column, part in zip(columns, parts)
+        )
+        return values[0] if single else values
+
+    def group_count(self, columns, mask=None, keep_null=()):
+        """GROUP BY columns + COUNT(*) -> [(키, 건수)] 건수 내림차순
+
+        columns가 문자열이면 키는 값 하나, 목록이면 값 튜플
+        """
+        single = isinstance(columns, str)
+        columns = [columns] if single else list(columns)
+        flat, _, shape = self._group_index(columns, mask, keep_null)
+        counts = np.bincount(flat, minlength=int(np.prod(shape)))
+        nonzero = np.flatnonzero(counts)
+        order = nonzero[np.argsort(-counts[nonzero], kind="stable")]
+        return [(self._key(columns, shape, i, single), int(counts[i])) for i in order]
+
+    def group_distinct(self, columns, value_column, mask=None, keep_null=()):
+        """GROUP BY columns + COUNT(DISTINCT value_column) (NULL 값은 세지 않음) -> {키: 수}"""
+        single = isinstance(columns, str)
+        columns = [columns] if single else list(columns)
+        value_mask = self._codes[value_column] >= 0
+        flat, valid, shape = self._group_index(columns, value_mask if mask is None else mask & value_mask,
+                                               keep_null)
+        n_values = len(self._categories[value_column])
+        pairs = np.unique(flat * n_values + self._codes[value_column][valid])
+        groups, counts = np.unique(pairs // n_values, return_counts=True)
+        return {self._key(columns, shape, g, single): int(c) for g, c in zip(groups, counts)}
+
+    def group_mean(self, columns, values, mask=None, keep_null=()):
+        """GROUP BY columns + AVG(values) (NaN 제외 - SQL AVG와 같음) -> {키: 평균}"""
+        single = isinstance(columns, str)
+        columns = [columns] if single else list(columns)
+        value_mask = ~np.isnan(values)
+        flat, valid, shape = self._group_index(columns, value_mask if mask is None else mask & value_mask,
+                                               keep_null)
+        size = int(np.prod(shape))
+        sums = np.bincount(flat, weights=values[valid], minlength=size)
+        counts = np.bincount(flat, minlength=size)
+        return {self._key(columns, shape, g, single): float(sums[g] / counts[g]) for g in np.flatnonzero(counts)}
+
+
+def _encode(series):
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object)
+
+
+def _season_codes(date_codes, date_values):
+    """관찰일자 코드 -> 계절 코드/월 (NULL은 -1, 날짜로 해석할 수 없으면 '미분류')
+
+    정규식은 행이 아니라 딕셔너리(고유 날짜)에만 적용
+    """
+    if not len(date_values):
+        return np.full(len(date_codes), -1, dtype=np.int32), np.full(len(date_codes), np.nan)
+    parts = pd.Series(date_values, dtype="string").str.extract(_DATE_PATTERN).astype(float)
+    month = parts[1].to_numpy()
+    day = parts[2].to_numpy()
+    valid_date = (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    lookup = np.array([_MONTH_TO_SEASON.get(m, 4) for m in range(13)], dtype=np.int32)
+    value_season = np.full(len(date_values), SEASONS.index("미분류"), dtype=np.int32)
+    value_season[valid_date] = lookup[month[valid_date].astype(int)]
+    value_month = np.where(valid_date, month, np.nan)
+
+    has_date = date_codes >= 0
+    season = np.where(has_date, value_season[np.where(has_date, date_codes, 0)], -1).astype(np.int32)
+    row_month = np.where(has_date, value_month[np.where(has_date, date_codes, 0)], np.nan)
+    return season, row_month
+
+
+def _cast_float(series):
+    """SQLite CAST(x AS FLOAT)와 같은 변환 (NULL은 NaN) - 고유 값만 파싱"""
+    codes, uniques = _encode(series)
+    prefix = pd.Series(uniques, dtype="string").str.extract(_NUMERIC_PREFIX)[0]
+    value_floats = pd.to_numeric(prefix, errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    if not len(value_floats):
+        return np.full(len(codes), np.nan)
+    return np.where(codes >= 0, value_floats[np.where(codes >= 0, codes, 0)], np.nan)
+
+
+def read_collision_frame(file_path, table_name=TABLE_NAME, columns=None, column_map=None, with_rowid=False):
+    """테이블을 한 번 읽어 DataFrame (컬럼 이름은 큐브 기준, 기본은 큐브에 필요한 컬럼)
+
+    column_map: 큐브 컬럼 -> 원본 컬럼 이름 (원본 컬럼 이름이 다른 테이블용, 예: MCP_COLUMN_MAP)
+    with_rowid: 원본 ROWID를 _rowid 컬럼으로 함께 읽음
+    DB는 읽기 전용(mode=ro)으로 열어 실행 중인 서버의 DB도 잠그거나 수정하지 않음
+    """
+    column_map = column_map or {}
+    columns = columns or CATEGORICAL_COLUMNS + ["개체수"]
+    select = [f"`{column_map.get(c, c)}` AS `{c}`" for c in columns]
+    if with_rowid:
+        select.insert(0, "rowid AS _rowid")
+    conn = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+    try:
+        return pd.read_sql_query(f"SELECT {', '.join(select)} FROM `{table_name}`", conn)
+    finally:
+        conn.close()
+
+
+def cube_from_frame(df):
+    """read_collision_frame 결과(큐브 컬럼 포함) -> CollisionCube"""
+    codes = {}
+    categories = {}
+    for column in CATEGORICAL_COLUMNS:
+        codes[column], categories[column] = _encode(df[column])
+
+    season, month = _season_codes(codes["관찰일자"], categories["관찰일자"])
+    codes["계절"] = season
+    categories["계절"] = np.asarray(SEASONS, dtype=object)
+
+    numeric = {
+        "개체수": _cast_float(df["개체수"]),
+        "관찰월": month,
+    }
+    return CollisionCube(codes, categories, numeric)
+
+
+def load_collision_cube(file_path, table_name=TABLE_NAME, column_map=None, verbose=True):
+    """테이블을 한 번 스캔해서 CollisionCube 생성
+
+    로드 메시지는 stderr로 출력 (stdio MCP 서버에서 stdout은 JSON-RPC 전용), verbose=False면 출력 안 함
+    """
+    started = time.perf_counter()
+    cube = cube_from_frame(read_collision_frame(file_path, table_name, column_map=column_map))
+    if verbose:
+        print(f"🧊 분석 큐브 로드: {cube.n_rows:,}개 레코드, 1회 스캔 ({time.perf_counter() - started:.2f}초)",
+              file=sys.stderr)
+    return cube
+
+
+class CubeCache:
+    """파일이 바뀔 때만 다시 읽는 큐브 캐시 (서버에서 요청마다 스캔하지 않도록)
+
+    DB 파일과 WAL 파일의 (inode, mtime, 크기)가 같으면 메모리의 큐브를 그대로 사용
+    """
+
+    def __init__(self, file_path, table_name=TABLE_NAME, column_map=None):
+        self.file_path = file_path
+        self.table_name = table_name
+        self.column_map = column_map
+        self._lock = threading.Lock()
+        self._cube = None
+        self._signature = None
+        self.stats = {"hits": 0, "loads": 0}
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.file_path, self.file_path + "-wal"):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self):
+        signature = self._file_signature()
+        # 로드는 락 안에서 (동시에 첫 요청이 몰려도 한 번만 스캔)
+        with self._lock:
+            if self._cube is not None and self._signature == signature:
+                self.stats["hits"] += 1
+                return self._cube
+            self._cube = load_collision_cube(self.file_path, self.table_name, self.column_map, verbose=False)
+            self._signature = signature
+            self.stats["loads"] += 1
+            return self._cube
+
+    def health(self):
+        with self._lock:
+            return {"loaded": self._cube is not None,
+                    "rows": self._cube.n_rows if self._cube is not None else 0, **self.stats}
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+조류 충돌 데이터 컬럼형 내보내기 (Parquet / Arrow IPC)
+조사연도별 파티션 + 종/지역/시설물 컬럼 딕셔너리 인코딩, 분석 스크립트용 로더 포함
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성: CSV 내보내기는 pyarrow 없이도 동작
+    pa = None
+    pq = None
+
+COLUMNAR_DIR = "조류충돌_columnar"
+PARTITION_COLUMN = "조사연도"
+UNKNOWN_PARTITION = "unknown"
+
+# 반복값이 많은 문자열 컬럼 - 딕셔너리 인코딩 (pandas에서는 category로 로드됨)
+DICTIONARY_COLUMNS = [
+    "조류종", "철새유형", "서식지유형", "학명", "영문명",
+    "계", "문", "강", "목", "과", "속", "종",
+    "시설물유형", "버드세이버여부", "시도",
+]
+
+FORMAT_EXTENSIONS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow가 설치되어 있지 않습니다: pip install pyarrow")
+
+
+def _partition_value(value):
+    """조사연도 값 -> 파티션 이름 ('2023', 2023, 2023.0 모두 '2023')"""
+    if value is None or value != value:
+        return UNKNOWN_PARTITION
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _partition_path(base_dir, fmt, partition):
+    return os.path.join(base_dir, fmt, f"{PARTITION_COLUMN}={partition}{FORMAT_EXTENSIONS[fmt]}")
+
+
+def _to_arrow_table(df):
+    """DataFrame -> Arrow 테이블 (딕셔너리 컬럼은 category로 변환해 dictionary 타입 유지)"""
+    df = df.copy()
+    for column in DICTIONARY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def export_columnar(df=None, base_dir=COLUMNAR_DIR, formats=("parquet", "arrow"),
+                    compression="zstd"):
+    """조사연도별 Parquet(압축) / Arrow IPC(비압축, memory-map용) 파일 생성"""
+    _require_pyarrow()
+    if df is None:
+        from export_to_csv import load_source_dataframe
+        df = load_source_dataframe()
+
+    print("🧱 컬럼형(Parquet/Arrow) 내보내기 시작...")
+    started = time.perf_counter()
+
+    partitions = df[PARTITION_COLUMN].map(_partition_value)
+    manifest = {
+        "generated_at": datetime.now().isoformat(),
+        "total_records": len(df),
+        "partition_column": PARTITION_COLUMN,
+        "dictionary_columns": [c for c in DICTIONARY_COLUMNS if c in df.columns],
+        "formats": list(formats),
+        "partitions": {},
+    }
+
+    for fmt in formats:
+        os.makedirs(os.path.join(base_dir, fmt), exist_ok=True)
+        # 이전 실행에서 남은 연도 파티션 제거
+        for stale in glob.glob(os.path.join(base_dir, fmt, f"{PARTITION_COLUMN}=*{FORMAT_EXTENSIONS[fmt]}")):
+            os.remove(stale)
+
+    for partition, part_df in df.groupby(partitions, sort=True):
+        table = _to_arrow_table(part_df)
+        files = {}
+        for fmt in formats:
+            path = _partition_path(base_dir, fmt, partition)
+            if fmt == "parquet":
+                pq.write_table(table, path, compression=compression,
+                               use_dictionary=manifest["dictionary_columns"])
+            else:
+                # 압축하면 zero-copy memory-map이 불가능하므로 IPC 파일은 비압축
+                with pa.OSFile(path, "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            files[fmt] = os.path.relpath(path, base_dir)
+        manifest["partitions"][partition] = {"rows": table.num_rows, "files": files}
+
+    with open(os.path.join(base_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    elapsed = time.perf_counter() - started
+    print(f"📁 컬럼형 파일 생성 완료: {base_dir}/ ({elapsed:.2f}초)")
+    for partition, info in manifest["partitions"].items():
+        sizes = ", ".join(
+            f"{fmt} {os.path.getsize(os.path.join(base_dir, path)) / (1024 * 1024):.2f} MB"
+            for fmt, path in info["files"].items()
+        )
+        print(f"   • {PARTITION_COLUMN}={partition}: {info['rows']:,}개 레코드 ({sizes})")
+
+    return manifest
+
+
+def read_manifest(base_dir=COLUMNAR_DIR):
+    """내보내기 manifest (파티션별 행 수, 생성 시각)"""
+    with open(os.path.join(base_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_collision_table(base_dir=COLUMNAR_DIR, columns=None, years=None):
+    """Arrow 테이블로 로드 - IPC 파일이 있으면 memory-map(zero-copy), 없으면 Parquet"""
+    _require_pyarrow()
+    manifest = read_manifest(base_dir)
+    wanted = None if years is None else {_partition_value(y) for y in years}
+
+    tables = []
+    for partition, info in manifest["partitions"].items():
+        if wanted is not None and partition not in wanted:
+            continue
+        files = info["files"]
+        if "arrow" in files:
+            # 테이블 버퍼가 매핑을 참조하므로 with 블록을 벗어나도 안전
+            with pa.memory_map(os.path.join(base_dir, files["arrow"]), "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select(columns)
+        else:
+            table = pq.read_table(os.path.join(base_dir, files["parquet"]), columns=columns)
+        tables.append(table)
+
+    if not tables:
+        raise ValueError(f"해당 {PARTITION_COLUMN} 파티션이 없습니다: {sorted(wanted or [])}")
+    if len(tables) == 1:
+        return tables[0]
+    # 파티션마다 딕셔너리가 달라도 합칠 수 있도록 스키마 통합
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def load_collision_dataframe(base_dir=COLUMNAR_DIR, columns=None, years=None):
+    """분석 스크립트용 pandas 로더 (딕셔너리 컬럼은 category)"""
+    return load_collision_table(base_dir, columns, years).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조류 충돌 데이터 Parquet/Arrow 내보내기")
+    parser.add_argument("--out", default=COLUMNAR_DIR, help="출력 디렉터리")
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMAT_EXTENSIONS),
+                        default=["parquet", "arrow"], help="생성할 형식")
+    args = parser.parse_args()
+
+    try:
+        export_columnar(base_dir=args.out, formats=args.formats)
+    except Exception as e:
+        print(f"❌ 컬럼형 내보내기 중 오류 발생: {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,213 +5,136 @@
 올바른 테이블 찾기
 """
 
-import sqlite3
 import json
 from collections import Counter
 
+from dataset_profile import load_profile
+
 def find_correct_table_and_analyze(file_path):
-    """올바른 데이터 테이블을 찾아서 분석"""
+    """올바른 데이터 테이블을 찾아서 분석 (데이터셋 프로파일 사용 - DB는 프로파일이 없거나 바뀐 경우만 스캔)"""
     print("=" * 60)
     print("조류 유리창 충돌사고 데이터 분석 (수정 버전)")
     print("=" * 60)
     
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
+    profile = load_profile(file_path)
     
-    # 모든 테이블 조회
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
-    print(f"✓ 모든 테이블: {[table[0] for table in tables]}")
+    # 모든 테이블
+    print(f"✓ 모든 테이블: {[table['name'] for table in profile.tables]}")
     
-    # 각 테이블의 레코드 수 확인
+    # 각 테이블의 레코드 수
     print(f"\n📊 각 테이블의 레코드 수:")
-    data_tables = []
-    for table in tables:
-        table_name = table[0]
-        try:
-            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`;")
-            count = cursor.fetchone()[0]
-            print(f"   {table_name}: {count:,}개")
-            if count > 0:
-                data_tables.append((table_name, count))
-        except Exception as e:
-            print(f"   {table_name}: 오류 - {e}")
-    
-    # 가장 많은 데이터를 가진 테이블 선택
-    if data_tables:
-        # 조류 데이터 테이블 찾기
-        bird_table = None
-        for table_name, count in data_tables:
-            if '조류' in table_name or 'bird' in table_name.lower():
-                bird_table = table_name
-                break
-        
-        if not bird_table:
-            # 가장 많은 레코드를 가진 테이블 선택
-            bird_table = max(data_tables, key=lambda x: x[1])[0]
-        
+    for table in profile.tables:
+        if table['rows'] is None:
+            print(f"   {table['name']}: 오류 - {table['error']}")
+        else:
+            print(f"   {table['name']}: {table['rows']:,}개")
+    
+    # 데이터 테이블 (이름에 조류/bird가 들어간 테이블, 없으면 가장 큰 테이블)
+    if profile.table:
+        bird_table = profile.table
         print(f"\n✓ 분석할 테이블: {bird_table}")
         
-        # 테이블 구조 분석
-        cursor.execute(f"PRAGMA table_info(`{bird_table}`);")
-        columns_info = cursor.fetchall()
+        # 테이블 구조
         print(f"\n📋 {bird_table} 테이블 컬럼:")
-        columns = []
-        for col_info in columns_info:
-            col_id, col_name, col_type, not_null, default, pk = col_info
-            columns.append(col_name)
-            print(f"   {col_id+1:2d}. {col_name:<25} ({col_type})")
+        for col_id, col_name in enumerate(profile.columns):
+            print(f"   {col_id+1:2d}. {col_name:<25} ({profile.column(col_name)['type']})")
         
         # 전체 레코드 수
-        cursor.execute(f"SELECT COUNT(*) FROM `{bird_table}`;")
-        total_count = cursor.fetchone()[0]
+        total_count = profile.total_count
         print(f"\n📊 전체 레코드 수: {total_count:,}개")
         
-        # 샘플 데이터 조회 (geometry 제외)
-        non_geom_columns = [col for col in columns if col.lower() not in ['geom', 'geometry', 'shape']]
+        # 샘플 데이터 (geometry 제외)
+        non_geom_columns = [col for col in profile.columns if col.lower() not in ['geom', 'geometry', 'shape']]
         if non_geom_columns:
-            column_list = ', '.join([f"`{col}`" for col in non_geom_columns[:10]])  # 처음 10개만
-            cursor.execute(f"SELECT {column_list} FROM `{bird_table}` LIMIT 3;")
-            sample_data = cursor.fetchall()
+            sample_data = profile.sample_rows(non_geom_columns[:10])  # 처음 10개만
             
             print(f"\n📝 샘플 데이터 (처음 3개 레코드):")
             for i, row in enumerate(sample_data, 1):
                 print(f"   레코드 {i}:")
-                for j, value in enumerate(row):
-                    if j < len(non_geom_columns):
-                        print(f"     {non_geom_columns[j]}: {value}")
+                for col, value in row.items():
+                    print(f"     {col}: {value}")
                 print()
         
         # 분석 시작
-        analyze_bird_collision_data(cursor, bird_table, columns, total_count)
+        analyze_bird_collision_data(profile)
         
     else:
         print("✗ 데이터가 있는 테이블을 찾을 수 없습니다.")
-    
-    conn.close()
 
-def analyze_bird_collision_data(cursor, table_name, columns, total_count):
-    """조류 충돌사고 데이터 상세 분석"""
+def analyze_bird_collision_data(profile):
+    """조류 충돌사고 데이터 상세 분석 (컬럼 역할/값 빈도는 프로파일에서)"""
     print(f"\n🔍 상세 데이터 분석:")
+    total_count = profile.total_count
     
     # 1. 지역별 분석
-    region_columns = [col for col in columns if any(keyword in col for keyword in ['시도', '시군구', '구', '시', '도', '지역', '행정구역'])]
+    region_columns = profile.columns_with_role('region')
     print(f"\n🏙️  지역 관련 컬럼: {region_columns}")
     
     for col in region_columns[:3]:  # 처음 3개만
-        try:
-            cursor.execute(f"SELECT `{col}`, COUNT(*) as count FROM `{table_name}` WHERE `{col}` IS NOT NULL AND `{col}` != '' GROUP BY `{col}` ORDER BY count DESC LIMIT 15;")
-            region_stats = cursor.fetchall()
-            if region_stats:
-                print(f"\n   📍 {col} 상위 15개:")
-                for region, count in region_stats:
-                    percentage = (count / total_count) * 100
-                    print(f"     - {region}: {count:,}건 ({percentage:.1f}%)")
-        except Exception as e:
-            print(f"     {col} 분석 오류: {e}")
+        region_stats = profile.top_values(col, 15, exclude_empty=True)
+        if region_stats:
+            print(f"\n   📍 {col} 상위 15개:")
+            for region, count in region_stats:
+                percentage = (count / total_count) * 100
+                print(f"     - {region}: {count:,}건 ({percentage:.1f}%)")
     
     # 2. 시간 관련 분석
-    time_columns = [col for col in columns if any(keyword in col for keyword in ['날짜', '시간', '년', '월', '일', 'date', 'time', '발견', '신고'])]
+    time_columns = profile.columns_with_role('time')
     print(f"\n📅 시간 관련 컬럼: {time_columns}")
     
     for col in time_columns[:5]:  # 처음 5개만
-        try:
-            cursor.execute(f"SELECT `{col}`, COUNT(*) as count FROM `{table_name}` WHERE `{col}` IS NOT NULL AND `{col}` != '' GROUP BY `{col}` ORDER BY count DESC LIMIT 10;")
-            time_stats = cursor.fetchall()
-            if time_stats:
-                print(f"\n   🕐 {col} 상위 10개:")
-                for time_val, count in time_stats:
-                    print(f"     - {time_val}: {count:,}건")
-        except Exception as e:
-            print(f"     {col} 분석 오류: {e}")
+        time_stats = profile.top_values(col, 10, exclude_empty=True)
+        if time_stats:
+            print(f"\n   🕐 {col} 상위 10개:")
+            for time_val, count in time_stats:
+                print(f"     - {time_val}: {count:,}건")
     
     # 3. 조류 종 관련 분석
-    species_columns = [col for col in columns if any(keyword in col for keyword in ['종', '새', '조류', 'species', 'bird', '생물'])]
+    species_columns = profile.columns_with_role('species')
     print(f"\n🐦 조류 관련 컬럼: {species_columns}")
     
     for col in species_columns[:3]:
-        try:
-            cursor.execute(f"SELECT `{col}`, COUNT(*) as count FROM `{table_name}` WHERE `{col}` IS NOT NULL AND `{col}` != '' GROUP BY `{col}` ORDER BY count DESC LIMIT 15;")
-            species_stats = cursor.fetchall()
-            if species_stats:
-                print(f"\n   🦅 {col} 상위 15개:")
-                for species, count in species_stats:
-                    percentage = (count / total_count) * 100
-                    print(f"     - {species}: {count:,}건 ({percentage:.1f}%)")
-        except Exception as e:
-            print(f"     {col} 분석 오류: {e}")
+        species_stats = profile.top_values(col, 15, exclude_empty=True)
+        if species_stats:
+            print(f"\n   🦅 {col} 상위 15개:")
+            for species, count in species_stats:
+                percentage = (count / total_count) * 100
+                print(f"     - {species}: {count:,}건 ({percentage:.1f}%)")
     
     # 4. 건물/시설 관련 분석
-    building_columns = [col for col in columns if any(keyword in col for keyword in ['건물', '시설', '장소', '위치', '건축물', 'building', 'facility'])]
+    building_columns = profile.columns_with_role('building')
     print(f"\n🏢 건물/시설 관련 컬럼: {building_columns}")
     
     for col in building_columns[:3]:
-        try:
-            cursor.execute(f"SELECT `{col}`, COUNT(*) as count FROM `{table_name}` WHERE `{col}` IS NOT NULL AND `{col}` != '' GROUP BY `{col}` ORDER BY count DESC LIMIT 10;")
-            building_stats = cursor.fetchall()
-            if building_stats:
-                print(f"\n   🏗️  {col} 상위 10개:")
-                for building, count in building_stats:
-                    print(f"     - {building}: {count:,}건")
-        except Exception as e:
-            print(f"     {col} 분석 오류: {e}")
+        building_stats = profile.top_values(col, 10, exclude_empty=True)
+        if building_stats:
+            print(f"\n   🏗️  {col} 상위 10개:")
+            for building, count in building_stats:
+                print(f"     - {building}: {count:,}건")
     
     # 5. 기타 중요 컬럼 분석
-    other_columns = [col for col in columns if col not in region_columns + time_columns + species_columns + building_columns 
-                    and col.lower() not in ['fid', 'id', 'geom', 'geometry', 'shape']]
+    other_columns = profile.columns_with_role('other')
     
     if other_columns:
         print(f"\n📋 기타 컬럼 분석:")
         for col in other_columns[:5]:  # 처음 5개만
-            try:
-                cursor.execute(f"SELECT `{col}`, COUNT(*) as count FROM `{table_name}` WHERE `{col}` IS NOT NULL AND `{col}` != '' GROUP BY `{col}` ORDER BY count DESC LIMIT 10;")
-                other_stats = cursor.fetchall()
-                if other_stats and len(other_stats) <= 20:  # 너무 많은 고유값이 아닌 경우만
-                    print(f"\n   📊 {col} 상위 10개:")
-                    for value, count in other_stats:
-                        print(f"     - {value}: {count:,}건")
-            except Exception as e:
-                print(f"     {col} 분석 오류: {e}")
+            other_stats = profile.top_values(col, 10, exclude_empty=True)
+            if other_stats and len(other_stats) <= 20:  # 너무 많은 고유값이 아닌 경우만
+                print(f"\n   📊 {col} 상위 10개:")
+                for value, count in other_stats:
+                    print(f"     - {value}: {count:,}건")
 
 def generate_detailed_html(file_path):
     """상세한 분석 결과 HTML 생성"""
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
-    
-    # 테이블 찾기
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
-    
-    data_tables = []
-    for table in tables:
-        table_name = table[0]
-        try:
-            cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`;")
-            count = cursor.fetchone()[0]
-            if count > 0:
-                data_tables.append((table_name, count))
-        except:
-            pass
-    
-    bird_table = None
-    for table_name, count in data_tables:
-        if '조류' in table_name or 'bird' in table_name.lower():
-            bird_table = table_name
-            break
-    
-    if not bird_table and data_tables:
-        bird_table = max(data_tables, key=lambda x: x[1])[0]
+    profile = load_profile(file_path)
+    bird_table = profile.table
     
     if not bird_table:
         return
     
     # 기본 정보
-    cursor.execute(f"SELECT COUNT(*) FROM `{bird_table}`;")
-    total_count = cursor.fetchone()[0]
-    
-    cursor.execute(f"PRAGMA table_info(`{bird_table}`);")
-    columns_info = cursor.fetchall()
-    columns = [col[1] for col in columns_info]
+    total_count = profile.total_count
+    columns = profile.columns
     
     # 지역별 데이터 (시도)
     region_html = ""
@@ -222,8 +145,7 @@ def generate_detailed_html(file_path):
             break
     
     if sido_col:
-        cursor.execute(f"SELECT `{sido_col}`, COUNT(*) as count FROM `{bird_table}` WHERE `{sido_col}` IS NOT NULL GROUP BY `{sido_col}` ORDER BY count DESC LIMIT 10;")
-        region_data = cursor.fetchall()
+        region_data = profile.top_values(sido_col, 10)
         region_html = "<h3>🏙️ 시도별 사고 현황</h3><ul>"
         for region, count in region_data:
             percentage = (count / total_count) * 100
@@ -239,16 +161,13 @@ def generate_detailed_html(file_path):
             break
     
     if species_col:
-        cursor.execute(f"SELECT `{species_col}`, COUNT(*) as count FROM `{bird_table}` WHERE `{species_col}` IS NOT NULL GROUP BY `{species_col}` ORDER BY count DESC LIMIT 10;")
-        species_data = cursor.fetchall()
+        species_data = profile.top_values(species_col, 10)
         species_html = "<h3>🐦 조류 종별 사고 현황</h3><ul>"
         for species, count in species_data:
             percentage = (count / total_count) * 100
             species_html += f"<li><strong>{species}</strong>: {count:,}건 ({percentage:.1f}%)</li>"
         species_html += "</ul>"
     
-    conn.close()
-    
     # HTML 생성
     html_content = f"""
     <!DOCTYPE html>
@@ -5,63 +5,192 @@
 MCP 테스트용 데이터 준비
 """
 
+import argparse
+import os
+import tempfile
+import time
 import pandas as pd
 import sqlite3
 from datetime import datetime
 import re
 
-def generate_postgresql_insert_script():
-    """SQLite 데이터를 PostgreSQL INSERT 스크립트로 변환"""
+SOURCE_GPKG_PATH = '조류유리창_충돌사고_2023_2024_전국.gpkg'
+OUTPUT_SCRIPT_PATH = 'insert_bird_collision_data.sql'
+
+SOURCE_QUERY = """
+SELECT 
+    관찰번호,
+    조사연도,
+    관찰일자,
+    등록일자,
+    한글보통명,
+    철새유형명,
+    서식지유형명,
+    학명,
+    영문보통명,
+    한글계명,
+    한글문명,
+    한글강명,
+    한글목명,
+    한글과명,
+    한글속명,
+    종,
+    위도,
+    경도,
+    개체수,
+    시설물유형명,
+    버드세이버여부,
+    시도명
+FROM 조류유리창_충돌사고_2023_2024_전국
+WHERE 한글보통명 IS NOT NULL AND 한글보통명 != '동정불가'
+ORDER BY 관찰일자, 시도명
+"""
+
+# (원본 컬럼, PostgreSQL 컬럼, 변환 종류) - COPY 컬럼 순서
+COPY_COLUMNS = [
+    ('관찰번호', 'observation_number', 'text'),
+    ('조사연도', 'survey_year', 'int'),
+    ('관찰일자', 'observation_date', 'date'),
+    ('등록일자', 'registration_date', 'date'),
+    ('한글보통명', 'korean_common_name', 'text'),
+    ('철새유형명', 'migratory_type', 'text'),
+    ('서식지유형명', 'habitat_type', 'text'),
+    ('학명', 'scientific_name', 'text'),
+    ('영문보통명', 'english_name', 'text'),
+    ('한글계명', 'taxonomy_kingdom', 'text'),
+    ('한글문명', 'taxonomy_phylum', 'text'),
+    ('한글강명', 'taxonomy_class', 'text'),
+    ('한글목명', 'taxonomy_order', 'text'),
+    ('한글과명', 'taxonomy_family', 'text'),
+    ('한글속명', 'taxonomy_genus', 'text'),
+    ('종', 'taxonomy_species', 'text'),
+    ('위도', 'latitude', 'float'),
+    ('경도', 'longitude', 'float'),
+    ('개체수', 'individual_count', 'int'),
+    ('시설물유형명', 'facility_type', 'text'),
+    ('버드세이버여부', 'bird_saver_installed', 'bool'),
+    ('시도명', 'province', 'text'),
+]
+
+COPY_NULL = '\\N'
+TRUE_VALUES = ['Y', 'YES', 'TRUE', '1']
+
+def clean_source_frame(df):
+    """원본 데이터 정리 (INSERT/COPY 스크립트 공용)"""
+    df['관찰일자'] = pd.to_datetime(df['관찰일자'], errors='coerce')
+    df['등록일자'] = pd.to_datetime(df['등록일자'], errors='coerce')
+    df['개체수'] = pd.to_numeric(df['개체수'], errors='coerce').fillna(1)
+    df['위도'] = pd.to_numeric(df['위도'], errors='coerce')
+    df['경도'] = pd.to_numeric(df['경도'], errors='coerce')
     
-    print("🐦 PostgreSQL INSERT 스크립트 생성 중...")
+    # 결측값 처리
+    return df.dropna(subset=['한글보통명', '관찰일자'])
+
+def _copy_text_column(series, kind):
+    """컬럼 전체를 COPY text 형식 문자열로 변환 (NULL은 \\N)"""
+    missing = series.isna()
+    if kind == 'date':
+        out = series.dt.strftime('%Y-%m-%d')
+    elif kind == 'int':
+        out = pd.to_numeric(series, errors='coerce').round().astype('Int64').astype(str)
+        missing = missing | out.eq('<NA>')
+    elif kind == 'float':
+        out = series.astype(str)
+    elif kind == 'bool':
+        out = series.astype(str).str.strip().str.upper().isin(TRUE_VALUES).map({True: 't', False: 'f'})
+    else:
+        # COPY text 형식의 특수문자: 역슬래시, 탭(구분자), 개행
+        out = (series.astype(str)
+               .str.replace('\\', '\\\\', regex=False)
+               .str.replace('\t', '\\t', regex=False)
+               .str.replace('\n', '\\n', regex=False)
+               .str.replace('\r', '\\r', regex=False))
+    return out.mask(missing, COPY_NULL)
+
+def _copy_location_column(df):
+    """PostGIS location 컬럼 (EWKT, 좌표가 없으면 NULL)"""
+    missing = df['위도'].isna() | df['경도'].isna()
+    out = 'SRID=4326;POINT(' + df['경도'].astype(str) + ' ' + df['위도'].astype(str) + ')'
+    return out.mask(missing, COPY_NULL)
+
+def _copy_lines(df):
+    """정리된 청크 -> COPY text 행 문자열 (탭 구분, 행 단위 루프 없음)"""
+    columns = [_copy_text_column(df[source], kind) for source, _, kind in COPY_COLUMNS]
+    columns.append(_copy_location_column(df))
+    return columns[0].str.cat(columns[1:], sep='\t')
+
+def generate_postgresql_copy_script(output_path=OUTPUT_SCRIPT_PATH, source_path=SOURCE_GPKG_PATH,
+                                    chunk_rows=5000):
+    """SQLite 데이터를 psql용 COPY ... FROM STDIN 스크립트로 청크 단위 스트리밍"""
+    
+    print("🐦 PostgreSQL COPY 스크립트 생성 중...")
     
     try:
-        # SQLite에서 데이터 읽기
-        conn = sqlite3.connect('조류유리창_충돌사고_2023_2024_전국.gpkg')
+        started = time.perf_counter()
+        conn = sqlite3.connect(source_path)
         
-        query = """
-        SELECT 
-            관찰번호,
-            조사연도,
-            관찰일자,
-            등록일자,
-            한글보통명,
-            철새유형명,
-            서식지유형명,
-            학명,
-            영문보통명,
-            한글계명,
-            한글문명,
-            한글강명,
-            한글목명,
-            한글과명,
-            한글속명,
-            종,
-            위도,
-            경도,
-            개체수,
-            시설물유형명,
-            버드세이버여부,
-            시도명
-        FROM 조류유리창_충돌사고_2023_2024_전국
-        WHERE 한글보통명 IS NOT NULL AND 한글보통명 != '동정불가'
-        ORDER BY 관찰일자, 시도명
-        """
+        target_columns = [target for _, target, _ in COPY_COLUMNS] + ['location']
+        total_rows = 0
+        chunks = 0
+        
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("-- PostgreSQL 조류 충돌 데이터 삽입 스크립트 (COPY 형식)\n")
+            f.write("-- 생성일: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + "\n\n")
+            f.write("-- 데이터베이스 연결\n")
+            f.write("\\c bird_collision_db;\n\n")
+            f.write("-- 데이터 삽입 시작\n")
+            f.write("BEGIN;\n\n")
+            # location을 직접 채우므로 행 단위 트리거는 적재 동안만 끔 (updated_at은 DEFAULT 사용)
+            f.write("ALTER TABLE bird_collision_incidents DISABLE TRIGGER tr_update_location;\n\n")
+            f.write(f"COPY bird_collision_incidents ({', '.join(target_columns)}) FROM STDIN;\n")
+            
+            for chunk in pd.read_sql_query(SOURCE_QUERY, conn, chunksize=chunk_rows):
+                chunk = clean_source_frame(chunk)
+                if chunk.empty:
+                    continue
+                f.write('\n'.join(_copy_lines(chunk)))
+                f.write('\n')
+                total_rows += len(chunk)
+                chunks += 1
+            
+            f.write("\\.\n\n")
+            f.write("ALTER TABLE bird_collision_incidents ENABLE TRIGGER tr_update_location;\n\n")
+            f.write("COMMIT;\n\n")
+            f.write("-- 통계 업데이트\n")
+            f.write("ANALYZE bird_collision_incidents;\n\n")
+            f.write("-- 삽입 완료 확인\n")
+            f.write("SELECT COUNT(*) as total_records FROM bird_collision_incidents;\n")
+            f.write("SELECT province, COUNT(*) as incidents FROM bird_collision_incidents GROUP BY province ORDER BY incidents DESC;")
         
-        df = pd.read_sql_query(query, conn)
+        conn.close()
+        elapsed = time.perf_counter() - started
+        
+        print(f"📁 PostgreSQL COPY 스크립트 생성 완료:")
+        print(f"   파일명: {output_path}")
+        print(f"   크기: {os.path.getsize(output_path):,} 바이트")
+        print(f"   레코드 수: {total_rows:,}개 ({chunks}개 청크, {elapsed:.2f}초)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ 스크립트 생성 실패: {e}")
+        return False
+
+def generate_postgresql_insert_script(output_path=OUTPUT_SCRIPT_PATH, source_path=SOURCE_GPKG_PATH):
+    """SQLite 데이터를 PostgreSQL INSERT 스크립트로 변환 (기존 방식, 벤치마크 비교용)"""
+    
+    print("🐦 PostgreSQL INSERT 스크립트 생성 중...")
+    
+    try:
+        # SQLite에서 데이터 읽기
+        conn = sqlite3.connect(source_path)
+        df = pd.read_sql_query(SOURCE_QUERY, conn)
         conn.close()
         
         print(f"✅ 데이터 추출 완료: {len(df):,}개 레코드")
         
         # 데이터 정리
-        df['관찰일자'] = pd.to_datetime(df['관찰일자'], errors='coerce')
-        df['등록일자'] = pd.to_datetime(df['등록일자'], errors='coerce')
-        df['개체수'] = pd.to_numeric(df['개체수'], errors='coerce').fillna(1)
-        df['위도'] = pd.to_numeric(df['위도'], errors='coerce')
-        df['경도'] = pd.to_numeric(df['경도'], errors='coerce')
-        
-        # 결측값 처리
-        df = df.dropna(subset=['한글보통명', '관찰일자'])
+        df = clean_source_frame(df)
         
         print(f"📊 정리 후 데이터: {len(df):,}개 레코드")
         
@@ -104,7 +233,7 @@ def generate_postgresql_insert_script():
                         return "NULL"
                     if isinstance(val, str):
                         # SQL 인젝션 방지 및 특수문자 이스케이프
-                        val = val.replace("'", "''").replace("\\", "\\\\")
+                        val = val.replace("'", "''")
                         return f"'{val}'"
                     return str(val)
                 
@@ -146,11 +275,11 @@ def generate_postgresql_insert_script():
         
         # 파일로 저장
         script_content = "\n".join(insert_script)
-        with open("insert_bird_collision_data.sql", "w", encoding="utf-8") as f:
+        with open(output_path, "w", encoding="utf-8") as f:
             f.write(script_content)
         
         print(f"📁 PostgreSQL INSERT 스크립트 생성 완료:")
-        print(f"   파일명: insert_bird_collision_data.sql")
+        print(f"   파일명: {output_path}")
         print(f"   크기: {len(script_content):,} 문자")
         print(f"   배치 수: {total_batches}개")
         
@@ -160,6 +289,44 @@ def generate_postgresql_insert_script():
         print(f"❌ 스크립트 생성 실패: {e}")
         return False
 
+def benchmark_script_generators(source_path=SOURCE_GPKG_PATH, repeat=3):
+    """INSERT 스크립트 vs COPY 스크립트 생성 처리량 비교 (임시 파일 사용)"""
+    
+    conn = sqlite3.connect(source_path)
+    rows = len(clean_source_frame(pd.read_sql_query(SOURCE_QUERY, conn)))
+    conn.close()
+    
+    generators = {
+        'INSERT': generate_postgresql_insert_script,
+        'COPY': generate_postgresql_copy_script,
+    }
+    results = {}
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, generator in generators.items():
+            output_path = os.path.join(tmpdir, f"{name.lower()}.sql")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                if not generator(output_path=output_path, source_path=source_path):
+                    raise RuntimeError(f"{name} 스크립트 생성 실패")
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            results[name] = {
+                'seconds': round(best, 4),
+                'rows_per_second': round(rows / best) if best else None,
+                'bytes': os.path.getsize(output_path),
+            }
+    
+    print(f"\n⏱️ 스크립트 생성 벤치마크 ({rows:,}개 레코드, {repeat}회 중 최소)")
+    for name, result in results.items():
+        print(f"   • {name}: {result['seconds']:.3f}초, {result['rows_per_second']:,} rows/s, "
+              f"{result['bytes'] / (1024 * 1024):.2f} MB")
+    if results['COPY']['seconds']:
+        print(f"   • 속도 향상: {results['INSERT']['seconds'] / results['COPY']['seconds']:.1f}배")
+    
+    return results
+
 def create_mcp_test_queries():
     """MCP 테스트용 쿼리 모음 생성"""
     
@@ -296,10 +463,23 @@ ORDER BY 사고건수 DESC;
     print("📚 통합 쿼리 파일 생성: mcp_test_all_queries.sql")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PostgreSQL MCP 테스트 데이터 스크립트 생성")
+    parser.add_argument("--format", choices=["copy", "insert"], default="copy",
+                        help="데이터 적재 스크립트 형식 (기본: COPY)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="INSERT/COPY 스크립트 생성 처리량 비교만 수행")
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark_script_generators()
+        raise SystemExit(0)
+    
     print("🔧 PostgreSQL MCP 테스트 준비")
     print("=" * 60)
     
-    if generate_postgresql_insert_script():
+    generate_script = (generate_postgresql_copy_script if args.format == "copy"
+                       else generate_postgresql_insert_script)
+    if generate_script():
         create_mcp_test_queries()
         print("\n✅ PostgreSQL MCP 테스트 준비 완료!")
         print("\n📋 다음 단계:")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GeoPackage 데이터셋 프로파일 캐시
+데이터 테이블 선택, 컬럼 역할(지역/시간/조류/시설물), 타입, 고유값 수, NULL/빈 문자열 수, 상위 값 빈도를
+테이블 한 번 스캔으로 계산해 GeoPackage 옆(<파일>.profile.json)에 저장
+파일 크기/mtime이 바뀐 경우에만 다시 계산하므로 분석 스크립트는 매번 DB를 탐색하지 않음
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+# 프로파일 형식/계산 방식이 바뀌면 올려서 기존 캐시 무효화
+PROFILE_VERSION = 1
+PROFILE_SUFFIX = ".profile.json"
+
+# 컬럼마다 저장하는 상위 값 개수 (고유값이 이 이하이면 전체 빈도)
+TOP_VALUES = 50
+SAMPLE_ROWS = 3
+
+# 컬럼 이름 키워드 -> 역할 (대소문자 무시, 한 컬럼이 여러 역할을 가질 수 있음)
+ROLE_KEYWORDS = {
+    "region": ["시도", "시군구", "구", "시", "도", "지역", "행정구역", "region", "area"],
+    "time": ["날짜", "시간", "년", "월", "일", "일시", "date", "time", "발견", "신고"],
+    "species": ["종", "새", "조류", "species", "bird", "생물"],
+    "building": ["건물", "시설", "장소", "위치", "건축물", "building", "facility"],
+}
+ID_COLUMNS = ("fid", "id")
+GEOMETRY_COLUMNS = ("geom", "geometry", "shape")
+NUMERIC_TYPES = ("INT", "REAL", "FLOAT", "DOUBLE", "NUMERIC")
+
+# 데이터 테이블 후보에서 제외하는 내부 테이블 접두사
+_INTERNAL_PREFIXES = ("sqlite_", "gpkg_", "rtree_")
+# SQLite가 문자열을 숫자로 읽을 때 쓰는 앞쪽 숫자 부분 (없으면 0)
+_NUMERIC_PREFIX = re.compile(r"^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+
+
+def profile_path(file_path):
+    return file_path + PROFILE_SUFFIX
+
+
+def _source_signature(file_path):
+    st = os.stat(file_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def classify_column(name, geometry_columns=()):
+    """컬럼 이름 -> 역할 목록 (geometry/id는 단독, 키워드에 안 걸리면 other)"""
+    lowered = name.lower()
+    if name in geometry_columns or lowered in GEOMETRY_COLUMNS:
+        return ["geometry"]
+    if lowered in ID_COLUMNS:
+        return ["id"]
+    roles = [role for role, keywords in ROLE_KEYWORDS.items() if any(k in lowered for k in keywords)]
+    return roles or ["other"]
+
+
+def _choose_table(tables):
+    """데이터 테이블 선택: 레코드가 있는 테이블 중 이름에 조류/bird가 들어간 것, 없으면 가장 큰 것"""
+    data_tables = [t for t in tables if t["rows"] and not t["name"].startswith(_INTERNAL_PREFIXES)]
+    for table in data_tables:
+        if "조류" in table["name"] or "bird" in table["name"].lower():
+            return table["name"]
+    return max(data_tables, key=lambda t: t["rows"])["name"] if data_tables else None
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, bytes):
+        return None
+    if hasattr(value, "item"):  # NumPy 스칼라
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def sqlite_sort_key(value):
+    """SQLite 정렬 순서 (NULL < 숫자 < 문자열) - 타입이 섞인 컬럼도 비교 가능"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, str):
+        return (2, value)
+    return (1, value)
+
+
+def sqlite_float(value):
+    """SQLite에서 숫자로 쓰일 때의 값 (문자열은 앞쪽 숫자 부분, 없으면 0)"""
+    if isinstance(value, str):
+        match = _NUMERIC_PREFIX.match(value)
+        return float(match.group(1)) if match else 0.0
+    return float(value)
+
+
+def _value_order(item):
+    """빈도 내림차순, 같으면 값 순서 (GROUP BY ... ORDER BY count DESC 결과와 같은 순서)"""
+    value, count = item
+    return (-count, sqlite_sort_key(value))
+
+
+def _numeric_stats(values):
+    """SQL MIN/MAX/AVG/COUNT와 같은 결과 (NULL 제외, 숫자가 문자열보다 작음)"""
+    numbers = [v for v in values if not isinstance(v, str)]
+    texts = [v for v in values if isinstance(v, str)]
+    return {
+        "min": min(numbers) if numbers else min(texts),
+        "max": max(texts) if texts else max(numbers),
+        "avg": sum(sqlite_float(v) for v in values) / len(values),
+        "count": len(values),
+    }
+
+
+def _profile_column(series, info, geometry_columns):
+    roles = classify_column(info["name"], geometry_columns)
+    column = {
+        "name": info["name"],
+        "type": info["type"],
+        "notnull": info["notnull"],
+        "pk": info["pk"],
+        "roles": roles,
+    }
+    if series is None:  # geometry (BLOB)는 읽지 않음
+        return column
+
+    present = series[series.notna()]
+    counts = present.value_counts(sort=False)
+    values = sorted(((_json_value(v), int(c)) for v, c in counts.items()), key=_value_order)
+    column.update(
+        non_null=int(len(present)),
+        nulls=int(len(series) - len(present)),
+        empty=int((present == "").sum()),
+        distinct=int(len(counts)),
+        values=[[v, c] for v, c in values[:TOP_VALUES]],
+        values_complete=len(values) <= TOP_VALUES,
+    )
+    if any(t in info["type"].upper() for t in NUMERIC_TYPES) and len(present):
+        column["numeric"] = _numeric_stats([_json_value(v) for v in present if not isinstance(v, bytes)])
+    return column
+
+
+def build_profile(file_path):
+    """GeoPackage를 열어 프로파일 dict 계산 (데이터 테이블은 한 번만 스캔)"""
+    started = time.perf_counter()
+    conn = sqlite3.connect(file_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        tables = []
+        for (name,) in cursor.fetchall():
+            try:
+                cursor.execute(f"SELECT COUNT(*) FROM `{name}`;")
+                rows = cursor.fetchone()[0]
+            except sqlite3.Error as e:
+                rows, error = None, str(e)
+            else:
+                error = None
+            tables.append({"name": name, "rows": rows, **({"error": error} if error else {})})
+
+        table = _choose_table(tables)
+        profile = {
+            "version": PROFILE_VERSION,
+            "source": {"file": os.path.basename(file_path), **_source_signature(file_path)},
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tables": tables,
+            "table": table,
+            "total_count": 0,
+            "columns": [],
+            "sample_rows": [],
+        }
+        if table is None:
+            return profile
+
+        geometry_columns = set()
+        try:
+            cursor.execute("SELECT column_name FROM gpkg_geometry_columns WHERE table_name = ?", (table,))
+            geometry_columns = {row[0] for row in cursor.fetchall()}
+        except sqlite3.Error:
+            pass  # 일반 SQLite 파일
+
+        cursor.execute(f"PRAGMA table_info(`{table}`);")
+        infos = [{"name": name, "type": col_type or "", "notnull": bool(not_null), "pk": bool(pk)}
+                 for _, name, col_type, not_null, _, pk in cursor.fetchall()]
+        scanned = [info["name"] for info in infos
+                   if classify_column(info["name"], geometry_columns) != ["geometry"]]
+
+        # 한 번의 스캔으로 모든 컬럼 집계 (geometry BLOB은 제외)
+        # object dtype으로 읽어 NULL이 섞인 정수 컬럼도 float로 바뀌지 않게 (출력 값이 SQL 결과와 같도록)
+        select = ", ".join(f"`{name}`" for name in scanned)
+        cursor.execute(f"SELECT {select} FROM `{table}`")
+        frame = pd.DataFrame(cursor.fetchall(), columns=scanned, dtype=object)
+    finally:
+        conn.close()
+
+    profile["total_count"] = len(frame)
+    profile["columns"] = [
+        _profile_column(frame[info["name"]] if info["name"] in frame else None, info, geometry_columns)
+        for info in infos
+    ]
+    sample = frame.head(SAMPLE_ROWS)
+    profile["sample_rows"] = [[_json_value(v) for v in row] for row in sample.itertuples(index=False)]
+    profile["sample_columns"] = list(sample.columns)
+    profile["build_seconds"] = round(time.perf_counter() - started, 3)
+    return profile
+
+
+class DatasetProfile:
+    """프로파일 dict 조회 도우미"""
+
+    def __init__(self, data):
+        self.data = data
+        self.table = data["table"]
+        self.total_count = data["total_count"]
+        self.tables = data["tables"]
+        self.columns = [column["name"] for column in data["columns"]]
+        self._columns = {column["name"]: column for column in data["columns"]}
+
+    def column(self, name):
+        return self._columns[name]
+
+    def columns_with_role(self, role):
+        return [column["name"] for column in self.data["columns"] if role in column["roles"]]
+
+    def top_values(self, name, limit=10, exclude_empty=False):
+        """NULL을 뺀 값 빈도 상위 limit개 -> [(값, 건수)] (exclude_empty면 빈 문자열도 제외)
+
+        limit이 저장된 개수(TOP_VALUES)보다 크면 저장된 만큼만 반환
+        """
+        values = self._columns[name].get("values", [])
+        if exclude_empty:
+            values = [item for item in values if item[0] != ""]
+        return [tuple(item) for item in (values if limit is None else values[:limit])]
+
+    def sample_rows(self, columns=None):
+        """샘플 레코드 -> [{컬럼: 값}] (columns를 주면 그 컬럼만)"""
+        names = self.data.get("sample_columns", [])
+        rows = [dict(zip(names, row)) for row in self.data["sample_rows"]]
+        if columns is not None:
+            rows = [{name: row.get(name) for name in columns} for row in rows]
+        return rows
+
+
+def load_profile(file_path, refresh=False):
+    """저장된 프로파일이 원본과 맞으면 읽고, 아니면 다시 계산해 저장 -> DatasetProfile"""
+    path = profile_path(file_path)
+    signature = _source_signature(file_path)
+    if not refresh:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            source = data.get("source", {})
+            if (data.get("version") == PROFILE_VERSION and source.get("size") == signature["size"]
+                    and source.get("mtime_ns") == signature["mtime_ns"]):
+                return DatasetProfile(data)
+        except (OSError, ValueError):
+            pass
+
+    data = build_profile(file_path)
+    print(f"🔎 데이터셋 프로파일 생성: {data['table']} ({data['total_count']:,}개 레코드, "
+          f"{data.get('build_seconds', 0):.2f}초)")
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠️  프로파일 저장 실패 (메모리에서만 사용): {e}")
+    return DatasetProfile(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GeoPackage 데이터셋 프로파일 생성/확인")
+    parser.add_argument("path", nargs="?", default="조류유리창_충돌사고_2023_2024_전국.gpkg")
+    parser.add_argument("--refresh", action="store_true", help="저장된 프로파일을 무시하고 다시 계산")
+    args = parser.parse_args()
+
+    profile = load_profile(args.path, refresh=args.refresh)
+    print(f"📋 {args.path} -> {profile_path(args.path)}")
+    print(f"   테이블: {profile.table} ({profile.total_count:,}개 레코드)")
+    for column in profile.data["columns"]:
+        details = f"고유 {column['distinct']:,}, NULL {column['nulls']:,}, 빈값 {column['empty']:,}" \
+            if "distinct" in column else "집계 제외"
+        print(f"   • {column['name']:<20} {column['type'] or '-':<8} {','.join(column['roles']):<18} {details}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,64 +9,72 @@ import pandas as pd
 from datetime import datetime
 import os
 
+SOURCE_GPKG_PATH = "조류유리창_충돌사고_2023_2024_전국.gpkg"
+
+def load_source_dataframe(db_path=SOURCE_GPKG_PATH):
+    """GeoPackage에서 전체 데이터를 읽어 정리된 DataFrame 반환 (CSV/컬럼형 내보내기 공용)"""
+    conn = sqlite3.connect(db_path)
+    
+    # 전체 데이터 추출 쿼리
+    query = """
+    SELECT 
+        fid,
+        관찰번호,
+        조사연도,
+        관찰일자,
+        등록일자,
+        한글보통명 as 조류종,
+        철새유형명 as 철새유형,
+        서식지유형명 as 서식지유형,
+        학명,
+        영문보통명 as 영문명,
+        한글계명 as 계,
+        한글문명 as 문,
+        한글강명 as 강,
+        한글목명 as 목,
+        한글과명 as 과,
+        한글속명 as 속,
+        종,
+        위도,
+        경도,
+        개체수,
+        시설물유형명 as 시설물유형,
+        버드세이버여부,
+        시도명 as 시도
+    FROM 조류유리창_충돌사고_2023_2024_전국
+    ORDER BY 관찰일자, 시도명
+    """
+    
+    print("📊 데이터 추출 중...")
+    df = pd.read_sql_query(query, conn)
+    conn.close()
+    
+    # 데이터 정리
+    print(f"✅ 데이터 추출 완료: {len(df):,}개 레코드")
+    
+    # 날짜 형식 정리
+    df['관찰일자'] = pd.to_datetime(df['관찰일자'], errors='coerce').dt.strftime('%Y-%m-%d')
+    df['등록일자'] = pd.to_datetime(df['등록일자'], errors='coerce').dt.strftime('%Y-%m-%d')
+    
+    # 숫자 데이터 정리
+    df['개체수'] = pd.to_numeric(df['개체수'], errors='coerce').fillna(1)
+    df['위도'] = pd.to_numeric(df['위도'], errors='coerce').round(6)
+    df['경도'] = pd.to_numeric(df['경도'], errors='coerce').round(6)
+    
+    return df
+
 def export_to_csv():
-    """GeoPackage 데이터를 CSV로 내보내기"""
+    """GeoPackage 데이터를 CSV로 내보내기 -> 읽어 들인 DataFrame (실패 시 None, 컬럼형 내보내기에 재사용)"""
     try:
         print("🐦 조류 충돌 데이터 CSV 변환 시작...")
         
-        # GeoPackage 파일 연결
-        db_path = "조류유리창_충돌사고_2023_2024_전국.gpkg"
+        # GeoPackage 파일 확인
+        db_path = SOURCE_GPKG_PATH
         if not os.path.exists(db_path):
             print(f"❌ 파일을 찾을 수 없습니다: {db_path}")
-            return False
-        
-        conn = sqlite3.connect(db_path)
-        
-        # 전체 데이터 추출 쿼리
-        query = """
-        SELECT 
-            fid,
-            관찰번호,
-            조사연도,
-            관찰일자,
-            등록일자,
-            한글보통명 as 조류종,
-            철새유형명 as 철새유형,
-            서식지유형명 as 서식지유형,
-            학명,
-            영문보통명 as 영문명,
-            한글계명 as 계,
-            한글문명 as 문,
-            한글강명 as 강,
-            한글목명 as 목,
-            한글과명 as 과,
-            한글속명 as 속,
-            종,
-            위도,
-            경도,
-            개체수,
-            시설물유형명 as 시설물유형,
-            버드세이버여부,
-            시도명 as 시도
-        FROM 조류유리창_충돌사고_2023_2024_전국
-        ORDER BY 관찰일자, 시도명
-        """
-        
-        print("📊 데이터 추출 중...")
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+            return None
         
-        # 데이터 정리
-        print(f"✅ 데이터 추출 완료: {len(df):,}개 레코드")
-        
-        # 날짜 형식 정리
-        df['관찰일자'] = pd.to_datetime(df['관찰일자'], errors='coerce').dt.strftime('%Y-%m-%d')
-        df['등록일자'] = pd.to_datetime(df['등록일자'], errors='coerce').dt.strftime('%Y-%m-%d')
-        
-        # 숫자 데이터 정리
-        df['개체수'] = pd.to_numeric(df['개체수'], errors='coerce').fillna(1)
-        df['위도'] = pd.to_numeric(df['위도'], errors='coerce').round(6)
-        df['경도'] = pd.to_numeric(df['경도'], errors='coerce').round(6)
+        df = load_source_dataframe(db_path)
         
         # CSV 파일로 저장
         csv_filename = "조류유리창_충돌사고_2023_2024_전국.csv"
@@ -111,11 +119,11 @@ def export_to_csv():
         print(f"   크기: {sample_size:,}개 레코드")
         print(f"   용도: ChatGPT MCP 기능 테스트")
         
-        return True
+        return df
         
     except Exception as e:
         print(f"❌ CSV 변환 중 오류 발생: {e}")
-        return False
+        return None
 
 def create_data_dictionary():
     """데이터 딕셔너리 생성 (MCP 테스트 시 참고용)"""
@@ -171,8 +179,17 @@ if __name__ == "__main__":
     print("🔧 MCP 테스트를 위한 CSV 데이터 준비")
     print("=" * 60)
     
-    if export_to_csv():
+    df = export_to_csv()
+    if df is not None:
         create_data_dictionary()
+        
+        # 분석 스크립트용 컬럼형 사본 (pyarrow가 있을 때만)
+        from columnar_export import export_columnar, pa
+        if pa is not None:
+            # CSV 변환에서 읽은 프레임을 그대로 사용 (GeoPackage를 다시 읽지 않음)
+            export_columnar(df)
+        else:
+            print("\nℹ️ pyarrow 미설치 - Parquet/Arrow 내보내기 생략 (pip install pyarrow)")
         print("\n✅ 모든 작업 완료!")
         print("\n📋 ChatGPT MCP 테스트 방법:")
         print("1. '조류유리창_충돌사고_2023_2024_전국.csv' 파일을 ChatGPT에 업로드")
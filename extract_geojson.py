@@ -4,52 +4,48 @@
 조류 충돌사고 데이터를 GeoJSON으로 추출
 """
 
-import sqlite3
 import json
-import random
 
-def extract_bird_data_to_geojson(file_path, sample_size=1000):
-    """조류 충돌사고 데이터를 GeoJSON으로 추출"""
+import numpy as np
+
+from analytics_cube import (CATEGORICAL_COLUMNS, TABLE_NAME, cube_from_frame, load_collision_cube,
+                            read_collision_frame)
+
+GEOJSON_OUTPUT = '/Users/suntaekim/nie/bird_collision_data.geojson'
+STATISTICS_OUTPUT = '/Users/suntaekim/nie/bird_statistics.json'
+
+# GeoJSON 속성으로 쓰는 컬럼 (좌표 포함)
+GEOJSON_COLUMNS = ['위도', '경도', '한글보통명', '철새유형명', '시설물유형명', '관찰일자', '시도명', '서식지유형명', '개체수']
+
+def extract_bird_data_to_geojson(file_path, sample_size=1000, frame=None, output_path=GEOJSON_OUTPUT):
+    """조류 충돌사고 데이터를 GeoJSON으로 추출
+
+    frame: 이미 읽어 둔 테이블 DataFrame (GEOJSON_COLUMNS 포함) - 없으면 file_path에서 읽음
+    """
     print("=" * 60)
     print("조류 충돌사고 데이터 GeoJSON 추출")
     print("=" * 60)
     
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
-    
-    # 데이터 테이블에서 위치 정보와 상세 정보 추출
-    table_name = "조류유리창_충돌사고_2023_2024_전국"
+    if frame is None:
+        frame = read_collision_frame(file_path, TABLE_NAME, columns=GEOJSON_COLUMNS)
     
     # 전체 데이터 수 확인
-    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`;")
-    total_count = cursor.fetchone()[0]
+    total_count = len(frame)
     print(f"전체 데이터: {total_count:,}개")
     
-    # 샘플링을 위한 랜덤 시드 설정
-    random.seed(42)
+    # 위치 정보가 있는 행만 (NULL/빈 문자열 제외)
+    located = frame[frame['위도'].notna() & frame['경도'].notna()
+                    & (frame['위도'].astype(str) != '') & (frame['경도'].astype(str) != '')]
     
-    # 데이터 추출 (샘플링)
+    # 데이터 추출 (샘플링) - 시드 고정이라 같은 데이터면 같은 지점 선택
     if total_count > sample_size:
         print(f"성능을 위해 {sample_size:,}개 샘플 추출")
-        # 랜덤 샘플링
-        cursor.execute(f"""
-            SELECT 위도, 경도, 한글보통명, 철새유형명, 시설물유형명, 관찰일자, 시도명, 서식지유형명, 개체수
-            FROM `{table_name}` 
-            WHERE 위도 IS NOT NULL AND 경도 IS NOT NULL 
-            AND 위도 != '' AND 경도 != ''
-            ORDER BY RANDOM() 
-            LIMIT {sample_size}
-        """)
-    else:
-        cursor.execute(f"""
-            SELECT 위도, 경도, 한글보통명, 철새유형명, 시설물유형명, 관찰일자, 시도명, 서식지유형명, 개체수
-            FROM `{table_name}` 
-            WHERE 위도 IS NOT NULL AND 경도 IS NOT NULL 
-            AND 위도 != '' AND 경도 != ''
-        """)
-    
-    data = cursor.fetchall()
-    print(f"추출된 데이터: {len(data):,}개")
+        located = located.sample(n=min(sample_size, len(located)), random_state=42)
+    
+    # NULL은 None으로 (숫자 컬럼의 NaN도 아래 'or 기본값' 처리를 받도록)
+    located = located[GEOJSON_COLUMNS].astype(object)
+    data = located.where(located.notna(), None).itertuples(index=False, name=None)
+    print(f"추출된 데이터: {len(located):,}개")
     
     # GeoJSON 구조 생성
     geojson = {
@@ -92,63 +88,31 @@ def extract_bird_data_to_geojson(file_path, sample_size=1000):
     print(f"유효한 좌표 데이터: {valid_count:,}개")
     
     # GeoJSON 파일 저장
-    with open('/Users/suntaekim/nie/bird_collision_data.geojson', 'w', encoding='utf-8') as f:
+    with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(geojson, f, ensure_ascii=False, indent=2)
     
     print("✅ GeoJSON 파일 생성 완료: bird_collision_data.geojson")
     
-    conn.close()
     return valid_count
 
-def get_statistics_for_map(file_path):
-    """지도용 통계 데이터 생성"""
-    conn = sqlite3.connect(file_path)
-    cursor = conn.cursor()
-    
-    table_name = "조류유리창_충돌사고_2023_2024_전국"
+def get_statistics_for_map(file_path, cube=None, output_path=STATISTICS_OUTPUT):
+    """지도용 통계 데이터 생성 (cube: 이미 로드한 CollisionCube - 없으면 file_path에서 로드)"""
+    if cube is None:
+        cube = load_collision_cube(file_path, TABLE_NAME)
     
     # 시도별 통계
-    cursor.execute(f"""
-        SELECT 시도명, COUNT(*) as count 
-        FROM `{table_name}` 
-        WHERE 시도명 IS NOT NULL AND 시도명 != ''
-        GROUP BY 시도명 
-        ORDER BY count DESC
-    """)
-    sido_stats = cursor.fetchall()
-    
-    # 월별 통계
-    cursor.execute(f"""
-        SELECT strftime('%m', 관찰일자) as month, COUNT(*) as count 
-        FROM `{table_name}` 
-        WHERE 관찰일자 IS NOT NULL AND 관찰일자 != ''
-        GROUP BY month 
-        ORDER BY month
-    """)
-    monthly_stats = cursor.fetchall()
+    sido_stats = cube.group_count('시도명', cube.mask('시도명', exclude=['']))
+    
+    # 월별 통계 (관찰일자가 날짜로 해석되는 행만 - strftime('%m')이 NULL인 행 제외)
+    month = cube.numeric['관찰월']
+    month_counts = np.bincount(month[~np.isnan(month)].astype(int), minlength=13)
+    monthly_stats = [(f"{m:02d}", int(month_counts[m])) for m in range(1, 13) if month_counts[m]]
     
     # 조류 종별 통계
-    cursor.execute(f"""
-        SELECT 한글보통명, COUNT(*) as count 
-        FROM `{table_name}` 
-        WHERE 한글보통명 IS NOT NULL AND 한글보통명 != '' AND 한글보통명 != '동정불가'
-        GROUP BY 한글보통명 
-        ORDER BY count DESC 
-        LIMIT 10
-    """)
-    species_stats = cursor.fetchall()
+    species_stats = cube.group_count('한글보통명', cube.mask('한글보통명', exclude=['', '동정불가']))[:10]
     
     # 시설물 유형별 통계
-    cursor.execute(f"""
-        SELECT 시설물유형명, COUNT(*) as count 
-        FROM `{table_name}` 
-        WHERE 시설물유형명 IS NOT NULL AND 시설물유형명 != ''
-        GROUP BY 시설물유형명 
-        ORDER BY count DESC
-    """)
-    facility_stats = cursor.fetchall()
-    
-    conn.close()
+    facility_stats = cube.group_count('시설물유형명', cube.mask('시설물유형명', exclude=['']))
     
     # 통계 데이터를 JSON으로 저장
     stats_data = {
@@ -158,7 +122,7 @@ def get_statistics_for_map(file_path):
         "facility_stats": [{"name": name, "count": count} for name, count in facility_stats]
     }
     
-    with open('/Users/suntaekim/nie/bird_statistics.json', 'w', encoding='utf-8') as f:
+    with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(stats_data, f, ensure_ascii=False, indent=2)
     
     print("✅ 통계 데이터 JSON 파일 생성 완료: bird_statistics.json")
@@ -167,11 +131,14 @@ def get_statistics_for_map(file_path):
 def main():
     file_path = "조류유리창_충돌사고_2023_2024_전국.gpkg"
     
+    # 테이블은 한 번만 읽어 두 산출물이 공유
+    frame = read_collision_frame(file_path, TABLE_NAME, columns=CATEGORICAL_COLUMNS + ['개체수', '위도', '경도'])
+    
     # 1. GeoJSON 데이터 추출
-    valid_count = extract_bird_data_to_geojson(file_path, sample_size=2000)
+    valid_count = extract_bird_data_to_geojson(file_path, sample_size=2000, frame=frame)
     
     # 2. 통계 데이터 생성
-    stats = get_statistics_for_map(file_path)
+    stats = get_statistics_for_map(file_path, cube=cube_from_frame(frame))
     
     print(f"\n" + "=" * 60)
     print("✅ 데이터 추출 완료!")
@@ -1,24 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, url_for, Response
 from flask_cors import CORS
 import os
-from wordcloud import WordCloud
-import matplotlib
-matplotlib.use('Agg')  # GUI 없는 백엔드 사용
-import matplotlib.pyplot as plt
-import numpy as np
-import io
 import base64
-import re
-import PyPDF2
-from collections import Counter
 import os
 import json
-from datetime import datetime
-from PIL import Image, ImageDraw
 import tempfile
+import threading
+import time
+
+from wordcloud_text import (KOREAN_STOPWORDS, ENGLISH_STOPWORDS, PDF_MAX_PAGES,
+                            HangulSuffixStripper, PdfTextStream, TokenizerEngine, UserStopwordStore)
+from wordcloud_store import KEY_PATTERN, WordcloudStore, content_hash, make_key
+from wordcloud_jobs import DONE, JobQueue, QueueFullError
+from static_assets import StaticAssetCache
+from geojson_compact import encode_points, minify_geojson
+from wordcloud_render import IMAGE_MIME_TYPES, MASK_CACHE, render_wordcloud
 
 app = Flask(__name__)
 CORS(app)  # CORS 허용
@@ -44,34 +43,75 @@ def get_korean_font_path():
 
 KOREAN_FONT_PATH = get_korean_font_path()
 
+# 라우트에서 서빙하는 HTML 페이지 (이 목록에 없는 파일은 읽지 않음)
+HTML_PAGES = [
+    'index.html',
+    'bird_collision_analysis.html',
+    'bird_collision_dashboard.html',
+    'bird_collision_detailed_analysis.html',
+    'bird_collision_map.html',
+    'nie_multilingual.html',
+    'policy_recommendations.html',
+    'real_time_monitoring_dashboard.html',
+]
+
+# 사용자 정의 불용어 저장 파일 경로
+USER_STOPWORDS_FILE = 'user_stopwords.json'
+
+# 프로세스당 하나인 캐시/큐/토큰화 엔진 - init_services()에서 만든다.
+# 작업 큐와 PDF 풀의 spawn 워커는 이 스크립트를 __mp_main__으로 다시 import하므로
+# import 시점에는 아무것도 만들거나 시작하지 않는다.
+STATIC_PAGES = None
+MAP_DATA = None
+USER_STOPWORDS = None
+TOKENIZER = None
+RESULT_STORE = None
+JOB_QUEUE = None
+_services_lock = threading.Lock()
+
+def init_services():
+    """서버 프로세스의 싱글턴 생성 + 백그라운드 예열 시작 (처음 한 번만)"""
+    global STATIC_PAGES, MAP_DATA, USER_STOPWORDS, TOKENIZER, RESULT_STORE, JOB_QUEUE
+    with _services_lock:
+        if JOB_QUEUE is not None:
+            return
+        # Docker 환경에서는 /app 디렉토리 사용
+        STATIC_PAGES = StaticAssetCache('/app' if os.path.exists('/app') else os.getcwd(), HTML_PAGES)
+        # 지도 데이터: 들여쓰기 없는 GeoJSON과 컴팩트 바이너리(좌표 Float32 + 속성 딕셔너리 인덱스)
+        MAP_DATA = StaticAssetCache(STATIC_PAGES.base_dir, [], derived={
+            'bird_collision_data.geojson': ('bird_collision_data.geojson', minify_geojson, 'application/geo+json'),
+            'bird_collision_data.points.bin': ('bird_collision_data.geojson', encode_points, 'application/octet-stream'),
+        })
+        # 불용어 파일 캐시와 토큰화 엔진은 프로세스당 하나 (요청마다 다시 만들지 않음)
+        USER_STOPWORDS = UserStopwordStore(USER_STOPWORDS_FILE)
+        # 조사/어미 변이형('방음벽에서', '방음벽의')은 어간('방음벽')으로 합쳐서 집계
+        TOKENIZER = TokenizerEngine(USER_STOPWORDS, normalizer=HangulSuffixStripper())
+        # 콘텐츠 해시 기반 결과 저장소 (단어 빈도 / 렌더링 이미지)
+        RESULT_STORE = WordcloudStore()
+        # 무거운 생성 요청은 워커 프로세스에서 처리 (요청 스레드는 작업 id만 돌려줌)
+        JOB_QUEUE = JobQueue()
+        
+        # UI에서 고를 수 있는 모양/크기의 마스크와 페이지/지도 데이터를 미리 계산 (첫 요청부터 래스터화/압축 생략)
+        threading.Thread(target=MASK_CACHE.warm, name='mask-cache-warm', daemon=True).start()
+        threading.Thread(target=STATIC_PAGES.warm, name='static-pages-warm', daemon=True).start()
+        threading.Thread(target=MAP_DATA.warm, name='map-data-warm', daemon=True).start()
+
+@app.before_request
+def ensure_services():
+    """__main__ 밖에서 app을 띄운 경우(WSGI 서버 등) 첫 요청에서 초기화"""
+    if JOB_QUEUE is None:
+        init_services()
+
 def serve_html_file(filename):
-    """HTML 파일을 안전하게 서빙"""
+    """HTML 파일을 메모리 캐시에서 서빙 (사전 압축본 + ETag, 파일이 바뀐 경우에만 다시 읽음)"""
     try:
         if not filename.endswith('.html'):
             filename += '.html'
         
-        # Docker 환경에서는 /app 디렉토리 사용
-        base_dir = '/app' if os.path.exists('/app') else os.getcwd()
-        file_path = os.path.join(base_dir, filename)
-        
-        print(f"파일 경로 확인: {file_path}")
-        print(f"파일 존재 여부: {os.path.exists(file_path)}")
-        print(f"현재 디렉토리: {os.getcwd()}")
-        print(f"디렉토리 내용: {os.listdir(base_dir)}")
-        
-        if not os.path.exists(file_path):
-            return jsonify({
-                'error': f'파일을 찾을 수 없습니다: {filename}',
-                'path': file_path,
-                'base_dir': base_dir,
-                'files': os.listdir(base_dir)
-            }), 404
-            
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        from flask import Response
-        return Response(content, mimetype='text/html')
+        response = STATIC_PAGES.response(filename, request, Response)
+        if response is None:
+            return jsonify({'error': f'파일을 찾을 수 없습니다: {filename}'}), 404
+        return response
         
     except Exception as e:
         print(f"HTML 파일 서빙 오류: {e}")
@@ -79,41 +119,14 @@ def serve_html_file(filename):
         traceback.print_exc()
         return jsonify({'error': f'파일 읽기 오류: {str(e)}'}), 500
 
-# 사용자 정의 불용어 저장 파일 경로
-USER_STOPWORDS_FILE = 'user_stopwords.json'
-
 def load_user_stopwords():
-    """저장된 사용자 정의 불용어 로드"""
-    try:
-        if os.path.exists(USER_STOPWORDS_FILE):
-            with open(USER_STOPWORDS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return set(data.get('stopwords', []))
-        return set()
-    except Exception as e:
-        print(f"사용자 불용어 로드 오류: {e}")
-        return set()
+    """저장된 사용자 정의 불용어 로드 (파일이 바뀐 경우에만 다시 읽음)"""
+    return USER_STOPWORDS.get()
 
 def save_user_stopwords(new_stopwords):
     """사용자 정의 불용어 저장"""
     try:
-        # 기존 불용어 로드
-        existing_stopwords = load_user_stopwords()
-        
-        # 새로운 불용어 추가
-        updated_stopwords = existing_stopwords | new_stopwords
-        
-        # 저장할 데이터 구성
-        data = {
-            'stopwords': list(updated_stopwords),
-            'last_updated': datetime.now().isoformat(),
-            'total_count': len(updated_stopwords)
-        }
-        
-        # 파일에 저장
-        with open(USER_STOPWORDS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
+        updated_stopwords = USER_STOPWORDS.add(new_stopwords)
         print(f"사용자 불용어 저장 완료: {len(new_stopwords)}개 추가, 총 {len(updated_stopwords)}개")
         return True
     except Exception as e:
@@ -127,139 +140,40 @@ def get_user_stopwords_for_display():
 
 def get_korean_stopwords():
     """한국어 불용어 목록 (확장된 일반적인 불용어 사전)"""
-    return set([
-        # 조사
-        '이', '가', '을', '를', '에', '에서', '로', '으로', '와', '과', '의', '도', '은', '는',
-        '부터', '까지', '에게', '께', '한테', '에게서', '께서', '로서', '로써', '처럼', '같이',
-        '만큼', '보다', '밖에', '뿐', '조차', '마저', '라도', '나마', '이나', '이라도',
-        
-        # 어미
-        '다', '이다', '었다', '았다', '겠다', '하다', '되다', '있다', '없다', '같다', '이다',
-        '한다', '된다', '한다', '말다', '이며', '이고', '이거나', '거나', '든지', '던지',
-        
-        # 대명사
-        '그', '저', '이', '것', '그것', '저것', '이것', '여기', '거기', '저기', '이곳', '그곳',
-        '저곳', '누구', '무엇', '언제', '어디', '어떻게', '왜', '어느', '얼마', '몇',
-        
-        # 동사/형용사 기본형
-        '하다', '되다', '있다', '없다', '이다', '아니다', '그렇다', '이렇다', '저렇다',
-        '크다', '작다', '좋다', '나쁘다', '높다', '낮다', '많다', '적다', '길다', '짧다',
-        
-        # 부사
-        '더', '덜', '가장', '매우', '너무', '정말', '진짜', '참', '꽤', '상당히', '아주',
-        '조금', '약간', '살짝', '완전', '전혀', '별로', '거의', '대략', '약', '한',
-        '또', '다시', '또다시', '또한', '역시', '역시나', '물론', '당연히', '확실히',
-        
-        # 접속사
-        '그리고', '그런데', '그러나', '하지만', '그래서', '따라서', '그러므로', '왜냐하면',
-        '만약', '만일', '비록', '설령', '아무리', '혹시', '혹은', '또는', '아니면',
-        
-        # 감탄사
-        '아', '어', '오', '우', '에', '와', '어머', '어머나', '어머니', '어이', '음', '흠',
-        
-        # 의존명사
-        '것', '수', '점', '개', '번', '줄', '때', '시', '곳', '데', '바', '뿐', '지', '듯',
-        
-        # 기타 고빈도 기능어
-        '등', '같은', '다른', '새로운', '이런', '저런', '그런', '어떤', '모든', '각', '여러',
-        '일부', '전체', '전부', '부분', '대부분', '소부분', '약간의', '많은', '적은',
-        '있는', '없는', '한', '두', '세', '네', '다섯', '첫', '둘째', '셋째', '마지막',
-        
-        # 추가 불용어 (사용자 요청)
-        '있습니다', '대한', '있도록', '특히', '되는', '통한', '방면에서', '제공합니다', 
-        '이상', '관련', '같은', '이런', '위한', '대해', '통해', '위해', '때문에', '인해',
-        '따른', '따라', '경우', '때문', '관해', '대해서', '에서의', '으로서', '로서의',
-        '에서는', '에는', '으로의', '로의', '에의', '만의', '들의', '들은', '들이',
-        '들을', '라는', '이라는', '다는', '한다는', '된다는', '있다는', '없다는'
-    ])
+    return KOREAN_STOPWORDS
 
 def get_english_stopwords():
     """영어 불용어 목록 (확장된 일반적인 불용어 사전)"""
-    return set([
-        # 관사
-        'a', 'an', 'the',
-        
-        # 접속사
-        'and', 'or', 'but', 'nor', 'for', 'so', 'yet', 'because', 'since', 'as', 'while',
-        'although', 'though', 'unless', 'until', 'before', 'after', 'when', 'where',
-        'however', 'therefore', 'moreover', 'furthermore', 'nevertheless', 'nonetheless',
-        
-        # 전치사
-        'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'about', 'into',
-        'through', 'during', 'before', 'after', 'above', 'below', 'up', 'down', 'out',
-        'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there',
-        'between', 'among', 'across', 'around', 'behind', 'beside', 'beyond', 'inside',
-        'outside', 'toward', 'towards', 'within', 'without', 'upon', 'against',
-        
-        # be동사
-        'is', 'are', 'was', 'were', 'be', 'been', 'being',
-        
-        # 조동사
-        'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'done',
-        'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall',
-        
-        # 대명사
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-        'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'hers',
-        'ours', 'theirs', 'myself', 'yourself', 'himself', 'herself', 'itself',
-        'ourselves', 'yourselves', 'themselves', 'this', 'that', 'these', 'those',
-        'who', 'whom', 'whose', 'which', 'what', 'where', 'when', 'why', 'how',
-        
-        # 기타 고빈도 기능어
-        'not', 'no', 'nor', 'yes', 'all', 'any', 'both', 'each', 'few', 'more', 'most',
-        'other', 'some', 'such', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
-        'just', 'now', 'also', 'back', 'even', 'still', 'way', 'well', 'get', 'go',
-        'know', 'take', 'see', 'come', 'think', 'say', 'get', 'make', 'go', 'know',
-        'take', 'see', 'come', 'could', 'there', 'use', 'her', 'would', 'make',
-        'like', 'into', 'time', 'has', 'look', 'two', 'more', 'go', 'no', 'way',
-        'could', 'my', 'than', 'first', 'been', 'call', 'who', 'oil', 'sit', 'now',
-        'find', 'long', 'down', 'day', 'did', 'get', 'come', 'made', 'may', 'part'
-    ])
+    return ENGLISH_STOPWORDS
 
-def process_text(text, max_words=100, custom_stopwords=None):
-    """텍스트 전처리 및 단어 추출"""
-    print(f"원본 텍스트 길이: {len(text)}")
-    
-    # 특수문자 제거 및 소문자 변환
-    cleaned_text = re.sub(r'[^\w\s가-힣]', ' ', text.lower())
-    words = cleaned_text.split()
-    
-    print(f"초기 단어 수: {len(words)}")
-    
-    # 불용어 목록 준비
-    korean_stopwords = get_korean_stopwords()
-    english_stopwords = get_english_stopwords()
-    
-    # 저장된 사용자 불용어 로드
-    saved_user_stopwords = load_user_stopwords()
-    print(f"저장된 사용자 불용어: {len(saved_user_stopwords)}개")
-    
-    # 새로운 사용자 정의 불용어 처리
-    new_custom_stopwords = set()
+def apply_custom_stopwords(custom_stopwords):
+    """쉼표로 구분된 사용자 정의 불용어를 파싱하고 저장"""
+    new_custom_stopwords = frozenset()
     if custom_stopwords:
-        new_custom_stopwords = set([word.strip().lower() for word in custom_stopwords.split(',') if word.strip()])
-        print(f"새로운 사용자 정의 불용어: {new_custom_stopwords}")
+        new_custom_stopwords = frozenset(word.strip().lower() for word in custom_stopwords.split(',') if word.strip())
+        print(f"새로운 사용자 정의 불용어: {set(new_custom_stopwords)}")
         
         # 새로운 불용어 저장
         if new_custom_stopwords:
             save_user_stopwords(new_custom_stopwords)
+    return new_custom_stopwords
+
+def process_text(text, max_words=100, custom_stopwords=None):
+    """텍스트 전처리 및 단어 추출 (text는 문자열 또는 PdfTextStream 같은 텍스트 조각 iterable)"""
+    return count_top_words(text, max_words, apply_custom_stopwords(custom_stopwords))
+
+def count_top_words(text, max_words=100, extra_stopwords=frozenset()):
+    """토큰화 + 불용어(기본 + 저장된 + 요청별) 제거 + 상위 단어 빈도"""
+    if isinstance(text, str):
+        print(f"원본 텍스트 길이: {len(text)}")
     
-    # 모든 불용어 합치기 (기본 + 저장된 + 새로운)
-    all_stopwords = korean_stopwords | english_stopwords | saved_user_stopwords | new_custom_stopwords
-    print(f"전체 불용어 수: {len(all_stopwords)}")
-    
-    filtered_words = []
-    for word in words:
-        if (len(word) >= 2 and 
-            word not in all_stopwords and 
-            not word.isdigit()):
-            filtered_words.append(word)
+    word_freq = TOKENIZER.count_words(text, extra_stopwords)
+    most_common = word_freq.most_common(max_words)
     
-    print(f"필터링 후 단어 수: {len(filtered_words)}")
+    if isinstance(text, PdfTextStream):
+        print(f"PDF에서 추출된 텍스트 길이: {text.chars} ({text.pages_read}/{text.pages_total} 페이지)")
     
-    # 단어 빈도 계산
-    word_freq = Counter(filtered_words)
-    most_common = word_freq.most_common(max_words)
+    print(f"고유 단어 수: {len(word_freq)}")
     
     print(f"최종 추출 단어 수: {len(most_common)}")
     print(f"상위 10개 단어: {most_common[:10]}")
@@ -267,141 +181,124 @@ def process_text(text, max_words=100, custom_stopwords=None):
     return dict(most_common)
 
 def extract_text_from_pdf(file):
-    """PDF에서 텍스트 추출"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        
-        for page in pdf_reader.pages:
-            text += page.extract_text() + " "
-        
-        print(f"PDF에서 추출된 텍스트 길이: {len(text)}")
-        return text.strip()
-    
-    except Exception as e:
-        print(f"PDF 처리 오류: {e}")
-        raise Exception(f"PDF 파일을 처리할 수 없습니다: {str(e)}")
-
-def create_shape_mask(shape, width, height):
-    """다양한 모양의 마스크 생성"""
-    mask = Image.new('RGB', (width, height), 'white')
-    draw = ImageDraw.Draw(mask)
-    
-    center_x, center_y = width // 2, height // 2
-    # 원형일 때는 더 크게, 다른 모양일 때는 적당히
-    if shape == 'circle':
-        size = min(width, height) // 2.2  # 원형을 더 크게
-    else:
-        size = min(width, height) // 3
-    
-    if shape == 'circle':
-        # 완벽한 원형 생성
-        draw.ellipse([center_x - size, center_y - size, 
-                     center_x + size, center_y + size], fill='black')
-        # 가장자리를 부드럽게 하기 위해 작은 원 추가
-        for i in range(3):
-            offset = i * 2
-            draw.ellipse([center_x - size + offset, center_y - size + offset, 
-                         center_x + size - offset, center_y + size - offset], fill='black')
-    
-    elif shape == 'heart':
-        # 하트 모양 그리기
-        heart_points = []
-        for t in np.arange(0, 2 * np.pi, 0.1):
-            x = 16 * np.sin(t)**3
-            y = 13 * np.cos(t) - 5 * np.cos(2*t) - 2 * np.cos(3*t) - np.cos(4*t)
-            heart_points.append((center_x + x * size//20, center_y - y * size//20))
-        draw.polygon(heart_points, fill='black')
-    
-    elif shape == 'diamond':
-        points = [
-            (center_x, center_y - size),
-            (center_x + size, center_y),
-            (center_x, center_y + size),
-            (center_x - size, center_y)
-        ]
-        draw.polygon(points, fill='black')
-    
-    elif shape == 'triangle':
-        points = [
-            (center_x, center_y - size),
-            (center_x + size, center_y + size//2),
-            (center_x - size, center_y + size//2)
-        ]
-        draw.polygon(points, fill='black')
-    
-    elif shape == 'pentagon':
-        points = []
-        for i in range(5):
-            angle = i * 2 * np.pi / 5 - np.pi/2
-            x = center_x + size * np.cos(angle)
-            y = center_y + size * np.sin(angle)
-            points.append((x, y))
-        draw.polygon(points, fill='black')
-    
-    elif shape == 'star':
-        points = []
-        for i in range(10):
-            angle = i * np.pi / 5 - np.pi/2
-            radius = size if i % 2 == 0 else size * 0.4
-            x = center_x + radius * np.cos(angle)
-            y = center_y + radius * np.sin(angle)
-            points.append((x, y))
-        draw.polygon(points, fill='black')
-    
-    return np.array(mask)
+    """PDF에서 텍스트 추출 (페이지 단위로 토큰화기에 흘려보내는 스트림, 페이지 수/시간 한도 적용)"""
+    return PdfTextStream(file)
+
+def source_key(text):
+    """입력 원본의 콘텐츠 해시 (PDF는 파일 바이트 + 페이지 한도)"""
+    if isinstance(text, PdfTextStream):
+        return ['pdf', content_hash(text.file), PDF_MAX_PAGES]
+    return ['text', content_hash(text)]
+
+def frequencies_key(source, word_count, extra_stopwords):
+    """단어 빈도 캐시 키 - 원본, 단어 수, 적용되는 사용자 불용어 전체"""
+    return make_key('frequencies', source, word_count, sorted(load_user_stopwords() | extra_stopwords))
+
+def image_key(freq_key, shape, color_mode, width, height, image_format):
+    return make_key('image', freq_key, shape, color_mode, width, height, image_format)
+
+def get_rendered_image(freq_key, word_freq, shape, color_mode, width, height, image_format):
+    """저장소에 있으면 재사용, 없으면 렌더링 후 저장 -> (키, 이미지 바이트)"""
+    key = image_key(freq_key, shape, color_mode, width, height, image_format)
+    image_bytes = RESULT_STORE.get_image(key, image_format)
+    if image_bytes is None:
+        print(f"워드클라우드 생성: {shape}, {color_mode}, {width}x{height}")
+        image_bytes = render_wordcloud(word_freq, shape, color_mode, width, height,
+                                       KOREAN_FONT_PATH, image_format)
+        RESULT_STORE.put_image(key, image_format, image_bytes)
+    return key, image_bytes
+
+def wordcloud_result(key, image_format, word_freq_count, shape, cached):
+    """생성 결과 응답 본문 (동기 응답과 작업 조회에서 공통)"""
+    return {
+        'success': True,
+        'image_id': key,
+        'image_url': url_for('serve_image', key=key, ext=image_format),
+        'download_url': url_for('download_wordcloud', id=key, format=image_format),
+        'mime_type': IMAGE_MIME_TYPES[image_format],
+        'word_count': word_freq_count,
+        'shape': shape,
+        'cached': cached,
+        'message': f'워드클라우드 생성 완료! ({word_freq_count}개 단어)'
+    }
 
-def create_wordcloud(word_freq, shape='circle', color_mode='color', width=600, height=450):
-    """워드클라우드 생성"""
-    print(f"워드클라우드 생성: {shape}, {color_mode}, {width}x{height}")
-    
-    # 색상 설정
-    if color_mode == 'grayscale':
-        colormap = 'gray'
-    else:
-        colormap = 'viridis'
-    
-    # WordCloud 기본 설정
-    wc_config = {
+def submit_wordcloud_job(text, freq_key, word_freq, word_count, extra_stopwords,
+                         shape, color_mode, width, height, image_format, frequencies_cached=True):
+    """작업 큐에 등록 -> Job (결과 빈도/이미지는 끝날 때 RESULT_STORE에 저장)
+    
+    word_freq를 주면 워커는 렌더링만 하고 text는 쓰지 않는다.
+    """
+    params = {
+        'word_freq': list(word_freq.items()) if word_freq is not None else None,
+        'word_count': word_count,
+        'extra_stopwords': sorted(extra_stopwords),
+        'user_stopwords_file': os.path.abspath(USER_STOPWORDS_FILE),
+        'font_path': KOREAN_FONT_PATH,
+        'shape': shape,
+        'color_mode': color_mode,
         'width': width,
         'height': height,
-        'background_color': 'white',
-        'max_words': len(word_freq),
-        'colormap': colormap,
-        'font_path': KOREAN_FONT_PATH if KOREAN_FONT_PATH and os.path.exists(KOREAN_FONT_PATH) else None,
-        'relative_scaling': 0.5,
-        'min_font_size': 12,
-        'max_font_size': 100,
-        'prefer_horizontal': 0.7
+        'image_format': image_format,
     }
+    cleanup = None
+    if isinstance(text, PdfTextStream):
+        # 업로드 스트림은 요청이 끝나면 닫히므로 워커가 읽을 임시 파일로 복사
+        fd, pdf_path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(fd, 'wb') as out:
+            text.file.seek(0)
+            out.write(text.file.read())
+        params['pdf_path'] = pdf_path
+        
+        def remove_pdf():
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+        cleanup = remove_pdf
+    else:
+        params['text'] = text
+    
+    def on_finish(job):
+        result = job.result
+        key = freq_key
+        if result.get('computed_frequencies'):
+            if result.get('pdf_timed_out'):
+                key = make_key(freq_key, 'partial', result['pdf_pages'])
+            else:
+                RESULT_STORE.put_frequencies(freq_key, result['word_freq'])
+        image = image_key(key, shape, color_mode, width, height, image_format)
+        RESULT_STORE.put_image(image, image_format, result['image'])
+        # 이미지 바이트는 저장소에만 두고 작업에는 응답에 필요한 값만 보관
+        job.result = {
+            'image_id': image,
+            'image_format': image_format,
+            'word_count': len(result['word_freq']),
+            'shape': shape,
+            'cached': frequencies_cached and not result.get('computed_frequencies'),
+        }
+        if 'pdf_pages' in result:
+            job.result['pdf_pages'] = result['pdf_pages']
+            job.result['pdf_truncated'] = result['pdf_truncated']
     
-    # 모든 모양에 대해 마스크 사용 (원형 포함)
-    mask = create_shape_mask(shape, width, height)
-    wc_config['mask'] = mask
-    # 마스크 사용시 추가 설정
-    wc_config['mode'] = 'RGBA'
-    wc_config['max_words'] = len(word_freq)
-    wc_config['contour_width'] = 0
-    wc_config['contour_color'] = 'steelblue'
-    
-    # 워드클라우드 생성
-    wc = WordCloud(**wc_config).generate_from_frequencies(word_freq)
-    
-    # 이미지 생성
-    plt.figure(figsize=(width/100, height/100))
-    plt.imshow(wc, interpolation='bilinear')
-    plt.axis('off')
-    plt.tight_layout(pad=0)
-    
-    # 이미지를 base64로 인코딩
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=100)
-    img_buffer.seek(0)
-    
-    img_b64 = base64.b64encode(img_buffer.getvalue()).decode()
-    plt.close()
-    
-    return img_b64
+    try:
+        return JOB_QUEUE.submit(params, on_finish=on_finish, cleanup=cleanup)
+    except Exception:
+        if cleanup is not None:
+            cleanup()
+        raise
+
+def job_response(job):
+    """작업 상태 응답 (끝났으면 이미지 URL 포함)"""
+    body = job.to_dict()
+    body['status_url'] = url_for('get_job', job_id=job.id)
+    if job.status == DONE:
+        result = job.result
+        body.update(wordcloud_result(result['image_id'], result['image_format'],
+                                     result['word_count'], result['shape'], result['cached']))
+        if 'pdf_pages' in result:
+            body['pdf_pages'] = result['pdf_pages']
+            body['pdf_truncated'] = result['pdf_truncated']
+    elif job.error:
+        body['success'] = False
+    return body
 
 @app.route('/')
 def index():
@@ -460,24 +357,41 @@ def favicon():
 @app.route('/health')
 def health():
     """Health check for Docker"""
-    return jsonify({'status': 'healthy', 'service': 'wordcloud'}), 200
+    return jsonify({
+        'status': 'healthy',
+        'service': 'wordcloud',
+        'mask_cache': MASK_CACHE.health(),
+        'result_store': RESULT_STORE.health(),
+        'jobs': JOB_QUEUE.health(),
+        'static_pages': STATIC_PAGES.health(),
+        'map_data': MAP_DATA.health()
+    }), 200
 
 # 데이터 파일 서빙 라우트
 @app.route('/bird_collision_data.geojson')
 def serve_geojson():
-    """조류 충돌 GeoJSON 데이터 서빙"""
+    """조류 충돌 GeoJSON 데이터 서빙 (minified + 사전 압축, ETag/Range 지원)"""
     try:
-        base_dir = '/app' if os.path.exists('/app') else os.getcwd()
-        file_path = os.path.join(base_dir, 'bird_collision_data.geojson')
-        
-        if not os.path.exists(file_path):
+        response = MAP_DATA.response('bird_collision_data.geojson', request, Response)
+        if response is None:
             return jsonify({'error': 'GeoJSON 파일을 찾을 수 없습니다'}), 404
-            
-        return send_file(file_path, mimetype='application/json')
+        return response
     except Exception as e:
         print(f"GeoJSON 서빙 오류: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/bird_collision_data.points.bin')
+def serve_geojson_compact():
+    """조류 충돌 지점 컴팩트 바이너리 (형식은 geojson_compact.py 참고)"""
+    try:
+        response = MAP_DATA.response('bird_collision_data.points.bin', request, Response)
+        if response is None:
+            return jsonify({'error': 'GeoJSON 파일을 찾을 수 없습니다'}), 404
+        return response
+    except Exception as e:
+        print(f"지도 데이터 서빙 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/bird_statistics.json')
 def serve_statistics():
     """조류 통계 JSON 데이터 서빙"""
@@ -545,6 +459,12 @@ def generate_wordcloud():
         word_count = int(request.form.get('word_count', 100))
         canvas_size = request.form.get('canvas_size', '600,450')
         custom_stopwords = request.form.get('custom_stopwords', '')
+        image_format = request.form.get('image_format', 'png').lower()
+        if image_format not in IMAGE_MIME_TYPES:
+            image_format = 'png'
+        inline_image = request.form.get('inline_image', '').lower() in ('1', 'true', 'yes')
+        # async=1이면 작업 id만 바로 돌려주고 /jobs/<id>로 결과 조회
+        run_async = request.form.get('async', request.args.get('async', '')).lower() in ('1', 'true', 'yes')
         
         width, height = map(int, canvas_size.split(','))
         
@@ -554,25 +474,188 @@ def generate_wordcloud():
             if pdf_file and pdf_file.filename.endswith('.pdf'):
                 text = extract_text_from_pdf(pdf_file)
         
-        if not text or len(text.strip()) < 50:
+        is_pdf = isinstance(text, PdfTextStream)
+        if not is_pdf and (not text or len(text.strip()) < 50):
             return jsonify({'error': '최소 50자 이상의 텍스트가 필요합니다.'}), 400
         
-        # 텍스트 처리
-        word_freq = process_text(text, word_count, custom_stopwords)
+        # 같은 원본/단어 수/불용어면 저장된 단어 빈도 재사용
+        extra_stopwords = apply_custom_stopwords(custom_stopwords)
+        freq_key = frequencies_key(source_key(text), word_count, extra_stopwords)
+        word_freq = RESULT_STORE.get_frequencies(freq_key)
+        cached = word_freq is not None
+        
+        if run_async:
+            key = image_key(freq_key, shape, color_mode, width, height, image_format)
+            if cached and RESULT_STORE.get_image(key, image_format) is not None:
+                job = JOB_QUEUE.complete({'image_id': key, 'image_format': image_format,
+                                          'word_count': len(word_freq), 'shape': shape, 'cached': True})
+            else:
+                try:
+                    job = submit_wordcloud_job(text, freq_key, word_freq, word_count, extra_stopwords,
+                                               shape, color_mode, width, height, image_format)
+                except QueueFullError as e:
+                    response = jsonify({'error': str(e)})
+                    response.headers['Retry-After'] = '5'
+                    return response, 429
+            response = jsonify(job_response(job))
+            response.headers['Location'] = url_for('get_job', job_id=job.id)
+            return response, 202
+        
+        if not cached:
+            # 텍스트 처리 (PDF는 페이지를 추출하는 대로 집계)
+            word_freq = count_top_words(text, word_count, extra_stopwords)
+            
+            if is_pdf and text.chars < 50:
+                return jsonify({'error': '최소 50자 이상의 텍스트가 필요합니다.'}), 400
+            
+            if not word_freq:
+                return jsonify({'error': '분석할 수 있는 단어를 찾을 수 없습니다.'}), 400
+            
+            if is_pdf and text.timed_out:
+                # 시간 한도로 잘린 결과는 다음 요청에서 달라질 수 있으므로 빈도는 저장하지 않음
+                freq_key = make_key(freq_key, 'partial', text.pages_read)
+            else:
+                RESULT_STORE.put_frequencies(freq_key, word_freq)
+        
+        # 워드클라우드 생성 (이미지는 별도 키로 저장, 응답에는 URL만)
+        key, image_bytes = get_rendered_image(freq_key, word_freq, shape, color_mode,
+                                              width, height, image_format)
+        
+        result = wordcloud_result(key, image_format, len(word_freq), shape, cached)
+        if inline_image:
+            result['image'] = base64.b64encode(image_bytes).decode()
+        if is_pdf and not cached:
+            result['pdf_pages'] = text.pages_read
+            result['pdf_truncated'] = text.truncated
+        return jsonify(result)
+    
+    except Exception as e:
+        print(f"오류 발생: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# 배치 요청당 최대 변형 수
+BATCH_MAX_VARIANTS = int(os.environ.get('WORDCLOUD_BATCH_MAX_VARIANTS', 12))
+
+def parse_variant(raw, defaults):
+    """배치 변형 하나 -> (shape, color_mode, width, height, word_count, image_format)"""
+    variant = dict(defaults, **raw)
+    canvas_size = variant['canvas_size']
+    if isinstance(canvas_size, str):
+        canvas_size = canvas_size.split(',')
+    width, height = (int(v) for v in canvas_size)
+    image_format = str(variant['image_format']).lower()
+    if image_format not in IMAGE_MIME_TYPES:
+        image_format = 'png'
+    word_count = int(variant['word_count'])
+    if width <= 0 or height <= 0 or word_count <= 0:
+        raise ValueError(f'잘못된 변형 값입니다: {raw}')
+    return str(variant['shape']), str(variant['color_mode']), width, height, word_count, image_format
+
+@app.route('/generate/batch', methods=['POST'])
+def generate_wordcloud_batch():
+    """워드클라우드 배치 생성 API - 한 원본을 한 번만 토큰화하고 여러 모양/색상/크기로 병렬 렌더링
+    
+    variants: JSON 목록 [{"shape": "heart", "color_mode": "blue", "canvas_size": "800,600", "word_count": 80}, ...]
+    (빠진 값은 폼의 shape/color_mode/canvas_size/word_count/image_format 값 사용)
+    """
+    try:
+        text = request.form.get('text', '')
+        custom_stopwords = request.form.get('custom_stopwords', '')
+        run_async = request.form.get('async', request.args.get('async', '')).lower() in ('1', 'true', 'yes')
+        defaults = {
+            'shape': request.form.get('shape', 'circle'),
+            'color_mode': request.form.get('color_mode', 'color'),
+            'canvas_size': request.form.get('canvas_size', '600,450'),
+            'word_count': request.form.get('word_count', 100),
+            'image_format': request.form.get('image_format', 'png'),
+        }
+        try:
+            raw_variants = json.loads(request.form.get('variants', '[]'))
+            if not isinstance(raw_variants, list) or not all(isinstance(v, dict) for v in raw_variants):
+                raise ValueError('variants는 객체 목록이어야 합니다.')
+            variants = [parse_variant(raw, defaults) for raw in raw_variants]
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'변형 목록 형식 오류: {e}'}), 400
+        if not variants:
+            return jsonify({'error': '생성할 변형(variants)이 없습니다.'}), 400
+        if len(variants) > BATCH_MAX_VARIANTS:
+            return jsonify({'error': f'변형은 최대 {BATCH_MAX_VARIANTS}개까지 요청할 수 있습니다.'}), 400
         
-        if not word_freq:
-            return jsonify({'error': '분석할 수 있는 단어를 찾을 수 없습니다.'}), 400
+        if 'pdf_file' in request.files:
+            pdf_file = request.files['pdf_file']
+            if pdf_file and pdf_file.filename.endswith('.pdf'):
+                text = extract_text_from_pdf(pdf_file)
         
-        # 워드클라우드 생성
-        img_b64 = create_wordcloud(word_freq, shape, color_mode, width, height)
+        is_pdf = isinstance(text, PdfTextStream)
+        if not is_pdf and (not text or len(text.strip()) < 50):
+            return jsonify({'error': '최소 50자 이상의 텍스트가 필요합니다.'}), 400
         
-        return jsonify({
-            'success': True,
-            'image': img_b64,
-            'word_count': len(word_freq),
-            'shape': shape,
-            'message': f'워드클라우드 생성 완료! ({len(word_freq)}개 단어)'
-        })
+        # 단어 수별 빈도 키 (저장소에 있으면 그대로 사용)
+        extra_stopwords = apply_custom_stopwords(custom_stopwords)
+        source = source_key(text)
+        freq_keys = {}
+        frequencies = {}
+        for word_count in sorted({variant[4] for variant in variants}):
+            freq_keys[word_count] = frequencies_key(source, word_count, extra_stopwords)
+            cached_freq = RESULT_STORE.get_frequencies(freq_keys[word_count])
+            if cached_freq is not None:
+                frequencies[word_count] = cached_freq
+        cached_counts = set(frequencies)
+        
+        pdf_info = None
+        missing = [word_count for word_count in freq_keys if word_count not in frequencies]
+        if missing:
+            # 가장 큰 단어 수로 한 번만 토큰화 - 작은 단어 수의 결과는 상위 목록의 앞부분과 같음
+            top_words = list(count_top_words(text, max(missing), extra_stopwords).items())
+            if is_pdf and text.chars < 50:
+                return jsonify({'error': '최소 50자 이상의 텍스트가 필요합니다.'}), 400
+            if not top_words:
+                return jsonify({'error': '분석할 수 있는 단어를 찾을 수 없습니다.'}), 400
+            if is_pdf:
+                pdf_info = {'pdf_pages': text.pages_read, 'pdf_truncated': text.truncated}
+            for word_count in missing:
+                frequencies[word_count] = dict(top_words[:word_count])
+                if is_pdf and text.timed_out:
+                    freq_keys[word_count] = make_key(freq_keys[word_count], 'partial', text.pages_read)
+                else:
+                    RESULT_STORE.put_frequencies(freq_keys[word_count], frequencies[word_count])
+        
+        # 변형별 렌더링은 작업 큐 워커 프로세스에 나눠서 병렬 처리
+        jobs = []
+        try:
+            for shape, color_mode, width, height, word_count, image_format in variants:
+                word_freq = frequencies[word_count]
+                key = image_key(freq_keys[word_count], shape, color_mode, width, height, image_format)
+                if RESULT_STORE.get_image(key, image_format) is not None:
+                    jobs.append(JOB_QUEUE.complete({'image_id': key, 'image_format': image_format,
+                                                    'word_count': len(word_freq), 'shape': shape,
+                                                    'cached': True}))
+                else:
+                    jobs.append(submit_wordcloud_job(None, freq_keys[word_count], word_freq, word_count,
+                                                     extra_stopwords, shape, color_mode, width, height,
+                                                     image_format, word_count in cached_counts))
+        except QueueFullError as e:
+            for job in jobs:
+                JOB_QUEUE.cancel(job.id)
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = '5'
+            return response, 429
+        
+        if not run_async:
+            deadline = time.time() + JOB_QUEUE.timeout
+            for job in jobs:
+                job.done_event.wait(max(0, deadline - time.time()))
+        
+        results = [job_response(job) for job in jobs]
+        body = {
+            'success': all(result.get('success') for result in results) if not run_async else True,
+            'variants': results,
+            'message': (f'워드클라우드 {len(jobs)}개 변형 생성 요청 접수' if run_async
+                        else f'워드클라우드 {len(jobs)}개 변형 생성 완료!')
+        }
+        if pdf_info:
+            body.update(pdf_info)
+        return jsonify(body), 202 if run_async else 200
     
     except Exception as e:
         print(f"오류 발생: {e}")
@@ -597,8 +680,7 @@ def get_saved_stopwords():
 def clear_saved_stopwords():
     """저장된 사용자 불용어 초기화"""
     try:
-        if os.path.exists(USER_STOPWORDS_FILE):
-            os.remove(USER_STOPWORDS_FILE)
+        USER_STOPWORDS.clear()
         
         return jsonify({
             'success': True,
@@ -607,12 +689,58 @@ def clear_saved_stopwords():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태 조회 (?wait=초 를 주면 끝날 때까지 최대 그만큼 대기하는 long-poll)"""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        wait = 0
+    job = JOB_QUEUE.wait(job_id, wait)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다. (만료되었거나 잘못된 id)'}), 404
+    return jsonify(job_response(job))
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """작업 취소 (실행 중이면 해당 워커 프로세스를 종료)"""
+    job = JOB_QUEUE.cancel(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다. (만료되었거나 잘못된 id)'}), 404
+    return jsonify(job_response(job))
+
+def _stored_image_response(key, image_format):
+    """저장소의 이미지를 ETag/장기 캐시 헤더와 함께 응답 (키가 내용 해시라 변하지 않음)"""
+    if not KEY_PATTERN.match(key) or image_format not in IMAGE_MIME_TYPES:
+        return None
+    image_bytes = RESULT_STORE.get_image(key, image_format)
+    if image_bytes is None:
+        return None
+    response = Response(image_bytes, mimetype=IMAGE_MIME_TYPES[image_format])
+    response.set_etag(key)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
+
+@app.route('/image/<key>.<ext>')
+def serve_image(key, ext):
+    """생성된 워드클라우드 이미지 (원본 바이트)"""
+    response = _stored_image_response(key, ext)
+    if response is None:
+        return jsonify({'error': '이미지를 찾을 수 없습니다. 다시 생성해 주세요.'}), 404
+    return response
+
 @app.route('/download')
 def download_wordcloud():
-    """워드클라우드 이미지 다운로드"""
-    # 세션이나 임시 저장소에서 이미지를 가져와서 다운로드 제공
-    # 현재는 간단한 구현
-    return jsonify({'message': '다운로드 기능은 프론트엔드에서 구현됩니다.'})
+    """워드클라우드 이미지 다운로드 (/download?id=<키>&format=png)"""
+    key = request.args.get('id', '')
+    image_format = request.args.get('format', 'png').lower()
+    if not key:
+        return jsonify({'error': '다운로드할 이미지 id가 필요합니다.'}), 400
+    response = _stored_image_response(key, image_format)
+    if response is None:
+        return jsonify({'error': '다운로드할 이미지를 찾을 수 없습니다. 다시 생성해 주세요.'}), 404
+    response.headers['Content-Disposition'] = f'attachment; filename=wordcloud_{key[:12]}.{image_format}'
+    return response
 
 if __name__ == '__main__':
     print("Flask WordCloud 서버 시작...")
@@ -626,4 +754,5 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"서버 포트: {port}")
     
+    init_services()
     app.run(debug=False, host='0.0.0.0', port=port)
\ No newline at end of file
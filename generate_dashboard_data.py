@@ -4,32 +4,33 @@
 대시보드용 샘플 데이터 생성
 """
 
-import sqlite3
 import json
 import pandas as pd
 from datetime import datetime, timedelta
 import random
 
-def generate_dashboard_data():
-    """대시보드용 데이터 생성"""
+from analytics_cube import TABLE_NAME, read_collision_frame
+
+DASHBOARD_COLUMNS = ['시도명', '한글보통명', '개체수', '위도', '경도', '관찰일자', '시설물유형명',
+                     '버드세이버여부', '철새유형명']
+
+def generate_dashboard_data(file_path='조류유리창_충돌사고_2023_2024_전국.gpkg', frame=None,
+                            output_path='bird_analysis_results.json', strict=False):
+    """대시보드용 데이터 생성
+
+    frame: 이미 읽어 둔 테이블 DataFrame (DASHBOARD_COLUMNS와 _rowid 포함) - 없으면 file_path에서 읽음
+    strict: 실제 데이터 로드 실패 시 시뮬레이션 데이터로 대체하지 않고 예외를 그대로 올림 (파이프라인용)
+    """
     try:
         # 실제 데이터베이스에서 샘플 데이터 추출
-        conn = sqlite3.connect('조류유리창_충돌사고_2023_2024_전국.gpkg')
-        
-        # 2023년과 2024년 데이터를 균등하게 가져오기
-        query = """
-        SELECT 
-            시도명, 한글보통명, 개체수,
-            위도, 경도, 관찰일자, 시설물유형명,
-            버드세이버여부, 철새유형명
-        FROM 조류유리창_충돌사고_2023_2024_전국 
-        WHERE (관찰일자 LIKE '2023%' AND ROWID % 20 = 0) 
-           OR (관찰일자 LIKE '2024%' AND ROWID % 15 = 0)
-        LIMIT 1000
-        """
+        if frame is None:
+            frame = read_collision_frame(file_path, TABLE_NAME, columns=DASHBOARD_COLUMNS, with_rowid=True)
         
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        # 2023년과 2024년 데이터를 균등하게 가져오기 (ROWID 순서, 최대 1000개)
+        observed = frame['관찰일자'].astype(str)
+        sampled = ((observed.str.startswith('2023') & (frame['_rowid'] % 20 == 0))
+                   | (observed.str.startswith('2024') & (frame['_rowid'] % 15 == 0)))
+        df = frame.loc[sampled, DASHBOARD_COLUMNS].head(1000)
         
         # DataFrame을 dict 리스트로 변환
         data = df.to_dict('records')
@@ -52,7 +53,7 @@ def generate_dashboard_data():
             'total_records': len(data)
         }
         
-        with open('bird_analysis_results.json', 'w', encoding='utf-8') as f:
+        with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(output, f, ensure_ascii=False, indent=2)
         
         print(f"✅ 대시보드 데이터 생성 완료: {len(data)}개 레코드")
@@ -60,6 +61,8 @@ def generate_dashboard_data():
         
     except Exception as e:
         print(f"❌ 실제 데이터 로드 실패: {e}")
+        if strict:
+            raise
         print("시뮬레이션 데이터를 생성합니다...")
         
         # 시뮬레이션 데이터 생성
@@ -107,7 +110,7 @@ def generate_dashboard_data():
             'data_type': 'simulation'
         }
         
-        with open('bird_analysis_results.json', 'w', encoding='utf-8') as f:
+        with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(output, f, ensure_ascii=False, indent=2)
         
         print(f"✅ 시뮬레이션 데이터 생성 완료: {len(data)}개 레코드")
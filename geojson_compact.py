@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지도용 GeoJSON 경량 인코딩
+- minify_geojson: 들여쓰기/공백 제거한 GeoJSON
+- encode_points: Point 좌표는 Float32 배열, 속성은 컬럼별 딕셔너리 인덱스 배열로 담은 바이너리
+
+바이너리 레이아웃 (little-endian, 각 배열은 4바이트 경계에 정렬):
+    b'BCP1' | uint32 개수 | uint32 메타 길이 | 메타 JSON(utf-8) | 패딩
+    | float32[개수 * 2] (경도, 위도 교차) | 속성별 uint8/uint16[개수] ...
+메타 JSON: {"fields": [{"name", "type", "values"}, ...]} (values[인덱스] = 속성 값)
+"""
+
+import argparse
+import gzip
+import json
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b'BCP1'
+_HEADER = struct.Struct('<4sII')
+
+
+def _align(offset, boundary=4):
+    return offset + (-offset % boundary)
+
+
+def minify_geojson(raw):
+    """GeoJSON 바이트 -> 공백 없는 GeoJSON 바이트 (좌표/속성 값은 그대로)"""
+    data = json.loads(raw)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_points(raw):
+    """Point FeatureCollection 바이트 -> 컴팩트 바이너리 (좌표는 Float32라 약 1m 이내 오차)"""
+    data = json.loads(raw)
+    features = data.get('features') or []
+
+    coordinates = np.empty((len(features), 2), dtype='<f4')
+    columns = {}
+    for index, feature in enumerate(features):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Point':
+            raise ValueError(f"Point가 아닌 geometry는 인코딩할 수 없습니다: {geometry.get('type')}")
+        coordinates[index] = geometry['coordinates'][:2]
+        for name, value in (feature.get('properties') or {}).items():
+            columns.setdefault(name, [None] * len(features))[index] = value
+
+    fields = []
+    arrays = []
+    for name, values in columns.items():
+        dictionary = {}
+        indices = [dictionary.setdefault(value, len(dictionary)) for value in values]
+        dtype = '<u1' if len(dictionary) <= 0xFF else '<u2' if len(dictionary) <= 0xFFFF else '<u4'
+        fields.append({'name': name, 'type': np.dtype(dtype).name, 'values': list(dictionary)})
+        arrays.append(np.asarray(indices, dtype=dtype))
+
+    meta = json.dumps({'fields': fields}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    parts = [_HEADER.pack(MAGIC, len(features), len(meta)), meta]
+    offset = _HEADER.size + len(meta)
+    for array in [coordinates] + arrays:
+        padding = _align(offset) - offset
+        parts.append(b'\0' * padding)
+        body = array.tobytes()
+        parts.append(body)
+        offset += padding + len(body)
+    return b''.join(parts)
+
+
+def decode_points(data):
+    """encode_points 결과 -> GeoJSON dict (검증/파이썬 클라이언트용)"""
+    magic, count, meta_length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('컴팩트 포인트 형식이 아닙니다.')
+    offset = _HEADER.size
+    meta = json.loads(data[offset:offset + meta_length].decode('utf-8'))
+    offset = _align(offset + meta_length)
+
+    coordinates = np.frombuffer(data, dtype='<f4', count=count * 2, offset=offset).reshape(count, 2)
+    offset += coordinates.nbytes
+    columns = []
+    for field in meta['fields']:
+        offset = _align(offset)
+        indices = np.frombuffer(data, dtype=np.dtype(field['type']).newbyteorder('<'), count=count, offset=offset)
+        offset += indices.nbytes
+        columns.append((field['name'], [field['values'][i] for i in indices]))
+
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [float(lon), float(lat)]},
+                'properties': {name: values[i] for name, values in columns},
+            }
+            for i, (lon, lat) in enumerate(coordinates)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GeoJSON 경량 인코딩 크기 비교")
+    parser.add_argument('path', nargs='?', default='bird_collision_data.geojson')
+    args = parser.parse_args()
+
+    with open(args.path, 'rb') as f:
+        raw = f.read()
+    variants = {
+        '원본 GeoJSON': raw,
+        'minified GeoJSON': minify_geojson(raw),
+        '컴팩트 바이너리': encode_points(raw),
+    }
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    print(f"📦 {args.path}")
+    for label, body in variants.items():
+        sizes = f"{len(body) / 1024:8.1f} KB | gzip {len(gzip.compress(body, 9)) / 1024:7.1f} KB"
+        if brotli is not None:
+            sizes += f" | br {len(brotli.compress(body, quality=11)) / 1024:7.1f} KB"
+        print(f"   • {label:<18} {sizes}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
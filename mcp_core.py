@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+통합 비동기 MCP 서버 코어 (JSON-RPC 2.0)
+stdio/HTTP 전송이 같은 디스패처를 공유하고 SQLite 작업은 제한된 실행기에서 처리
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from mcp_db_pool import get_pool
+from mcp_query_cache import get_cache
+from mcp_result_stream import execute_paged, iter_ndjson, PAGINATION_PROPERTIES
+from mcp_summary_router import SummaryRouter
+
+try:
+    from analytics_cube import CubeCache, MCP_COLUMN_MAP, MCP_TABLE_NAME
+    from risk_scoring import RISK_FACILITIES, score_risk_slices
+except ImportError:  # numpy/pandas가 없는 환경에서는 score_risk_slices 도구만 비활성화
+    CubeCache = None
+
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_INFO = {
+    "name": "Bird Collision SQLite MCP Server",
+    "version": "1.0.0"
+}
+
+# JSON-RPC 오류 코드
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+SAMPLE_QUERIES = {
+    "basic_stats": {
+        "description": "전체 통계",
+        "query": "SELECT COUNT(*) as total_incidents, COUNT(DISTINCT korean_name) as species_count, COUNT(DISTINCT province) as province_count FROM bird_collisions;"
+    },
+    "top_species": {
+        "description": "위험한 조류 종 TOP 10",
+        "query": "SELECT korean_name, incident_count, total_individuals FROM species_statistics LIMIT 10;"
+    },
+    "province_stats": {
+        "description": "지역별 사고 현황",
+        "query": "SELECT province, total_incidents, species_count FROM province_statistics ORDER BY total_incidents DESC;"
+    },
+    "monthly_trends": {
+        "description": "월별 트렌드",
+        "query": "SELECT year, month, incidents, species_count FROM monthly_trends ORDER BY year, month;"
+    },
+    "seasonal_analysis": {
+        "description": "계절별 분석",
+        "query": "SELECT season, incidents, species_count FROM seasonal_analysis ORDER BY incidents DESC;"
+    }
+}
+
+TOOL_DEFINITIONS = [
+    {
+        "name": "execute_sql",
+        "description": "Execute SQL queries on the bird collision database",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "SQL query to execute"
+                },
+                "params": {
+                    "type": "array",
+                    "description": "Query parameters (optional)"
+                },
+                **PAGINATION_PROPERTIES
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "get_schema",
+        "description": "Get database schema information",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "get_sample_queries",
+        "description": "Get sample queries for common analysis",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "score_risk_slices",
+        "description": "Rank facility risk index and species risk score for many data slices "
+                       "(year, month range, province, habitat, date window) in one computation",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "slices": {
+                    "type": "array",
+                    "description": "Slice definitions; omitted conditions mean all rows",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "label": {"type": "string"},
+                            "year": {"type": ["integer", "string", "array"]},
+                            "month_from": {"type": "integer", "minimum": 1, "maximum": 12},
+                            "month_to": {"type": "integer", "minimum": 1, "maximum": 12},
+                            "province": {"type": ["string", "array"]},
+                            "habitat": {"type": ["string", "array"]},
+                            "start_date": {"type": "string", "description": "YYYY-MM-DD"},
+                            "end_date": {"type": "string", "description": "YYYY-MM-DD"}
+                        }
+                    }
+                },
+                "top": {
+                    "type": "integer",
+                    "description": "Species rows per slice (default 10)"
+                },
+                "facilities": {
+                    "type": "array",
+                    "description": "Facility types to score (default 방음벽, 건물, 기타)"
+                }
+            },
+            "required": ["slices"]
+        }
+    }
+]
+
+# score_risk_slices 한 번에 받는 슬라이스/종 순위 최대 개수
+MAX_RISK_SLICES = 1000
+MAX_RISK_TOP = 100
+
+
+class JSONRPCError(Exception):
+    """JSON-RPC 오류 응답으로 변환되는 예외"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def make_error(request_id, code: int, message: str) -> Dict[str, Any]:
+    """JSON-RPC 오류 응답"""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+
+def text_content(result: Dict[str, Any]) -> Dict[str, Any]:
+    """도구 결과를 MCP text content로 감쌈"""
+    return {
+        "content": [
+            {
+                "type": "text",
+                "text": json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            }
+        ]
+    }
+
+
+class MCPDispatcher:
+    def __init__(self, database_path: str, max_workers: Optional[int] = None):
+        self.database_path = database_path
+        self.pool = get_pool(database_path)
+        self.cache = get_cache(database_path)
+        self.router = SummaryRouter(self.pool)
+        # 풀 크기 이상으로 스레드를 띄워도 커넥션 대기만 늘어나므로 같은 크기로 제한
+        self.max_workers = max_workers or self.pool.max_size
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix="mcp-sql")
+        self.tools = {
+            "execute_sql": self._tool_execute_sql,
+            "get_schema": self._tool_get_schema,
+            "get_sample_queries": self._tool_get_sample_queries,
+        }
+        # 위험도 슬라이스 점수화용 메모리 큐브 (DB 파일이 바뀔 때만 다시 스캔)
+        self.cube_cache = None
+        if CubeCache is not None:
+            self.cube_cache = CubeCache(database_path, MCP_TABLE_NAME, MCP_COLUMN_MAP)
+            self.tools["score_risk_slices"] = self._tool_score_risk_slices
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        # 요청 id -> 처리 중인 태스크 / 실행기 스레드 (notifications/cancelled 처리용)
+        self._inflight: Dict[Any, asyncio.Task] = {}
+        self._workers: Dict[Any, int] = {}
+        self._workers_lock = threading.Lock()
+        self._cancelled = set()
+
+    # ---- 동기 도구 구현 (실행기 스레드에서 실행) ----
+
+    def execute_query(self, query: str, params: Optional[List] = None,
+                      page_size: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """쿼리 실행 (페이지 단위, 캐시, 요약 뷰는 물리화 테이블로 라우팅)"""
+        query = self.router.route(query)
+        key = self.cache.make_key("execute_sql", query, params, page_size, cursor)
+        return self.cache.get_or_compute(
+            key, lambda: execute_paged(self.pool, query, params, page_size, cursor))
+
+    def stream_query(self, query: str, params: Optional[List] = None, max_rows: Optional[int] = None):
+        """NDJSON 스트리밍 (요약 뷰 라우팅 적용)"""
+        return iter_ndjson(self.pool, self.router.route(query), params, max_rows)
+
+    def get_schema(self) -> Dict[str, Any]:
+        """데이터베이스 스키마 정보 (캐시)"""
+        return self.cache.get_or_compute(self.cache.make_key("get_schema"), self._load_schema)
+
+    def _load_schema(self) -> Dict[str, Any]:
+        """테이블/뷰 목록과 테이블별 컬럼 조회"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+                tables = [{"name": row[0]} for row in cursor.fetchall()]
+
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='view'")
+                views = [{"name": row[0]} for row in cursor.fetchall()]
+
+                schema = {
+                    "tables": tables,
+                    "views": views,
+                    "description": "Bird collision database with incident data from 2023-2024"
+                }
+
+                for table in tables:
+                    table_name = table["name"]
+                    cursor.execute(f'PRAGMA table_info("{table_name}")')
+                    columns = [col[0] for col in cursor.description]
+                    schema[f"{table_name}_columns"] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+                return {"success": True, "schema": schema}
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    def get_sample_queries(self) -> Dict[str, Any]:
+        """샘플 쿼리 제공"""
+        return {"success": True, "sample_queries": SAMPLE_QUERIES}
+
+    def _tool_execute_sql(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        query = arguments.get("query")
+        if not query:
+            raise JSONRPCError(INVALID_PARAMS, "execute_sql requires 'query'")
+        return self.execute_query(query, arguments.get("params"),
+                                  arguments.get("page_size"), arguments.get("cursor"))
+
+    def _tool_score_risk_slices(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        slices = arguments.get("slices")
+        if not isinstance(slices, list) or not slices:
+            raise JSONRPCError(INVALID_PARAMS, "score_risk_slices requires non-empty 'slices' array")
+        if len(slices) > MAX_RISK_SLICES:
+            raise JSONRPCError(INVALID_PARAMS, f"score_risk_slices accepts at most {MAX_RISK_SLICES} slices")
+        try:
+            top = min(max(int(arguments.get("top", 10)), 1), MAX_RISK_TOP)
+        except (TypeError, ValueError):
+            raise JSONRPCError(INVALID_PARAMS, "'top' must be an integer")
+        facilities = arguments.get("facilities") or RISK_FACILITIES
+        if not isinstance(facilities, list) or not all(isinstance(f, str) for f in facilities):
+            raise JSONRPCError(INVALID_PARAMS, "'facilities' must be an array of strings")
+        try:
+            result = score_risk_slices(self.cube_cache.get(), slices, top=top, facilities=facilities)
+        except ValueError as e:
+            raise JSONRPCError(INVALID_PARAMS, str(e))
+        return {"success": True, **result}
+
+    def _tool_get_schema(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return self.get_schema()
+
+    def _tool_get_sample_queries(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return self.get_sample_queries()
+
+    # ---- 비동기 디스패치 ----
+
+    def tool_definitions(self) -> List[Dict[str, Any]]:
+        """도구 목록 (사용할 수 없는 도구는 제외)"""
+        return [tool for tool in TOOL_DEFINITIONS if tool["name"] in self.tools]
+
+    def _run_tool(self, request_id, tool, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """실행기 스레드에서 도구 실행 (취소 시 interrupt할 스레드 기록)"""
+        if request_id is None:
+            return tool(arguments)
+        with self._workers_lock:
+            self._workers[request_id] = threading.get_ident()
+        try:
+            return tool(arguments)
+        finally:
+            with self._workers_lock:
+                self._workers.pop(request_id, None)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        request_id=None) -> Dict[str, Any]:
+        """도구 호출 (SQLite 작업은 실행기로 넘김)"""
+        tool = self.tools.get(name)
+        if tool is None:
+            raise JSONRPCError(INVALID_PARAMS, f"Unknown tool: {name}")
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self.executor, functools.partial(self._run_tool, request_id, tool, arguments or {}))
+        return text_content(result)
+
+    def cancel(self, request_id) -> bool:
+        """처리 중인 요청 취소 (실행 중인 SQLite 쿼리는 interrupt)"""
+        try:
+            task = self._inflight.get(request_id)
+        except TypeError:
+            return False
+        if task is None or task.done():
+            return False
+        self._cancelled.add(request_id)
+        with self._workers_lock:
+            worker = self._workers.get(request_id)
+        if worker is not None:
+            self.pool.interrupt(worker)
+        task.get_loop().call_soon_threadsafe(task.cancel)
+        return True
+
+    async def _dispatch(self, method: str, params: Dict[str, Any], request_id=None) -> Dict[str, Any]:
+        """메서드별 처리"""
+        if method == "initialize":
+            return {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {
+                    "tools": {}
+                },
+                "serverInfo": SERVER_INFO
+            }
+        if method == "tools/list":
+            return {"tools": self.tool_definitions()}
+        if method == "tools/call":
+            return await self.call_tool(params.get("name"), params.get("arguments"), request_id)
+        if method == "ping":
+            return {}
+        if method == "notifications/cancelled":
+            self.cancel(params.get("requestId"))
+            return {}
+        if method.startswith("notifications/"):
+            return {}
+        raise JSONRPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+
+    async def handle(self, message) -> Optional[Any]:
+        """JSON-RPC 메시지 처리 (알림이면 None, 배치면 리스트)"""
+        if isinstance(message, list):
+            if not message:
+                return make_error(None, INVALID_REQUEST, "Empty batch")
+            responses = await asyncio.gather(*(self.handle(item) for item in message))
+            responses = [r for r in responses if r is not None]
+            return responses or None
+
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            request_id = message.get("id") if isinstance(message, dict) else None
+            return make_error(request_id, INVALID_REQUEST, "Invalid request")
+
+        is_notification = "id" not in message
+        request_id = message.get("id")
+        tracked = not is_notification and isinstance(request_id, (str, int))
+        if tracked:
+            self._inflight[request_id] = asyncio.current_task()
+        try:
+            result = await self._dispatch(message["method"], message.get("params") or {},
+                                          request_id if tracked else None)
+        except asyncio.CancelledError:
+            # 클라이언트가 취소한 요청에는 응답하지 않음 (MCP 규격)
+            if tracked and request_id in self._cancelled:
+                return None
+            raise
+        except JSONRPCError as e:
+            return None if is_notification else make_error(request_id, e.code, e.message)
+        except Exception as e:
+            return None if is_notification else make_error(request_id, INTERNAL_ERROR, str(e))
+        finally:
+            if tracked:
+                self._inflight.pop(request_id, None)
+                self._cancelled.discard(request_id)
+
+        if is_notification:
+            return None
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": result
+        }
+
+    # ---- 스레드 기반 호출자(Flask 등)용 브리지 ----
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """동기 코드에서 쓸 백그라운드 이벤트 루프"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="mcp-core-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def handle_sync(self, message) -> Optional[Any]:
+        """다른 스레드에서 JSON-RPC 메시지 처리"""
+        future = asyncio.run_coroutine_threadsafe(self.handle(message), self._background_loop())
+        return future.result()
+
+    def call_tool_sync(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """다른 스레드에서 도구 호출"""
+        future = asyncio.run_coroutine_threadsafe(self.call_tool(name, arguments), self._background_loop())
+        return future.result()
+
+    def health(self) -> Dict[str, Any]:
+        """풀/캐시 상태"""
+        return {
+            "database": os.path.exists(self.database_path),
+            "max_workers": self.max_workers,
+            "in_flight": len(self._inflight),
+            "connection_pool": self.pool.health(),
+            "query_cache": self.cache.health(),
+            "summary_tables": self.router.status(),
+            "risk_cube": self.cube_cache.health() if self.cube_cache is not None else None,
+        }
+
+
+async def serve_stdio(dispatcher: MCPDispatcher, stdin=None, stdout=None,
+                      max_inflight: Optional[int] = None):
+    """stdio 전송: 줄 단위 요청을 계속 읽어 병렬 처리하고 완료 순서대로 응답"""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue = asyncio.Queue()
+    write_lock = asyncio.Lock()
+    pending = set()
+    # 처리 중인 요청 수 제한 (넘으면 다음 요청 디스패치를 잠시 멈춤)
+    slots = asyncio.Semaphore(max_inflight or int(os.environ.get("MCP_MAX_INFLIGHT", 64)))
+
+    def read_lines():
+        # 블로킹 readline은 별도 스레드에서 (파이프/TTY/파일 모두 동작)
+        for line in stdin:
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+    threading.Thread(target=read_lines, name="mcp-stdio-reader", daemon=True).start()
+
+    async def write(response):
+        async with write_lock:
+            stdout.write(json.dumps(response, ensure_ascii=False, default=str) + "\n")
+            stdout.flush()
+
+    async def process(message):
+        response = await dispatcher.handle(message)
+        if response is not None:
+            await write(response)
+
+    while True:
+        line = await lines.get()
+        if line is None:
+            break
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as e:
+            await write(make_error(None, PARSE_ERROR, f"Parse error: {e}"))
+            continue
+
+        if isinstance(message, dict) and message.get("method") == "notifications/cancelled":
+            # 취소 알림은 슬롯을 기다리지 않고 바로 처리
+            await dispatcher.handle(message)
+            continue
+
+        await slots.acquire()
+        task = asyncio.create_task(process(message))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        task.add_done_callback(lambda _: slots.release())
+
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def create_http_app(dispatcher: MCPDispatcher):
+    """HTTP 전송: JSON-RPC POST / 와 헬스 체크를 제공하는 Flask 앱"""
+    from flask import Flask, request, jsonify
+    from flask_cors import CORS
+
+    app = Flask(__name__)
+    CORS(app)
+
+    @app.route('/', methods=['POST'])
+    def jsonrpc():
+        """JSON-RPC over HTTP"""
+        data = request.get_json(silent=True)
+        if data is None:
+            return jsonify(make_error(None, PARSE_ERROR, "Parse error")), 400
+        response = dispatcher.handle_sync(data)
+        if response is None:
+            return '', 204
+        return jsonify(response)
+
+    @app.route('/health', methods=['GET'])
+    def health_check():
+        return jsonify({"status": "healthy", **dispatcher.health()})
+
+    return app
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="Bird Collision SQLite MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8080)))
+    args = parser.parse_args()
+
+    database_path = os.environ.get("DATABASE_PATH", "bird_collision_mcp.db")
+    if not os.path.exists(database_path):
+        print(f"Database file not found: {database_path}", file=sys.stderr)
+        sys.exit(1)
+
+    dispatcher = MCPDispatcher(database_path)
+    if args.transport == "stdio":
+        print("Bird Collision SQLite MCP Server started (stdio)", file=sys.stderr)
+        asyncio.run(serve_stdio(dispatcher))
+    else:
+        app = create_http_app(dispatcher)
+        app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
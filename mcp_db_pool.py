@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+MCP 서버 공용 SQLite 읽기 전용 커넥션 풀
+요청마다 connect()/close()를 반복하지 않고 튜닝된 커넥션을 재사용
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class PoolTimeoutError(RuntimeError):
+    """풀에서 커넥션을 제한 시간 내에 얻지 못함"""
+
+
+class ReadOnlyConnectionPool:
+    def __init__(self, database_path: str, max_size: int = 8,
+                 acquire_timeout: float = 10.0,
+                 cache_size_kb: int = 32 * 1024,
+                 mmap_size: int = 256 * 1024 * 1024,
+                 health_check_interval: float = 30.0):
+        self.database_path = database_path
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        # (connection, 마지막 반환 시각) - LIFO로 꺼내 캐시가 따뜻한 커넥션을 우선 사용
+        self._idle = deque()
+        self._open_count = 0
+        self._db_identity = self._file_identity()
+        self._wal_checked = False
+        # 스레드 id -> 대여 중인 커넥션 (요청 취소 시 interrupt용)
+        self._active: Dict[int, sqlite3.Connection] = {}
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "opened": 0,
+            "closed": 0,
+        }
+
+    def _file_identity(self):
+        """DB 파일 교체 감지용 (inode, 장치)"""
+        try:
+            st = os.stat(self.database_path)
+            return (st.st_ino, st.st_dev)
+        except OSError:
+            return None
+
+    def _ensure_wal(self):
+        """WAL 모드 설정 (DB 파일에 영구 저장되므로 한 번만 쓰기 연결로 시도)"""
+        if self._wal_checked:
+            return
+        self._wal_checked = True
+        try:
+            conn = sqlite3.connect(self.database_path, timeout=1.0)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # 읽기 전용 볼륨 등에서는 기존 저널 모드 그대로 사용
+            pass
+
+    def _open(self) -> sqlite3.Connection:
+        """튜닝된 읽기 전용 커넥션 생성"""
+        self._ensure_wal()
+        uri = f"file:{self.database_path}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        with self._lock:
+            self._open_count += 1
+            self.stats["opened"] += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection):
+        """커넥션 폐기"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._open_count -= 1
+            self.stats["closed"] += 1
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """커넥션 상태 확인"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _check_file_replaced(self):
+        """DB 파일이 재생성되었으면 유휴 커넥션을 모두 폐기"""
+        identity = self._file_identity()
+        if identity == self._db_identity:
+            return
+        with self._lock:
+            stale = list(self._idle)
+            self._idle.clear()
+            self._db_identity = identity
+            self._wal_checked = False
+        for conn, _ in stale:
+            self._discard(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        """커넥션 대여"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                raise PoolTimeoutError(
+                    f"No database connection available within {self.acquire_timeout}s "
+                    f"(max_size={self.max_size})")
+
+        try:
+            self._check_file_replaced()
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    conn = self._open()
+                    with self._lock:
+                        self.stats["misses"] += 1
+                    return conn
+
+                conn, released_at = item
+                if (time.monotonic() - released_at > self.health_check_interval
+                        and not self._is_healthy(conn)):
+                    with self._lock:
+                        self.stats["health_check_failures"] += 1
+                    self._discard(conn)
+                    continue
+
+                with self._lock:
+                    self.stats["hits"] += 1
+                return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, conn: sqlite3.Connection, broken: bool = False):
+        """커넥션 반납"""
+        try:
+            if broken or conn.in_transaction:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    broken = True
+            if broken:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: 형태로 사용"""
+        conn = self._checkout()
+        ident = threading.get_ident()
+        with self._lock:
+            outer = self._active.get(ident)
+            self._active[ident] = conn
+        broken = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as e:
+            # 손상/IO 오류는 커넥션을 버리고, SQL 오류는 재사용
+            broken = not isinstance(e, (sqlite3.OperationalError, sqlite3.ProgrammingError))
+            raise
+        finally:
+            with self._lock:
+                if outer is None:
+                    self._active.pop(ident, None)
+                else:
+                    self._active[ident] = outer
+            self._checkin(conn, broken)
+
+    def interrupt(self, thread_id: int) -> bool:
+        """해당 스레드에서 실행 중인 쿼리 중단 (다른 스레드에서 호출 가능)"""
+        with self._lock:
+            conn = self._active.get(thread_id)
+        if conn is None:
+            return False
+        conn.interrupt()
+        return True
+
+    def health(self) -> Dict[str, Any]:
+        """풀 상태 및 히트/미스 지표"""
+        healthy = False
+        error = None
+        try:
+            with self.connection() as conn:
+                healthy = self._is_healthy(conn)
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            report = {
+                "healthy": healthy,
+                "max_size": self.max_size,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                **self.stats,
+            }
+        if error:
+            report["error"] = error
+        return report
+
+    def close(self):
+        """유휴 커넥션 모두 종료"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pools: Dict[str, ReadOnlyConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database_path: str, max_size: Optional[int] = None) -> ReadOnlyConnectionPool:
+    """DB 경로별 공유 풀 반환 (MCP_POOL_SIZE 환경 변수로 크기 조정)"""
+    key = os.path.abspath(database_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            size = max_size or int(os.environ.get("MCP_POOL_SIZE", 8))
+            pool = ReadOnlyConnectionPool(database_path, max_size=size)
+            _pools[key] = pool
+        return pool
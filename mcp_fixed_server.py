@@ -4,15 +4,15 @@ ChatGPT Desktop 완전 호환 MCP 서버
 모든 요청을 로깅하고 정확한 MCP 프로토콜 구현
 """
 
-import sqlite3
-import json
 import os
 import logging
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from mcp_core import MCPDispatcher, JSONRPCError, make_error, PARSE_ERROR, PROTOCOL_VERSION, SERVER_INFO
+
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,85 +20,22 @@ logger = logging.getLogger(__name__)
 class MCPFixedServer:
     def __init__(self, database_path: str):
         self.database_path = database_path
+        self.dispatcher = MCPDispatcher(database_path)
         self.app = Flask(__name__)
         CORS(self.app, origins="*", methods=["GET", "POST", "OPTIONS"], allow_headers=["Content-Type", "Authorization"])
         self.setup_routes()
         
-    def connect_db(self):
-        """데이터베이스 연결"""
-        try:
-            conn = sqlite3.connect(self.database_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-        except Exception as e:
-            logger.error(f"Database connection failed: {e}")
-            return None
-    
-    def execute_query(self, query: str, params: Optional[List] = None) -> Dict[str, Any]:
-        """쿼리 실행"""
-        conn = self.connect_db()
-        if not conn:
-            return {"error": "Database connection failed"}
-        
-        try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                data = [dict(row) for row in results]
-                return {
-                    "success": True,
-                    "data": data,
-                    "row_count": len(data)
-                }
-            else:
-                conn.commit()
-                return {
-                    "success": True,
-                    "affected_rows": cursor.rowcount
-                }
-                
-        except Exception as e:
-            logger.error(f"Query execution failed: {e}")
-            return {"error": str(e)}
-        finally:
-            conn.close()
+    def execute_query(self, query: str, params: Optional[List] = None,
+                      page_size: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """쿼리 실행 (페이지 단위, next_cursor로 이어서 조회)"""
+        result = self.dispatcher.execute_query(query, params, page_size, cursor)
+        if "error" in result:
+            logger.error(f"Query execution failed: {result['error']}")
+        return result
     
     def get_schema(self) -> Dict[str, Any]:
         """데이터베이스 스키마 정보"""
-        conn = self.connect_db()
-        if not conn:
-            return {"error": "Database connection failed"}
-        
-        try:
-            cursor = conn.cursor()
-            
-            # 테이블 목록
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [{"name": row[0]} for row in cursor.fetchall()]
-            
-            # 뷰 목록
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='view'")
-            views = [{"name": row[0]} for row in cursor.fetchall()]
-            
-            return {
-                "success": True,
-                "schema": {
-                    "tables": tables,
-                    "views": views,
-                    "description": "Bird collision database with incident data from 2023-2024"
-                }
-            }
-            
-        except Exception as e:
-            logger.error(f"Schema retrieval failed: {e}")
-            return {"error": str(e)}
-        finally:
-            conn.close()
+        return self.dispatcher.get_schema()
     
     def setup_routes(self):
         """Flask 라우트 설정"""
@@ -120,7 +57,7 @@ class MCPFixedServer:
             logger.info(f"=== RESPONSE ===")
             logger.info(f"Status: {response.status}")
             logger.info(f"Headers: {dict(response.headers)}")
-            if response.content_type and 'json' in response.content_type:
+            if response.content_type and 'json' in response.content_type and not response.is_streamed:
                 logger.info(f"Body: {response.get_data(as_text=True)}")
             logger.info(f"================")
             return response
@@ -129,18 +66,15 @@ class MCPFixedServer:
         def mcp_config():
             """MCP 설정 정보 (표준)"""
             config = {
-                "version": "2024-11-05",
-                "name": "Bird Collision SQLite MCP Server",
+                "version": PROTOCOL_VERSION,
+                "name": SERVER_INFO["name"],
                 "description": "SQLite database for bird collision data analysis",
                 "capabilities": {
                     "tools": True,
                     "resources": False,
                     "prompts": False
                 },
-                "serverInfo": {
-                    "name": "Bird Collision SQLite MCP Server",
-                    "version": "1.0.0"
-                }
+                "serverInfo": SERVER_INFO
             }
             logger.info(f"Returning MCP config: {config}")
             return jsonify(config)
@@ -149,9 +83,9 @@ class MCPFixedServer:
         def server_info():
             """서버 정보"""
             info = {
-                "name": "Bird Collision SQLite MCP Server",
-                "version": "1.0.0",
-                "protocolVersion": "2024-11-05",
+                "name": SERVER_INFO["name"],
+                "version": SERVER_INFO["version"],
+                "protocolVersion": PROTOCOL_VERSION,
                 "capabilities": {
                     "tools": {}
                 }
@@ -161,51 +95,22 @@ class MCPFixedServer:
         @self.app.route('/mcp/initialize', methods=['POST'])
         def initialize():
             """MCP 초기화"""
-            data = request.get_json() or {}
+            data = request.get_json(silent=True) or {}
             logger.info(f"Initialize request: {data}")
             
             result = {
-                "protocolVersion": "2024-11-05",
+                "protocolVersion": PROTOCOL_VERSION,
                 "capabilities": {
                     "tools": {}
                 },
-                "serverInfo": {
-                    "name": "Bird Collision SQLite MCP Server",
-                    "version": "1.0.0"
-                }
+                "serverInfo": SERVER_INFO
             }
             return jsonify(result)
         
         @self.app.route('/mcp/tools', methods=['GET'])
         def list_tools():
             """도구 목록"""
-            tools = {
-                "tools": [
-                    {
-                        "name": "execute_sql",
-                        "description": "Execute SQL queries on the bird collision database",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "query": {
-                                    "type": "string",
-                                    "description": "SQL query to execute"
-                                }
-                            },
-                            "required": ["query"]
-                        }
-                    },
-                    {
-                        "name": "get_schema",
-                        "description": "Get database schema information",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {}
-                        }
-                    }
-                ]
-            }
-            return jsonify(tools)
+            return jsonify({"tools": self.dispatcher.tool_definitions()})
         
         @self.app.route('/mcp/tools/call', methods=['POST'])
         def call_tool():
@@ -216,40 +121,14 @@ class MCPFixedServer:
             
             logger.info(f"Tool call request: {data}")
             
-            tool_name = data.get("name")
-            tool_arguments = data.get("arguments", {})
-            
             try:
-                if tool_name == "execute_sql":
-                    query = tool_arguments.get("query")
-                    result = self.execute_query(query)
-                    
-                    return jsonify({
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": json.dumps(result, ensure_ascii=False, indent=2, default=str)
-                            }
-                        ]
-                    })
-                
-                elif tool_name == "get_schema":
-                    result = self.get_schema()
-                    return jsonify({
-                        "content": [
-                            {
-                                "type": "text", 
-                                "text": json.dumps(result, ensure_ascii=False, indent=2, default=str)
-                            }
-                        ]
-                    })
-                
-                else:
-                    return jsonify({"error": f"Unknown tool: {tool_name}"}), 400
-                    
+                result = self.dispatcher.call_tool_sync(data.get("name"), data.get("arguments", {}))
+            except JSONRPCError as e:
+                return jsonify({"error": e.message}), 400
             except Exception as e:
                 logger.error(f"Tool call failed: {e}")
                 return jsonify({"error": str(e)}), 500
+            return jsonify(result)
         
         @self.app.route('/', methods=['GET', 'POST', 'OPTIONS'])
         def root():
@@ -258,117 +137,27 @@ class MCPFixedServer:
                 return '', 204
                 
             if request.method == 'POST':
-                # JSON-RPC over HTTP 처리
-                data = request.get_json()
-                if not data:
+                # JSON-RPC over HTTP 처리 (stdio 서버와 같은 디스패처)
+                data = request.get_json(silent=True)
+                if data is None:
                     logger.error("No JSON data in POST request")
-                    return jsonify({"error": "No JSON data provided"}), 400
+                    return jsonify(make_error(None, PARSE_ERROR, "Parse error")), 400
                 
                 logger.info(f"JSON-RPC request: {data}")
-                
-                method = data.get("method")
-                params = data.get("params", {})
-                request_id = data.get("id")
-                
-                try:
-                    if method == "initialize":
-                        result = {
-                            "protocolVersion": "2024-11-05",
-                            "capabilities": {
-                                "tools": {}
-                            },
-                            "serverInfo": {
-                                "name": "Bird Collision SQLite MCP Server",
-                                "version": "1.0.0"
-                            }
-                        }
-                    elif method == "tools/list":
-                        result = {
-                            "tools": [
-                                {
-                                    "name": "execute_sql",
-                                    "description": "Execute SQL queries on the bird collision database",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "query": {
-                                                "type": "string",
-                                                "description": "SQL query to execute"
-                                            }
-                                        },
-                                        "required": ["query"]
-                                    }
-                                },
-                                {
-                                    "name": "get_schema",
-                                    "description": "Get database schema information",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {}
-                                    }
-                                }
-                            ]
-                        }
-                    elif method == "tools/call":
-                        tool_name = params.get("name")
-                        tool_arguments = params.get("arguments", {})
-                        
-                        if tool_name == "execute_sql":
-                            query = tool_arguments.get("query")
-                            query_result = self.execute_query(query)
-                            result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": json.dumps(query_result, ensure_ascii=False, indent=2, default=str)
-                                    }
-                                ]
-                            }
-                        elif tool_name == "get_schema":
-                            schema_result = self.get_schema()
-                            result = {
-                                "content": [
-                                    {
-                                        "type": "text", 
-                                        "text": json.dumps(schema_result, ensure_ascii=False, indent=2, default=str)
-                                    }
-                                ]
-                            }
-                        else:
-                            raise Exception(f"Unknown tool: {tool_name}")
-                            
-                    elif method == "notifications/initialized":
-                        result = {}
-                    else:
-                        raise Exception(f"Unknown method: {method}")
-                    
-                    response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": result
-                    }
-                    logger.info(f"JSON-RPC response: {response}")
-                    return jsonify(response)
-                    
-                except Exception as e:
-                    logger.error(f"JSON-RPC error: {e}")
-                    error_response = {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "error": {
-                            "code": -32603,
-                            "message": str(e)
-                        }
-                    }
-                    return jsonify(error_response), 500
+                response = self.dispatcher.handle_sync(data)
+                if response is None:
+                    return '', 204
+                if isinstance(response, dict) and "error" in response:
+                    logger.error(f"JSON-RPC error: {response['error']}")
+                return jsonify(response)
             
             else:
                 # GET 요청
                 return jsonify({
-                    "name": "Bird Collision SQLite MCP Server",
-                    "version": "1.0.0",
+                    "name": SERVER_INFO["name"],
+                    "version": SERVER_INFO["version"],
                     "description": "MCP server for bird collision database analysis",
-                    "protocolVersion": "2024-11-05",
+                    "protocolVersion": PROTOCOL_VERSION,
                     "capabilities": {
                         "tools": True,
                         "resources": False,
@@ -378,18 +167,31 @@ class MCPFixedServer:
                         "health": "/health",
                         "mcp_config": "/.well-known/mcp/config",
                         "tools": "/mcp/tools",
+                        "query_stream": "/mcp/query/stream",
                         "server_info": "/mcp/server-info"
                     }
                 })
         
+        @self.app.route('/mcp/query/stream', methods=['POST'])
+        def stream_query():
+            """쿼리 결과를 NDJSON으로 스트리밍 (청크 전송, 일정한 메모리 사용)"""
+            data = request.get_json()
+            if not data or not data.get("query"):
+                return jsonify({"error": "query is required"}), 400
+            
+            return Response(
+                self.dispatcher.stream_query(data["query"], data.get("params"), data.get("max_rows")),
+                mimetype='application/x-ndjson'
+            )
+        
         @self.app.route('/health', methods=['GET'])
         def health_check():
             """헬스 체크"""
             return jsonify({
                 "status": "healthy", 
-                "database": os.path.exists(self.database_path),
-                "mcp_version": "2024-11-05",
-                "timestamp": datetime.now().isoformat()
+                "mcp_version": PROTOCOL_VERSION,
+                "timestamp": datetime.now().isoformat(),
+                **self.dispatcher.health()
             })
 
 def main():
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+MCP 도구 결과 캐시 (LRU + TTL, 바이트 예산)
+DB 파일 mtime 또는 PRAGMA data_version이 바뀌면 자동 무효화
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """공백/세미콜론 차이만 있는 쿼리를 같은 키로 취급"""
+    return _WHITESPACE.sub(" ", (query or "").strip()).rstrip(";").strip()
+
+
+class QueryResultCache:
+    def __init__(self, database_path: str, max_bytes: int = 64 * 1024 * 1024,
+                 ttl: float = 300.0, version_check_interval: float = 1.0):
+        self.database_path = database_path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+
+        self._lock = threading.Lock()
+        # key -> (result, 크기, 저장 시각)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._version_checked_at = 0.0
+        self._version_conn = None
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "uncacheable": 0,
+        }
+
+    def _data_version(self) -> Optional[int]:
+        """전용 커넥션의 PRAGMA data_version (다른 커넥션의 커밋 시 증가)"""
+        try:
+            if self._version_conn is None:
+                uri = f"file:{self.database_path}?mode=ro"
+                self._version_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            self._version_conn = None
+            return None
+
+    def _current_version(self):
+        """DB/WAL 파일 상태와 data_version을 묶은 버전 토큰"""
+        parts = []
+        for path in (self.database_path, self.database_path + "-wal"):
+            try:
+                st = os.stat(path)
+                parts.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except OSError:
+                parts.append(None)
+        ino = parts[0][0] if parts[0] else None
+        prev_ino = self._version[0][0] if self._version and self._version[0] else None
+        if prev_ino != ino:
+            # 파일이 교체되면 이전 커넥션의 data_version은 의미가 없음
+            self._version_conn = None
+        parts.append(self._data_version())
+        return tuple(parts)
+
+    def _check_version(self):
+        """버전이 바뀌었으면 전체 무효화 (lock 안에서 호출)"""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = self._current_version()
+        if version != self._version:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def make_key(self, tool: str, query: str = "", *args) -> str:
+        """정규화된 SQL + 파라미터로 캐시 키 생성"""
+        return json.dumps([tool, normalize_sql(query), args], ensure_ascii=False, default=str)
+
+    def get(self, key: str):
+        """캐시 조회 (없으면 None)"""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            result, size, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._bytes -= size
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """성공한 결과만 저장 (예산 초과 시 LRU 제거)"""
+        if not isinstance(result, dict) or "error" in result:
+            return
+        size = len(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+        with self._lock:
+            if size > self.max_bytes // 4:
+                # 큰 결과 하나가 캐시 전체를 밀어내지 않도록
+                self.stats["uncacheable"] += 1
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (result, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """캐시 히트면 반환, 아니면 계산 후 저장"""
+        result = self.get(key)
+        if result is not None:
+            return result
+        result = compute()
+        self.put(key, result)
+        return result
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def health(self) -> Dict[str, Any]:
+        """히트율 및 사용량 지표"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                **self.stats,
+            }
+
+
+_caches: Dict[str, QueryResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(database_path: str) -> QueryResultCache:
+    """DB 경로별 공유 캐시 반환 (MCP_CACHE_MAX_BYTES, MCP_CACHE_TTL 환경 변수)"""
+    key = os.path.abspath(database_path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = QueryResultCache(
+                database_path,
+                max_bytes=int(os.environ.get("MCP_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+                ttl=float(os.environ.get("MCP_CACHE_TTL", 300)),
+            )
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+MCP execute_sql 결과 페이지네이션 및 스트리밍
+전체 결과를 fetchall()로 메모리에 올리지 않고 페이지/청크 단위로 처리
+"""
+
+import base64
+import hashlib
+import json
+import os
+from typing import Dict, List, Any, Optional, Iterator
+
+# 서버 측 하드 상한 (페이지네이션/스트리밍 모두 이 이상은 반환하지 않음)
+MAX_RESULT_ROWS = int(os.environ.get("MCP_MAX_ROWS", 10000))
+DEFAULT_PAGE_SIZE = int(os.environ.get("MCP_PAGE_SIZE", 500))
+MAX_PAGE_SIZE = 5000
+STREAM_CHUNK_ROWS = 500
+
+
+def _query_fingerprint(query: str, params: Optional[List]) -> str:
+    """커서 토큰이 같은 쿼리에만 쓰이도록 하는 지문"""
+    raw = json.dumps([query.strip(), params or []], ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(query: str, params: Optional[List], offset: int) -> str:
+    """다음 페이지 위치를 불투명 토큰으로 인코딩"""
+    payload = json.dumps({"o": offset, "h": _query_fingerprint(query, params)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, query: str, params: Optional[List]) -> int:
+    """토큰을 검증하고 offset 반환"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(payload["o"])
+        fingerprint = payload["h"]
+    except Exception:
+        raise ValueError("Invalid cursor token")
+    if fingerprint != _query_fingerprint(query, params) or offset < 0:
+        raise ValueError("Cursor token does not match this query")
+    return offset
+
+
+def _is_wrappable(query: str) -> bool:
+    """LIMIT/OFFSET 서브쿼리로 감쌀 수 있는 단일 SELECT 문인지"""
+    head = query.lstrip().upper()
+    return (head.startswith("SELECT") or head.startswith("WITH")) and ";" not in query.strip().rstrip(";")
+
+
+def _open_cursor(conn, query: str, params: Optional[List], offset: int = 0, limit: Optional[int] = None):
+    """offset부터 읽는 커서 생성 (가능하면 SQLite에서 건너뛰기)"""
+    args = list(params or [])
+    if _is_wrappable(query) and (offset or limit is not None):
+        inner = query.strip().rstrip(";")
+        cursor = conn.execute(f"SELECT * FROM ({inner}) LIMIT ? OFFSET ?",
+                              args + [-1 if limit is None else limit, offset])
+        return cursor
+
+    cursor = conn.execute(query, args) if args else conn.execute(query)
+    # 감쌀 수 없는 쿼리(PRAGMA 등)는 커서에서 직접 건너뜀
+    remaining = offset
+    while remaining > 0 and cursor.description is not None:
+        skipped = cursor.fetchmany(min(remaining, STREAM_CHUNK_ROWS))
+        if not skipped:
+            break
+        remaining -= len(skipped)
+    return cursor
+
+
+def execute_paged(pool, query: str, params: Optional[List] = None,
+                  page_size: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """쿼리 실행 후 한 페이지만 반환 (next_cursor로 이어서 조회)"""
+    if not query or not query.strip():
+        return {"error": "Query is required"}
+
+    try:
+        page_size = int(page_size or DEFAULT_PAGE_SIZE)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        offset = decode_cursor(cursor, query, params) if cursor else 0
+
+        remaining_cap = MAX_RESULT_ROWS - offset
+        if remaining_cap <= 0:
+            return {"success": True, "data": [], "row_count": 0,
+                    "next_cursor": None, "truncated": True, "max_rows": MAX_RESULT_ROWS}
+        limit = min(page_size, remaining_cap)
+
+        with pool.connection() as conn:
+            # 다음 페이지 존재 여부를 알기 위해 한 행 더 읽음
+            cur = _open_cursor(conn, query, params, offset, limit + 1)
+            if cur.description is None:
+                return {"success": True, "affected_rows": cur.rowcount}
+
+            columns = [col[0] for col in cur.description]
+            rows = cur.fetchmany(limit + 1)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        data = [dict(zip(columns, row)) for row in rows]
+        next_offset = offset + len(data)
+        truncated = has_more and next_offset >= MAX_RESULT_ROWS
+
+        return {
+            "success": True,
+            "data": data,
+            "row_count": len(data),
+            "offset": offset,
+            "next_cursor": encode_cursor(query, params, next_offset) if has_more and not truncated else None,
+            "truncated": truncated,
+        }
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def iter_ndjson(pool, query: str, params: Optional[List] = None,
+                max_rows: Optional[int] = None) -> Iterator[str]:
+    """결과를 NDJSON 줄 단위로 생성 (마지막 줄은 _summary)"""
+    cap = min(int(max_rows or MAX_RESULT_ROWS), MAX_RESULT_ROWS)
+    sent = 0
+    truncated = False
+    try:
+        with pool.connection() as conn:
+            cur = _open_cursor(conn, query, params)
+            if cur.description is None:
+                yield json.dumps({"_summary": {"affected_rows": cur.rowcount}}) + "\n"
+                return
+
+            columns = [col[0] for col in cur.description]
+            while sent < cap:
+                rows = cur.fetchmany(min(STREAM_CHUNK_ROWS, cap - sent))
+                if not rows:
+                    break
+                sent += len(rows)
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n"
+                    for row in rows
+                )
+            if sent >= cap and cur.fetchone() is not None:
+                truncated = True
+    except Exception as e:
+        yield json.dumps({"_error": str(e)}, ensure_ascii=False) + "\n"
+        return
+
+    yield json.dumps({"_summary": {"row_count": sent, "truncated": truncated}}) + "\n"
+
+
+# execute_sql 도구 입력 스키마에 추가되는 페이지네이션 속성
+PAGINATION_PROPERTIES = {
+    "page_size": {
+        "type": "integer",
+        "description": f"Rows per page (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})"
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Opaque next_cursor token from a previous page"
+    }
+}
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+요약 뷰 -> 물리화 요약 테이블 라우팅
+summary_metadata 기준으로 최신인 요약 테이블만 사용하고, stale이면 원본 뷰로 조회
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any
+
+# 문자열 리터럴은 건너뛰고 식별자만 치환하기 위한 패턴 조각
+_STRING_LITERAL = r"'(?:[^']|'')*'"
+
+
+class SummaryRouter:
+    def __init__(self, pool, refresh_interval: float = 5.0):
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._routes: Dict[str, str] = {}
+        self._status: Dict[str, Any] = {}
+        self._pattern = None
+        self._loaded_at = 0.0
+
+    def _load(self):
+        """summary_metadata를 읽어 최신 요약 테이블만 라우팅 대상으로 선택"""
+        routes = {}
+        status = {}
+        try:
+            with self.pool.connection() as conn:
+                try:
+                    rows = conn.execute("""
+                        SELECT source_view, summary_table, refreshed_at, source_rows, source_max_rowid
+                        FROM summary_metadata
+                    """).fetchall()
+                except sqlite3.OperationalError:
+                    rows = []
+                if rows:
+                    source_rows, source_max_rowid = conn.execute(
+                        "SELECT COUNT(*), MAX(rowid) FROM bird_collisions").fetchone()
+                    for view_name, table_name, refreshed_at, rows_at, max_rowid_at in rows:
+                        stale = rows_at != source_rows or max_rowid_at != source_max_rowid
+                        status[view_name] = {
+                            "table": table_name,
+                            "refreshed_at": refreshed_at,
+                            "stale": stale,
+                        }
+                        if not stale:
+                            routes[view_name] = table_name
+        except Exception:
+            routes = {}
+
+        pattern = None
+        if routes:
+            names = "|".join(re.escape(name) for name in sorted(routes, key=len, reverse=True))
+            pattern = re.compile(rf"({_STRING_LITERAL})|(?<![\w.\"`\[])({names})(?![\w\"`\]])",
+                                 re.IGNORECASE)
+        self._routes = {name.lower(): table for name, table in routes.items()}
+        self._status = status
+        self._pattern = pattern
+
+    def _ensure_loaded(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._loaded_at >= self.refresh_interval:
+                self._load()
+                self._loaded_at = now
+            return self._pattern, self._routes
+
+    def route(self, query: str) -> str:
+        """쿼리 안의 요약 뷰 이름을 최신 요약 테이블 이름으로 치환"""
+        if not query:
+            return query
+        pattern, routes = self._ensure_loaded()
+        if pattern is None:
+            return query
+
+        def replace(match):
+            if match.group(1):
+                return match.group(1)
+            return routes[match.group(2).lower()]
+
+        return pattern.sub(replace, query)
+
+    def status(self) -> Dict[str, Any]:
+        """요약 테이블별 최신 여부"""
+        self._ensure_loaded()
+        return dict(self._status)
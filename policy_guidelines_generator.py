@@ -8,6 +8,9 @@
 import json
 from datetime import datetime
 
+ANALYSIS_FILE = '/Users/suntaekim/nie/advanced_analysis_data.json'
+OUTPUT_PATH = '/Users/suntaekim/nie/comprehensive_policy_document.json'
+
 def generate_bird_protection_policy(analysis_file):
     """조류 보호 정책 수립 기초자료 생성"""
     print("=" * 60)
@@ -433,15 +436,13 @@ def generate_urban_planning_integration():
     
     return urban_integration
 
-def create_comprehensive_policy_document():
-    """종합 정책 문서 생성"""
+def create_comprehensive_policy_document(analysis_file=ANALYSIS_FILE, output_path=OUTPUT_PATH):
+    """종합 정책 문서 생성 (analysis_file: advanced_statistical_analysis.py 결과 JSON)"""
     print("\n" + "=" * 60)
     print("📄 종합 정책 문서 생성")
     print("=" * 60)
     
     # 모든 구성요소 생성
-    analysis_file = '/Users/suntaekim/nie/advanced_analysis_data.json'
-    
     policy_framework = generate_bird_protection_policy(analysis_file)
     design_guidelines = generate_building_design_guidelines()
     hotspot_management = generate_hotspot_management_plan(analysis_file)
@@ -494,7 +495,7 @@ def create_comprehensive_policy_document():
     }
     
     # JSON 파일로 저장
-    with open('/Users/suntaekim/nie/comprehensive_policy_document.json', 'w', encoding='utf-8') as f:
+    with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(comprehensive_document, f, ensure_ascii=False, indent=2)
     
     print("✅ 종합 정책 문서 JSON 파일 생성: comprehensive_policy_document.json")
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시설물/조류 종 위험도 계산 엔진
+정규화 분모(전체 사고 수, 시도 수, 식별 종 수)를 고정값 대신 각 슬라이스 데이터에서 집계와 함께 계산
+연도/월/시도/서식지/기간 등 여러 슬라이스(겹쳐도 됨)를 한 번의 벡터화 호출로 점수화
+"""
+
+import time
+
+import numpy as np
+
+# 종합 위험도 지수 가중치 (합계 100)
+RISK_WEIGHTS = {
+    'accident_freq': 40,       # 사고빈도 (슬라이스 전체 사고 대비)
+    'region_spread': 20,       # 지역분산 (슬라이스에 나타난 시도 대비)
+    'species_diversity': 20,   # 종다양성 (슬라이스에 나타난 식별 종 대비)
+    'no_bird_saver_rate': 20,  # 버드세이버 미설치율
+}
+# 기존 보고서(advanced_analysis_data.json)와 같은 척도 유지: 가중합 × 100
+RISK_SCALE = 100
+
+# 조류 종 위험도 점수: 사고건수 + 영향 시도 수 × 10 + 시설물 종류 수 × 5
+SPECIES_RISK_WEIGHTS = {'accidents': 1, 'regions': 10, 'facilities': 5}
+
+RISK_FACILITIES = ['방음벽', '건물', '기타']
+UNIDENTIFIED_SPECIES = '동정불가'
+
+# (그룹 × 값) 조합 수가 이 이하이면 COUNT(DISTINCT)를 밀집 bincount로 계산
+_DENSE_DISTINCT_LIMIT = 1 << 24
+
+
+def _distinct(group_keys, n_groups, value_codes, n_values):
+    """그룹 키별 서로 다른 값 수 (group_keys/value_codes는 같은 길이)"""
+    keys = group_keys.astype(np.int64) * n_values + value_codes
+    if n_groups * n_values <= _DENSE_DISTINCT_LIMIT:
+        # 키 공간이 작으면 정렬(np.unique) 대신 존재 여부 표를 만들어 행별 합계
+        present = np.bincount(keys, minlength=n_groups * n_values) > 0
+        return present.reshape(n_groups, n_values).sum(axis=1)
+    return np.bincount(np.unique(keys) // n_values, minlength=n_groups)
+
+
+def _stack_slices(cube, slices):
+    """{라벨: 마스크} -> (라벨 목록, 슬라이스 인덱스, 행 인덱스) - 모든 슬라이스의 (슬라이스, 행) 쌍"""
+    labels = list(slices)
+    if labels:
+        membership = np.vstack([np.asarray(slices[label], dtype=bool) for label in labels])
+    else:
+        membership = np.zeros((0, cube.n_rows), dtype=bool)
+    slice_idx, row_idx = np.nonzero(membership)
+    return labels, slice_idx, row_idx
+
+
+def _identified_species_codes(cube):
+    """한글보통명 코드 (NULL/동정불가는 -1)"""
+    species_codes = cube.codes('한글보통명').copy()
+    unidentified = cube.code_of('한글보통명', UNIDENTIFIED_SPECIES)
+    if unidentified is not None:
+        species_codes[species_codes == unidentified] = -1
+    return species_codes
+
+
+class RiskScores:
+    """슬라이스 × 시설물 지표 배열 (행: labels, 열: facilities)"""
+
+    def __init__(self, labels, facilities, components, denominators, weights):
+        self.labels = labels
+        self.facilities = facilities
+        self.components = components
+        self.denominators = denominators
+        self.weights = weights
+        self.risk_index = self._index()
+
+    def _index(self):
+        d = self.denominators
+        with np.errstate(invalid='ignore', divide='ignore'):
+            parts = [
+                self.components['accident_freq'] / d['total_accidents'][:, None] * self.weights['accident_freq'],
+                self.components['region_spread'] / d['regions'][:, None] * self.weights['region_spread'],
+                self.components['species_diversity'] / d['species'][:, None] * self.weights['species_diversity'],
+                self.components['no_bird_saver_rate'] / 100 * self.weights['no_bird_saver_rate'],
+            ]
+        # 분모가 0인 슬라이스(빈 슬라이스)는 해당 항목 0점
+        return sum(np.nan_to_num(part, nan=0.0, posinf=0.0) for part in parts) * RISK_SCALE
+
+    def slice_factors(self, label):
+        """한 슬라이스의 시설물별 지표 dict (building_risk_factor_analysis 반환 형식)"""
+        i = self.labels.index(label)
+        return {
+            facility: {
+                'accident_freq': int(self.components['accident_freq'][i, j]),
+                'region_spread': int(self.components['region_spread'][i, j]),
+                'species_diversity': int(self.components['species_diversity'][i, j]),
+                'no_bird_saver_rate': float(self.components['no_bird_saver_rate'][i, j]),
+                'risk_index': float(self.risk_index[i, j]),
+            }
+            for j, facility in enumerate(self.facilities)
+        }
+
+    def to_records(self):
+        """슬라이스별 {label, denominators, facilities: [...위험도 내림차순]} 목록"""
+        records = []
+        for i, label in enumerate(self.labels):
+            factors = self.slice_factors(label)
+            ranked = sorted(factors.items(), key=lambda item: -item[1]['risk_index'])
+            records.append({
+                'label': label,
+                'denominators': {name: int(values[i]) for name, values in self.denominators.items()},
+                'facilities': [dict(facility=facility, **values) for facility, values in ranked],
+            })
+        return records
+
+
+def score_facility_risk(cube, slices, facilities=RISK_FACILITIES, weights=RISK_WEIGHTS):
+    """슬라이스별 시설물 위험도 지수를 한 번에 계산
+
+    slices: {라벨: 행 마스크(bool 배열)} - 슬라이스끼리 겹쳐도 됨
+    분모는 각 슬라이스 안에서 계산: 전체 사고 수, NULL 아닌 시도 수, 동정불가를 뺀 종 수
+    """
+    # 모든 슬라이스의 (슬라이스, 행) 쌍 - 이후 집계는 전부 이 쌍 배열 위에서 bincount/unique
+    labels, slice_idx, row_idx = _stack_slices(cube, slices)
+    n_slices = len(labels)
+
+    facility_codes = cube.codes('시설물유형명')
+    # 요청한 시설물만 열로 사용 (없는 시설물은 0)
+    facility_column = np.full(len(cube.categories('시설물유형명')), -1, dtype=np.int64)
+    for j, facility in enumerate(facilities):
+        code = cube.code_of('시설물유형명', facility)
+        if code is not None:
+            facility_column[code] = j
+    n_facilities = len(facilities)
+    row_facility = np.where(facility_codes >= 0, facility_column[np.maximum(facility_codes, 0)], -1)
+
+    pair_facility = row_facility[row_idx]
+    in_facility = pair_facility >= 0
+    cell = slice_idx[in_facility] * n_facilities + pair_facility[in_facility]
+    n_cells = n_slices * n_facilities
+    shape = (n_slices, n_facilities)
+
+    # 사고 빈도
+    accident_freq = np.bincount(cell, minlength=n_cells).reshape(shape)
+
+    # 지역 분산 / 종 다양성 (셀별, 슬라이스별 COUNT(DISTINCT))
+    region_codes = cube.codes('시도명')
+    n_regions = len(cube.categories('시도명'))
+    species_codes = _identified_species_codes(cube)
+    n_species = len(cube.categories('한글보통명'))
+
+    cell_rows = row_idx[in_facility]
+    region_spread = np.zeros(n_cells, dtype=np.int64)
+    species_diversity = np.zeros(n_cells, dtype=np.int64)
+    if len(cell_rows):
+        has_region = region_codes[cell_rows] >= 0
+        region_spread = _distinct(cell[has_region], n_cells, region_codes[cell_rows][has_region], n_regions)
+        has_species = species_codes[cell_rows] >= 0
+        species_diversity = _distinct(cell[has_species], n_cells, species_codes[cell_rows][has_species], n_species)
+
+    # 버드세이버 미설치율 (Y/N만 분모)
+    saver_codes = cube.codes('버드세이버여부')[cell_rows]
+    yes_code = cube.code_of('버드세이버여부', 'Y')
+    no_code = cube.code_of('버드세이버여부', 'N')
+    is_no = saver_codes == (no_code if no_code is not None else -2)
+    is_yes = saver_codes == (yes_code if yes_code is not None else -2)
+    no_counts = np.bincount(cell[is_no], minlength=n_cells)
+    yn_counts = no_counts + np.bincount(cell[is_yes], minlength=n_cells)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        no_bird_saver_rate = np.where(yn_counts > 0, no_counts * 100.0 / np.maximum(yn_counts, 1), 0.0)
+
+    # 슬라이스별 분모 (같은 쌍 배열에서 계산)
+    total_accidents = np.bincount(slice_idx, minlength=n_slices)
+    pair_regions = region_codes[row_idx]
+    regions = _distinct(slice_idx[pair_regions >= 0], n_slices, pair_regions[pair_regions >= 0], n_regions) \
+        if len(row_idx) else np.zeros(n_slices, dtype=np.int64)
+    pair_species = species_codes[row_idx]
+    species = _distinct(slice_idx[pair_species >= 0], n_slices, pair_species[pair_species >= 0], n_species) \
+        if len(row_idx) else np.zeros(n_slices, dtype=np.int64)
+
+    components = {
+        'accident_freq': accident_freq,
+        'region_spread': region_spread.reshape(shape),
+        'species_diversity': species_diversity.reshape(shape),
+        'no_bird_saver_rate': no_bird_saver_rate.reshape(shape),
+    }
+    denominators = {'total_accidents': total_accidents, 'regions': regions, 'species': species}
+    return RiskScores(labels, list(facilities), components, denominators, weights)
+
+
+def score_species_risk(cube, slices, top=20, rank_by='risk_score', weights=SPECIES_RISK_WEIGHTS):
+    """슬라이스별 조류 종 위험도 순위를 한 번에 계산 -> {라벨: [종별 dict, ...]}
+
+    그룹은 (한글보통명, 철새유형명) - 철새유형이 NULL인 행도 별도 그룹 (species_risk_analysis와 동일)
+    rank_by: 'risk_score' 또는 'accidents' (같으면 종/철새유형 코드 순)
+    """
+    labels, slice_idx, row_idx = _stack_slices(cube, slices)
+    species_codes = _identified_species_codes(cube)
+    empty = cube.code_of('한글보통명', '')
+    if empty is not None:
+        species_codes[species_codes == empty] = -1
+
+    migratory_codes = cube.codes('철새유형명')
+    migratory_values = cube.categories('철새유형명')
+    n_migratory = len(migratory_values) + 1  # 마지막 칸은 NULL
+    n_groups = len(cube.categories('한글보통명')) * n_migratory
+    row_group = np.where(species_codes >= 0,
+                         species_codes.astype(np.int64) * n_migratory
+                         + np.where(migratory_codes >= 0, migratory_codes, n_migratory - 1), -1)
+
+    pair_group = row_group[row_idx]
+    valid = pair_group >= 0
+    cell = slice_idx[valid] * n_groups + pair_group[valid]
+    cell_rows = row_idx[valid]
+    n_cells = len(labels) * n_groups
+
+    accidents = np.bincount(cell, minlength=n_cells)
+    counts = {}
+    for name, column in (('regions', '시도명'), ('facilities', '시설물유형명')):
+        codes = cube.codes(column)[cell_rows]
+        present = codes >= 0
+        counts[name] = _distinct(cell[present], n_cells, codes[present], len(cube.categories(column))) \
+            if len(cell) else np.zeros(n_cells, dtype=np.int64)
+    risk_score = (accidents * weights['accidents'] + counts['regions'] * weights['regions']
+                  + counts['facilities'] * weights['facilities'])
+
+    # 사고가 있는 셀만 (슬라이스, -점수, 그룹) 순으로 정렬 후 슬라이스마다 상위 top개
+    occupied = np.flatnonzero(accidents)
+    metric = risk_score if rank_by == 'risk_score' else accidents
+    order = occupied[np.lexsort((occupied % n_groups, -metric[occupied], occupied // n_groups))]
+    starts = np.searchsorted(order // n_groups, np.arange(len(labels) + 1))
+
+    species_values = cube.categories('한글보통명')
+    ranked = {}
+    for i, label in enumerate(labels):
+        rows = []
+        for rank, flat in enumerate(order[starts[i]:starts[i + 1]][:top], 1):
+            species, migratory = divmod(int(flat % n_groups), n_migratory)
+            rows.append({
+                'rank': rank,
+                'species': species_values[species],
+                'migratory_type': migratory_values[migratory] if migratory < n_migratory - 1 else None,
+                'accidents': int(accidents[flat]),
+                'regions': int(counts['regions'][flat]),
+                'facilities': int(counts['facilities'][flat]),
+                'risk_score': int(risk_score[flat]),
+            })
+        ranked[label] = rows
+    return ranked
+
+
+# 슬라이스 정의 도우미
+def all_rows(cube):
+    return np.ones(cube.n_rows, dtype=bool)
+
+
+def slices_by(cube, column, prefix=None):
+    """column 값마다 하나씩 슬라이스 {라벨: 마스크} (예: 조사연도, 시도명)"""
+    codes = cube.codes(column)
+    prefix = f"{prefix or column}="
+    return {f"{prefix}{value}": codes == code for code, value in enumerate(cube.categories(column))}
+
+
+def date_window(cube, start=None, end=None):
+    """관찰일자가 [start, end] 범위(YYYY-MM-DD, 양 끝 포함)인 행 마스크"""
+    values = cube.categories('관찰일자')
+    dates = np.array([str(v)[:10] for v in values], dtype=object)
+    in_window = np.ones(len(values), dtype=bool)
+    if start:
+        in_window &= dates >= start
+    if end:
+        in_window &= dates <= end
+    codes = cube.codes('관찰일자')
+    return (codes >= 0) & in_window[np.maximum(codes, 0)]
+
+
+def _category_mask(cube, column, values):
+    """column 값이 values 중 하나인 행 마스크 (문자열로 비교 - 조사연도가 정수/문자열 어느 쪽이든 동일)"""
+    wanted = {str(v) for v in values}
+    in_values = np.array([str(v) in wanted for v in cube.categories(column)], dtype=bool)
+    codes = cube.codes(column)
+    if not len(in_values):
+        return np.zeros(cube.n_rows, dtype=bool)
+    return (codes >= 0) & in_values[np.maximum(codes, 0)]
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+SLICE_FIELDS = ('label', 'year', 'month_from', 'month_to', 'province', 'habitat', 'start_date', 'end_date')
+
+
+def slice_mask(cube, definition):
+    """슬라이스 정의 dict -> 행 마스크
+
+    year/province/habitat: 값 하나 또는 목록, month_from/month_to: 1~12 (from > to이면 연말을 넘는 구간, 예: 12~2),
+    start_date/end_date: 관찰일자 YYYY-MM-DD (양 끝 포함). 지정하지 않은 조건은 전체.
+    """
+    unknown = set(definition) - set(SLICE_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 슬라이스 조건: {', '.join(sorted(unknown))}")
+    mask = all_rows(cube)
+    for field, column in (('year', '조사연도'), ('province', '시도명'), ('habitat', '서식지유형명')):
+        if definition.get(field) is not None:
+            mask &= _category_mask(cube, column, _as_list(definition[field]))
+
+    month_from, month_to = definition.get('month_from'), definition.get('month_to')
+    if month_from is not None or month_to is not None:
+        try:
+            month_from = int(month_from) if month_from is not None else 1
+            month_to = int(month_to) if month_to is not None else 12
+        except (TypeError, ValueError):
+            raise ValueError("month_from/month_to는 1~12 정수여야 합니다.")
+        if not (1 <= month_from <= 12 and 1 <= month_to <= 12):
+            raise ValueError("month_from/month_to는 1~12 정수여야 합니다.")
+        month = cube.numeric['관찰월']
+        with np.errstate(invalid='ignore'):
+            if month_from <= month_to:
+                mask &= (month >= month_from) & (month <= month_to)
+            else:
+                mask &= (month >= month_from) | (month <= month_to)
+
+    if definition.get('start_date') or definition.get('end_date'):
+        mask &= date_window(cube, definition.get('start_date'), definition.get('end_date'))
+    return mask
+
+
+def slice_label(definition):
+    """라벨이 없는 슬라이스 정의의 기본 라벨 (예: year=2023 month=3-5 province=서울특별시)"""
+    if definition.get('label'):
+        return str(definition['label'])
+    parts = []
+    if definition.get('year') is not None:
+        parts.append(f"year={','.join(str(v) for v in _as_list(definition['year']))}")
+    if definition.get('month_from') is not None or definition.get('month_to') is not None:
+        parts.append(f"month={definition.get('month_from') or 1}-{definition.get('month_to') or 12}")
+    for field in ('province', 'habitat'):
+        if definition.get(field) is not None:
+            parts.append(f"{field}={','.join(str(v) for v in _as_list(definition[field]))}")
+    if definition.get('start_date') or definition.get('end_date'):
+        parts.append(f"date={definition.get('start_date') or ''}~{definition.get('end_date') or ''}")
+    return ' '.join(parts) or '전체'
+
+
+def score_risk_slices(cube, definitions, top=10, facilities=RISK_FACILITIES):
+    """슬라이스 정의 목록 -> 슬라이스별 시설물 위험도/조류 종 위험도 순위표
+
+    모든 슬라이스를 한 번의 그룹 계산으로 처리 (슬라이스마다 다시 조회하지 않음)
+    """
+    started = time.perf_counter()
+    slices = {}
+    definitions_by_label = {}
+    for index, definition in enumerate(definitions):
+        if not isinstance(definition, dict):
+            raise ValueError(f"슬라이스 정의는 객체여야 합니다 (#{index + 1})")
+        base = label = slice_label(definition)
+        # 중복 라벨은 아직 쓰이지 않은 이름이 될 때까지 번호를 붙임 (명시적 라벨과도 겹치지 않게)
+        suffix = index + 1
+        while label in slices:
+            label = f"{base} #{suffix}"
+            suffix += 1
+        slices[label] = slice_mask(cube, definition)
+        definitions_by_label[label] = definition
+
+    facility_scores = score_facility_risk(cube, slices, facilities)
+    species_scores = score_species_risk(cube, slices, top=top)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    results = []
+    for record in facility_scores.to_records():
+        results.append({
+            'label': record['label'],
+            'definition': definitions_by_label[record['label']],
+            'denominators': record['denominators'],
+            'facility_risk': record['facilities'],
+            'species_risk': species_scores[record['label']],
+        })
+    return {
+        'slices': results,
+        'slice_count': len(results),
+        'elapsed_ms': round(elapsed_ms, 2),
+        'ms_per_slice': round(elapsed_ms / len(results), 3) if results else 0.0,
+    }
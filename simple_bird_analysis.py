@@ -6,122 +6,80 @@ Fiona를 사용한 GeoPackage 파일 읽기
 """
 
 import json
-import sqlite3
 import pandas as pd
 from collections import Counter
 import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings('ignore')
 
+from dataset_profile import load_profile, sqlite_float, sqlite_sort_key
+
 def analyze_gpkg_with_sqlite(file_path):
-    """SQLite를 사용하여 GeoPackage 파일 분석"""
+    """GeoPackage 파일 분석 (데이터셋 프로파일 사용 - DB는 프로파일이 없거나 바뀐 경우만 스캔)"""
     print("=" * 60)
     print("조류 유리창 충돌사고 데이터 분석 (SQLite 방식)")
     print("=" * 60)
     
     try:
-        # SQLite로 연결
-        conn = sqlite3.connect(file_path)
-        cursor = conn.cursor()
-        
-        # 테이블 목록 확인
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        print(f"✓ 발견된 테이블: {[table[0] for table in tables]}")
+        profile = load_profile(file_path)
         
-        # 메인 데이터 테이블 찾기
-        main_table = None
-        for table in tables:
-            table_name = table[0]
-            if table_name not in ['sqlite_sequence', 'gpkg_contents', 'gpkg_geometry_columns', 
-                                'gpkg_spatial_ref_sys', 'gpkg_ogr_contents']:
-                main_table = table_name
-                break
+        # 테이블 목록
+        print(f"✓ 발견된 테이블: {[table['name'] for table in profile.tables]}")
         
+        # 메인 데이터 테이블
+        main_table = profile.table
         if not main_table:
             print("✗ 메인 데이터 테이블을 찾을 수 없습니다.")
             return None
             
         print(f"✓ 메인 테이블: {main_table}")
         
-        # 테이블 구조 확인
-        cursor.execute(f"PRAGMA table_info({main_table});")
-        columns_info = cursor.fetchall()
+        # 테이블 구조
+        columns = profile.columns
         print(f"\n📋 컬럼 정보:")
-        for col_info in columns_info:
-            col_id, col_name, col_type, not_null, default, pk = col_info
-            print(f"   {col_id+1:2d}. {col_name:<20} ({col_type})")
+        for col_id, col_name in enumerate(columns):
+            print(f"   {col_id+1:2d}. {col_name:<20} ({profile.column(col_name)['type']})")
         
         # 전체 레코드 수
-        cursor.execute(f"SELECT COUNT(*) FROM {main_table};")
-        total_count = cursor.fetchone()[0]
+        total_count = profile.total_count
         print(f"\n📊 전체 레코드 수: {total_count:,}개")
         
-        # 샘플 데이터 조회
-        cursor.execute(f"SELECT * FROM {main_table} LIMIT 3;")
-        sample_data = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        
+        # 샘플 데이터 (geometry 컬럼은 프로파일에 저장하지 않음)
         print(f"\n📝 샘플 데이터:")
-        for i, row in enumerate(sample_data, 1):
+        for i, row in enumerate(profile.sample_rows(), 1):
             print(f"   레코드 {i}:")
-            for col, value in zip(columns, row):
-                if col != 'geom':  # geometry 컬럼은 제외
-                    print(f"     {col}: {value}")
+            for col, value in row.items():
+                print(f"     {col}: {value}")
             print()
         
         # 지역별 분석
-        region_columns = [col for col in columns if any(keyword in col.lower() for keyword in ['시도', '시군구', '구', '시', '도', 'region', 'area', '지역'])]
+        region_columns = profile.columns_with_role('region')
         if region_columns:
             print(f"🏙️  지역별 분석:")
             for col in region_columns[:2]:  # 처음 2개만
-                try:
-                    cursor.execute(f"SELECT {col}, COUNT(*) as count FROM {main_table} WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY count DESC LIMIT 10;")
-                    region_stats = cursor.fetchall()
-                    print(f"\n   {col} 상위 10개:")
-                    for region, count in region_stats:
-                        print(f"     - {region}: {count:,}건")
-                except Exception as e:
-                    print(f"     {col} 분석 오류: {e}")
+                print(f"\n   {col} 상위 10개:")
+                for region, count in profile.top_values(col, 10):
+                    print(f"     - {region}: {count:,}건")
         
         # 시간 관련 분석
-        time_columns = [col for col in columns if any(keyword in col.lower() for keyword in ['date', '날짜', '시간', 'time', '일시', '년', '월', '일'])]
+        time_columns = profile.columns_with_role('time')
         if time_columns:
             print(f"\n📅 시간 관련 분석:")
             for col in time_columns[:3]:  # 처음 3개만
-                try:
-                    cursor.execute(f"SELECT {col}, COUNT(*) as count FROM {main_table} WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY count DESC LIMIT 10;")
-                    time_stats = cursor.fetchall()
-                    print(f"\n   {col} 상위 10개:")
-                    for time_val, count in time_stats:
-                        print(f"     - {time_val}: {count:,}건")
-                except Exception as e:
-                    print(f"     {col} 분석 오류: {e}")
+                print(f"\n   {col} 상위 10개:")
+                for time_val, count in profile.top_values(col, 10):
+                    print(f"     - {time_val}: {count:,}건")
         
         # 수치형 데이터 분석
         print(f"\n📊 수치형 데이터 통계:")
-        for col_info in columns_info:
-            col_name = col_info[1]
-            col_type = col_info[2]
+        for col_name in columns:
+            col_type = profile.column(col_name)['type']
             if 'INT' in col_type.upper() or 'REAL' in col_type.upper() or 'FLOAT' in col_type.upper():
                 if col_name.lower() not in ['fid', 'id']:
-                    try:
-                        cursor.execute(f"""
-                            SELECT 
-                                MIN({col_name}) as min_val,
-                                MAX({col_name}) as max_val,
-                                AVG({col_name}) as avg_val,
-                                COUNT({col_name}) as count_val
-                            FROM {main_table} 
-                            WHERE {col_name} IS NOT NULL
-                        """)
-                        stats = cursor.fetchone()
-                        if stats and stats[3] > 0:
-                            print(f"   {col_name}: 최솟값={stats[0]}, 최댓값={stats[1]}, 평균={stats[2]:.2f}, 개수={stats[3]}")
-                    except Exception as e:
-                        print(f"   {col_name} 통계 오류: {e}")
+                    stats = profile.column(col_name).get('numeric')
+                    if stats and stats['count'] > 0:
+                        print(f"   {col_name}: 최솟값={stats['min']}, 최댓값={stats['max']}, 평균={stats['avg']:.2f}, 개수={stats['count']}")
         
-        conn.close()
         return main_table, columns
         
     except Exception as e:
@@ -131,36 +89,21 @@ def analyze_gpkg_with_sqlite(file_path):
 def generate_visualization_html(gpkg_file):
     """분석 결과를 보여주는 HTML 페이지 생성"""
     
-    # 데이터 다시 조회
-    conn = sqlite3.connect(gpkg_file)
-    cursor = conn.cursor()
-    
-    # 테이블 정보 가져오기
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
-    main_table = None
-    for table in tables:
-        table_name = table[0]
-        if table_name not in ['sqlite_sequence', 'gpkg_contents', 'gpkg_geometry_columns', 
-                            'gpkg_spatial_ref_sys', 'gpkg_ogr_contents']:
-            main_table = table_name
-            break
+    # 프로파일에서 조회 (analyze_gpkg_with_sqlite에서 이미 만들어졌으면 파일만 읽음)
+    profile = load_profile(gpkg_file)
+    main_table = profile.table
     
     if not main_table:
         return
     
     # 기본 통계
-    cursor.execute(f"SELECT COUNT(*) FROM {main_table};")
-    total_count = cursor.fetchone()[0]
+    total_count = profile.total_count
+    columns = profile.columns
     
     # 지역별 통계 (시도 기준)
     region_stats_html = ""
     try:
         # 시도 관련 컬럼 찾기
-        cursor.execute(f"PRAGMA table_info({main_table});")
-        columns_info = cursor.fetchall()
-        columns = [col[1] for col in columns_info]
-        
         sido_col = None
         for col in columns:
             if '시도' in col or 'sido' in col.lower():
@@ -168,8 +111,7 @@ def generate_visualization_html(gpkg_file):
                 break
         
         if sido_col:
-            cursor.execute(f"SELECT {sido_col}, COUNT(*) as count FROM {main_table} WHERE {sido_col} IS NOT NULL GROUP BY {sido_col} ORDER BY count DESC LIMIT 10;")
-            region_data = cursor.fetchall()
+            region_data = profile.top_values(sido_col, 10)
             
             region_stats_html = "<h3>🏙️ 지역별 사고 현황 (상위 10개)</h3><ul>"
             for region, count in region_data:
@@ -189,8 +131,9 @@ def generate_visualization_html(gpkg_file):
                 break
         
         if month_col:
-            cursor.execute(f"SELECT {month_col}, COUNT(*) as count FROM {main_table} WHERE {month_col} IS NOT NULL GROUP BY {month_col} ORDER BY CAST({month_col} AS INTEGER);")
-            monthly_data = cursor.fetchall()
+            # 월 컬럼은 고유값이 적어 프로파일에 전체 빈도가 저장됨 (CAST(월 AS INTEGER) 순서로 정렬)
+            monthly_data = sorted(profile.top_values(month_col, None),
+                                  key=lambda item: (int(sqlite_float(item[0])), sqlite_sort_key(item[0])))
             
             monthly_stats_html = "<h3>📅 월별 사고 현황</h3><ul>"
             for month, count in monthly_data:
@@ -199,8 +142,6 @@ def generate_visualization_html(gpkg_file):
     except:
         monthly_stats_html = "<p>월별 통계를 생성할 수 없습니다.</p>"
     
-    conn.close()
-    
     # HTML 생성
     html_content = f"""
     <!DOCTYPE html>
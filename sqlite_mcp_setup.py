@@ -8,125 +8,204 @@ SQLite MCP 테스트를 위한 데이터베이스 설정
 import sqlite3
 import pandas as pd
 from datetime import datetime
+import argparse
 import os
 import json
+import time
 
-def create_sqlite_mcp_database():
+SOURCE_GPKG_PATH = '조류유리창_충돌사고_2023_2024_전국.gpkg'
+
+SOURCE_QUERY = """
+SELECT 
+    관찰번호 as observation_number,
+    조사연도 as survey_year,
+    관찰일자 as observation_date,
+    등록일자 as registration_date,
+    한글보통명 as korean_name,
+    철새유형명 as migratory_type,
+    서식지유형명 as habitat_type,
+    학명 as scientific_name,
+    영문보통명 as english_name,
+    한글계명 as kingdom_ko,
+    한글문명 as phylum_ko,
+    한글강명 as class_ko,
+    한글목명 as order_ko,
+    한글과명 as family_ko,
+    한글속명 as genus_ko,
+    종 as species,
+    CAST(위도 AS REAL) as latitude,
+    CAST(경도 AS REAL) as longitude,
+    CAST(개체수 AS INTEGER) as individual_count,
+    시설물유형명 as facility_type,
+    버드세이버여부 as bird_saver,
+    시도명 as province
+FROM 조류유리창_충돌사고_2023_2024_전국
+WHERE 한글보통명 IS NOT NULL 
+AND 한글보통명 != '동정불가'
+AND 한글보통명 != ''
+{since_filter}
+ORDER BY 관찰일자, 시도명
+"""
+
+def read_source_records(source_path=SOURCE_GPKG_PATH, since=None):
+    """GeoPackage에서 레코드 추출 및 정리 (since: 이 등록일자 이후만)
+    
+    반환: (정리된 DataFrame, 추출 행 중 최대 등록일자 원문)
+    """
+    source_conn = sqlite3.connect(source_path)
+    try:
+        if since is None:
+            query = SOURCE_QUERY.format(since_filter="")
+            df = pd.read_sql_query(query, source_conn)
+        else:
+            # 같은 시각에 등록된 행을 놓치지 않도록 >= 로 읽고, 변경 없는 행은 적재 단계에서 걸러냄
+            query = SOURCE_QUERY.format(since_filter="AND (등록일자 >= ? OR 등록일자 IS NULL)")
+            df = pd.read_sql_query(query, source_conn, params=(since,))
+    finally:
+        source_conn.close()
+    
+    print(f"✅ 원본 데이터 추출: {len(df):,}개 레코드")
+    registration_hwm = df['registration_date'].dropna().max() if len(df) else None
+    
+    # 데이터 정리
+    df['observation_date'] = pd.to_datetime(df['observation_date'], errors='coerce')
+    df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce')
+    df['individual_count'] = df['individual_count'].fillna(1)
+    
+    # 결측값이 있는 중요 컬럼 제거
+    df = df.dropna(subset=['korean_name', 'observation_date'])
+    
+    print(f"📊 정리 후 데이터: {len(df):,}개 레코드")
+    return df, registration_hwm
+
+BIRD_COLLISIONS_DDL = """
+CREATE TABLE bird_collisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    observation_number TEXT,
+    survey_year INTEGER,
+    observation_date DATE,
+    registration_date DATE,
+    korean_name TEXT NOT NULL,
+    migratory_type TEXT,
+    habitat_type TEXT,
+    scientific_name TEXT,
+    english_name TEXT,
+    kingdom_ko TEXT,
+    phylum_ko TEXT,
+    class_ko TEXT,
+    order_ko TEXT,
+    family_ko TEXT,
+    genus_ko TEXT,
+    species TEXT,
+    latitude REAL,
+    longitude REAL,
+    individual_count INTEGER DEFAULT 1,
+    facility_type TEXT,
+    bird_saver TEXT,
+    province TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+BIRD_COLLISIONS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_observation_date ON bird_collisions(observation_date)",
+    "CREATE INDEX IF NOT EXISTS idx_korean_name ON bird_collisions(korean_name)",
+    "CREATE INDEX IF NOT EXISTS idx_province ON bird_collisions(province)",
+    "CREATE INDEX IF NOT EXISTS idx_facility_type ON bird_collisions(facility_type)",
+    "CREATE INDEX IF NOT EXISTS idx_migratory_type ON bird_collisions(migratory_type)",
+    "CREATE INDEX IF NOT EXISTS idx_survey_year ON bird_collisions(survey_year)",
+    "CREATE INDEX IF NOT EXISTS idx_location ON bird_collisions(latitude, longitude)",
+    "CREATE INDEX IF NOT EXISTS idx_observation_number ON bird_collisions(observation_number)"
+]
+
+def _to_sql_values(df):
+    """DataFrame을 sqlite3 바인딩 가능한 값으로 변환 (NaN/NaT -> None, Timestamp -> 문자열)"""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S')
+    df = df.astype(object).where(df.notna(), None)
+    return df
+
+def bulk_load_bird_collisions(conn, df, batch_size=50000):
+    """선언된 스키마를 유지한 채 executemany로 대량 적재 후 인덱스/ANALYZE 생성"""
+    columns = list(df.columns)
+    insert_sql = (f"INSERT INTO bird_collisions ({', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' for _ in columns)})")
+    values = _to_sql_values(df)
+    
+    cursor = conn.cursor()
+    # 적재 중에는 내구성보다 속도 우선 (실패 시 어차피 파일을 다시 만듦)
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+    cursor.execute("PRAGMA cache_size = -262144")
+    
+    started = time.perf_counter()
+    for start in range(0, len(values), batch_size):
+        batch = values.iloc[start:start + batch_size]
+        cursor.execute("BEGIN")
+        cursor.executemany(insert_sql, batch.itertuples(index=False, name=None))
+        conn.commit()
+    load_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    cursor.execute("BEGIN")
+    for index in BIRD_COLLISIONS_INDEXES:
+        cursor.execute(index)
+    conn.commit()
+    cursor.execute("ANALYZE")
+    index_seconds = time.perf_counter() - started
+    
+    # 서비스용 설정으로 복귀 (MCP 서버는 WAL 읽기 전용 커넥션 사용)
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    
+    rows = len(values)
+    return {
+        "rows": rows,
+        "load_seconds": load_seconds,
+        "rows_per_second": rows / load_seconds if load_seconds > 0 else float(rows),
+        "indexes": len(BIRD_COLLISIONS_INDEXES),
+        "index_seconds": index_seconds,
+    }
+
+def create_sqlite_mcp_database(mcp_db_path="bird_collision_mcp.db", source_path=SOURCE_GPKG_PATH):
     """MCP 테스트용 SQLite 데이터베이스 생성"""
     
     print("🐦 SQLite MCP 테스트 데이터베이스 생성 중...")
     
-    # MCP 테스트용 새 데이터베이스 생성
-    mcp_db_path = "bird_collision_mcp.db"
-    
     # 기존 파일이 있으면 삭제
     if os.path.exists(mcp_db_path):
         os.remove(mcp_db_path)
         print(f"🗑️ 기존 파일 삭제: {mcp_db_path}")
     
     try:
-        # 원본 GeoPackage에서 데이터 읽기
-        source_conn = sqlite3.connect('조류유리창_충돌사고_2023_2024_전국.gpkg')
-        
-        # 전체 데이터 추출 (동정불가 제외)
-        query = """
-        SELECT 
-            관찰번호 as observation_number,
-            조사연도 as survey_year,
-            관찰일자 as observation_date,
-            등록일자 as registration_date,
-            한글보통명 as korean_name,
-            철새유형명 as migratory_type,
-            서식지유형명 as habitat_type,
-            학명 as scientific_name,
-            영문보통명 as english_name,
-            한글계명 as kingdom_ko,
-            한글문명 as phylum_ko,
-            한글강명 as class_ko,
-            한글목명 as order_ko,
-            한글과명 as family_ko,
-            한글속명 as genus_ko,
-            종 as species,
-            CAST(위도 AS REAL) as latitude,
-            CAST(경도 AS REAL) as longitude,
-            CAST(개체수 AS INTEGER) as individual_count,
-            시설물유형명 as facility_type,
-            버드세이버여부 as bird_saver,
-            시도명 as province
-        FROM 조류유리창_충돌사고_2023_2024_전국
-        WHERE 한글보통명 IS NOT NULL 
-        AND 한글보통명 != '동정불가'
-        AND 한글보통명 != ''
-        ORDER BY 관찰일자, 시도명
-        """
-        
-        df = pd.read_sql_query(query, source_conn)
-        source_conn.close()
-        
-        print(f"✅ 원본 데이터 추출: {len(df):,}개 레코드")
-        
-        # 데이터 정리
-        df['observation_date'] = pd.to_datetime(df['observation_date'], errors='coerce')
-        df['registration_date'] = pd.to_datetime(df['registration_date'], errors='coerce')
-        df['individual_count'] = df['individual_count'].fillna(1)
-        
-        # 결측값이 있는 중요 컬럼 제거
-        df = df.dropna(subset=['korean_name', 'observation_date'])
-        
-        print(f"📊 정리 후 데이터: {len(df):,}개 레코드")
+        # 원본 GeoPackage에서 데이터 읽기 (동정불가 제외)
+        df, registration_hwm = read_source_records(source_path)
         
         # 새 SQLite 데이터베이스 생성
         mcp_conn = sqlite3.connect(mcp_db_path)
         cursor = mcp_conn.cursor()
         
-        # 테이블 생성
-        cursor.execute("""
-        CREATE TABLE bird_collisions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            observation_number TEXT,
-            survey_year INTEGER,
-            observation_date DATE,
-            registration_date DATE,
-            korean_name TEXT NOT NULL,
-            migratory_type TEXT,
-            habitat_type TEXT,
-            scientific_name TEXT,
-            english_name TEXT,
-            kingdom_ko TEXT,
-            phylum_ko TEXT,
-            class_ko TEXT,
-            order_ko TEXT,
-            family_ko TEXT,
-            genus_ko TEXT,
-            species TEXT,
-            latitude REAL,
-            longitude REAL,
-            individual_count INTEGER DEFAULT 1,
-            facility_type TEXT,
-            bird_saver TEXT,
-            province TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        # 인덱스 생성
-        indexes = [
-            "CREATE INDEX idx_observation_date ON bird_collisions(observation_date)",
-            "CREATE INDEX idx_korean_name ON bird_collisions(korean_name)",
-            "CREATE INDEX idx_province ON bird_collisions(province)",
-            "CREATE INDEX idx_facility_type ON bird_collisions(facility_type)",
-            "CREATE INDEX idx_migratory_type ON bird_collisions(migratory_type)",
-            "CREATE INDEX idx_survey_year ON bird_collisions(survey_year)",
-            "CREATE INDEX idx_location ON bird_collisions(latitude, longitude)"
-        ]
-        
-        for index in indexes:
-            cursor.execute(index)
-        
-        print("📋 테이블 및 인덱스 생성 완료")
-        
-        # 데이터 삽입
-        df.to_sql('bird_collisions', mcp_conn, if_exists='replace', index=False)
+        # 테이블 생성 (인덱스는 적재 후에 생성)
+        cursor.execute(BIRD_COLLISIONS_DDL)
+        print("📋 테이블 생성 완료")
+        
+        # 데이터 대량 적재 + 인덱스/통계 생성
+        load_stats = bulk_load_bird_collisions(mcp_conn, df)
+        print(f"⚡ 적재 완료: {load_stats['rows']:,}행, {load_stats['load_seconds']:.2f}초 "
+              f"({load_stats['rows_per_second']:,.0f} rows/s)")
+        print(f"📇 인덱스 {load_stats['indexes']}개 생성 + ANALYZE: {load_stats['index_seconds']:.2f}초")
+        
+        # 이후 --sync가 이 시점부터 증분으로 읽도록 high-water mark 기록
+        _ensure_sync_state(mcp_conn)
+        _write_sync_state(mcp_conn, {
+            "registration_hwm": registration_hwm,
+            "last_sync_mode": "full",
+            "last_sync_at": datetime.now().isoformat(),
+            "last_sync_inserted": load_stats['rows'],
+            "last_sync_updated": 0,
+        })
         
         # 통계 뷰 생성
         cursor.execute("""
@@ -216,6 +295,10 @@ def create_sqlite_mcp_database():
         # 커밋 및 연결 종료
         mcp_conn.commit()
         
+        # 요약 뷰를 물리화한 테이블 생성 (MCP 서버가 뷰 대신 조회)
+        summaries = refresh_summary_tables(mcp_conn)
+        print(f"📦 요약 테이블 생성: {', '.join(info['table'] for info in summaries.values())}")
+        
         # 최종 통계 출력
         cursor.execute("SELECT COUNT(*) FROM bird_collisions")
         total_records = cursor.fetchone()[0]
@@ -244,6 +327,250 @@ def create_sqlite_mcp_database():
         print(f"❌ 데이터베이스 생성 실패: {e}")
         return None
 
+# 대시보드/MCP 쿼리용 물리화 요약 테이블 (원본 뷰 이름 -> 요약 테이블 이름)
+SUMMARY_VIEWS = {
+    "species_statistics": "summary_species_statistics",
+    "province_statistics": "summary_province_statistics",
+    "monthly_trends": "summary_monthly_trends",
+    "facility_analysis": "summary_facility_analysis",
+    "seasonal_analysis": "summary_seasonal_analysis",
+}
+
+def refresh_summary_tables(conn, views=None):
+    """요약 테이블을 원본 뷰 정의로부터 다시 계산하고 메타데이터 기록"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS summary_metadata (
+        summary_table TEXT PRIMARY KEY,
+        source_view TEXT NOT NULL,
+        refreshed_at TIMESTAMP NOT NULL,
+        source_rows INTEGER NOT NULL,
+        source_max_rowid INTEGER,
+        group_rows INTEGER NOT NULL,
+        build_ms REAL
+    )
+    """)
+    
+    cursor.execute("SELECT COUNT(*), MAX(rowid) FROM bird_collisions")
+    source_rows, source_max_rowid = cursor.fetchone()
+    
+    refreshed = {}
+    for view_name, table_name in SUMMARY_VIEWS.items():
+        if views is not None and view_name not in views:
+            continue
+        
+        started = time.perf_counter()
+        # 원본 뷰의 ORDER BY 순서를 rowid 순서로 보존
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+        cursor.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {view_name}")
+        group_rows = cursor.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        build_ms = (time.perf_counter() - started) * 1000
+        
+        cursor.execute("""
+        INSERT OR REPLACE INTO summary_metadata
+            (summary_table, source_view, refreshed_at, source_rows, source_max_rowid, group_rows, build_ms)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (table_name, view_name, datetime.now().isoformat(), source_rows, source_max_rowid,
+              group_rows, round(build_ms, 2)))
+        refreshed[view_name] = {"table": table_name, "rows": group_rows, "build_ms": round(build_ms, 2)}
+    
+    conn.commit()
+    return refreshed
+
+def summary_status(conn):
+    """요약 테이블별 최신 여부 (원본 행 수/최대 rowid가 바뀌었으면 stale)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), MAX(rowid) FROM bird_collisions")
+    source_rows, source_max_rowid = cursor.fetchone()
+    
+    try:
+        cursor.execute("""
+        SELECT summary_table, source_view, refreshed_at, source_rows, source_max_rowid, group_rows
+        FROM summary_metadata
+        """)
+    except sqlite3.OperationalError:
+        return {}
+    
+    status = {}
+    for table_name, view_name, refreshed_at, rows, max_rowid, group_rows in cursor.fetchall():
+        status[view_name] = {
+            "table": table_name,
+            "refreshed_at": refreshed_at,
+            "group_rows": group_rows,
+            "stale": rows != source_rows or max_rowid != source_max_rowid,
+        }
+    return status
+
+def refresh_summaries_command(db_path="bird_collision_mcp.db"):
+    """--refresh-summaries: 요약 테이블 재계산"""
+    if not os.path.exists(db_path):
+        print(f"❌ 데이터베이스 없음: {db_path}")
+        return False
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        before = summary_status(conn)
+        refreshed = refresh_summary_tables(conn)
+    finally:
+        conn.close()
+    
+    for view_name, info in refreshed.items():
+        was = before.get(view_name)
+        state = "신규" if was is None else ("stale → 갱신" if was["stale"] else "갱신")
+        print(f"🔄 {view_name} → {info['table']}: {info['rows']}행, {info['build_ms']}ms ({state})")
+    return True
+
+# 요약 테이블별 원본 컬럼 의존성 (변경된 컬럼과 겹치는 요약만 재계산)
+SUMMARY_DEPENDENCIES = {
+    "species_statistics": {"korean_name", "migratory_type", "individual_count", "province", "facility_type", "observation_date"},
+    "province_statistics": {"province", "korean_name", "individual_count", "facility_type"},
+    "monthly_trends": {"observation_date", "korean_name", "individual_count", "province"},
+    "facility_analysis": {"facility_type", "korean_name", "individual_count", "province", "bird_saver"},
+    "seasonal_analysis": {"observation_date", "korean_name", "individual_count", "province"},
+}
+
+def _ensure_sync_state(conn):
+    """증분 동기화 상태 테이블 (high-water mark 등)"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS sync_state (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+def _read_sync_state(conn):
+    _ensure_sync_state(conn)
+    return dict(conn.execute("SELECT key, value FROM sync_state").fetchall())
+
+def _write_sync_state(conn, values):
+    now = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT OR REPLACE INTO sync_state (key, value, updated_at) VALUES (?, ?, ?)",
+        [(key, None if value is None else str(value), now) for key, value in values.items()]
+    )
+
+def _same_value(a, b):
+    """SQLite 저장값과 원본값 비교 (타입 친화도 차이 무시: '2023' == 2023, 2.0 == 2)"""
+    if a is None or b is None:
+        return a is None and b is None
+    if a == b:
+        return True
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return str(a) == str(b)
+
+def sync_sqlite_mcp_database(mcp_db_path="bird_collision_mcp.db", source_path=SOURCE_GPKG_PATH):
+    """GeoPackage의 신규/변경 레코드만 라이브 DB에 반영 (관찰번호 기준 upsert, 등록일자 high-water mark)"""
+    
+    if not os.path.exists(mcp_db_path):
+        print(f"ℹ️ {mcp_db_path} 없음 - 전체 생성으로 진행")
+        return create_sqlite_mcp_database(mcp_db_path, source_path)
+    
+    print("🔄 SQLite MCP 데이터베이스 증분 동기화 중...")
+    started = time.perf_counter()
+    
+    # WAL 모드에서는 MCP 서버의 읽기 전용 커넥션이 동기화 중에도 이전 스냅샷을 계속 읽음
+    conn = sqlite3.connect(mcp_db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        for index in BIRD_COLLISIONS_INDEXES:
+            conn.execute(index)
+        
+        state = _read_sync_state(conn)
+        since = state.get("registration_hwm")
+        print(f"📍 high-water mark: {since or '(없음 - 전체 비교)'}")
+        
+        df, registration_hwm = read_source_records(source_path, since)
+        values = _to_sql_values(df)
+        columns = list(values.columns)
+        
+        # 관찰번호가 없는 행은 키로 식별할 수 없어 증분 대상에서 제외
+        keyed = values[values['observation_number'].notna()]
+        skipped = len(values) - len(keyed)
+        # 컬럼이 TEXT로 선언되어 저장값은 문자열 - 원본이 정수여도 조회 키/삽입값을 문자열로 맞춤
+        keyed = keyed.assign(observation_number=keyed['observation_number'].astype(str))
+        keyed = keyed.drop_duplicates(subset=['observation_number'], keep='last')
+        
+        # 기존 행 조회 (SQLite 변수 개수 제한 때문에 나눠서)
+        numbers = list(keyed['observation_number'])
+        existing = {}
+        for start in range(0, len(numbers), 500):
+            chunk = numbers[start:start + 500]
+            rows = conn.execute(
+                f"SELECT id, {', '.join(columns)} FROM bird_collisions "
+                f"WHERE observation_number IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            )
+            for row in rows:
+                existing[row[1]] = (row[0], row[1:])
+        
+        inserts, updates = [], []
+        changed_columns = set()
+        for record in keyed.itertuples(index=False, name=None):
+            current = existing.get(record[0])
+            if current is None:
+                inserts.append(record)
+                continue
+            row_id, stored = current
+            diff = {columns[i] for i, (new, old) in enumerate(zip(record, stored)) if not _same_value(new, old)}
+            if diff:
+                updates.append(record + (row_id,))
+                changed_columns |= diff
+        
+        if inserts:
+            conn.executemany(
+                f"INSERT INTO bird_collisions ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                inserts
+            )
+        if updates:
+            conn.executemany(
+                f"UPDATE bird_collisions SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                updates
+            )
+        
+        new_hwm = max(filter(None, [since, registration_hwm]), default=None)
+        _write_sync_state(conn, {
+            "registration_hwm": new_hwm,
+            "last_sync_mode": "incremental",
+            "last_sync_at": datetime.now().isoformat(),
+            "last_sync_inserted": len(inserts),
+            "last_sync_updated": len(updates),
+        })
+        
+        # 행이 추가되면 모든 요약이, 수정만 있으면 변경 컬럼에 의존하는 요약만 영향을 받음
+        if inserts:
+            affected = list(SUMMARY_VIEWS)
+        else:
+            affected = [view for view, deps in SUMMARY_DEPENDENCIES.items() if deps & changed_columns]
+        
+        if affected:
+            refresh_summary_tables(conn, affected)  # upsert와 같은 트랜잭션으로 커밋
+        else:
+            conn.commit()
+        
+        if inserts or updates:
+            conn.execute("PRAGMA optimize")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 증분 동기화 실패: {e}")
+        return None
+    finally:
+        conn.close()
+    
+    elapsed = time.perf_counter() - started
+    print(f"✅ 증분 동기화 완료: 신규 {len(inserts):,}건, 변경 {len(updates):,}건, "
+          f"관찰번호 없음 {skipped:,}건 제외 ({elapsed:.2f}초)")
+    if affected:
+        print(f"📦 요약 갱신: {', '.join(affected)}")
+    print(f"📍 새 high-water mark: {new_hwm}")
+    
+    return mcp_db_path
+
 def create_mcp_test_queries():
     """MCP 테스트용 쿼리 생성"""
     
@@ -466,11 +793,26 @@ def test_sqlite_connection(db_path):
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite MCP 테스트 데이터베이스 설정")
+    parser.add_argument("--refresh-summaries", action="store_true",
+                        help="전체 재생성 없이 요약 테이블만 다시 계산")
+    parser.add_argument("--sync", action="store_true",
+                        help="GeoPackage의 신규/변경 레코드만 기존 DB에 반영 (무중단)")
+    parser.add_argument("--db", default="bird_collision_mcp.db", help="MCP 데이터베이스 경로")
+    parser.add_argument("--source", default=SOURCE_GPKG_PATH, help="원본 GeoPackage 경로")
+    args = parser.parse_args()
+    
+    if args.refresh_summaries:
+        raise SystemExit(0 if refresh_summaries_command(args.db) else 1)
+    
+    if args.sync:
+        raise SystemExit(0 if sync_sqlite_mcp_database(args.db, args.source) else 1)
+    
     print("🧪 SQLite MCP 테스트 환경 설정")
     print("=" * 60)
     
     # 1. MCP 테스트용 SQLite 데이터베이스 생성
-    db_path = create_sqlite_mcp_database()
+    db_path = create_sqlite_mcp_database(args.db, args.source)
     
     if db_path:
         # 2. 테스트 쿼리 생성
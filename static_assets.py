@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+정적 페이지(HTML 대시보드)/데이터 파일 메모리 캐시
+허용된 파일만 한 번 읽어 gzip/brotli 사전 압축본과 함께 보관 - 강한 ETag, 304 응답, Range 요청, 장기 캐시 헤더
+파일 mtime이 바뀐 경우에만 다시 읽음 (원본 파일을 변환한 파생 파일도 같은 방식으로 관리)
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 gzip만 제공
+    brotli = None
+
+# 브라우저 캐시 유지 시간 (ETag로 재검증하므로 파일이 바뀌면 max-age 이후 새 내용 수신)
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 86400))
+# 이보다 작은 파일은 압축 이득이 거의 없어 원본만 제공
+MIN_COMPRESS_BYTES = 1024
+
+# 서버가 선호하는 순서 (같은 품질이면 앞쪽 선택)
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+class StaticAsset:
+    def __init__(self, path, mtime_ns, size, body, mimetype=None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.mimetype = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.mimetype.startswith('text/'):
+            self.mimetype += '; charset=utf-8'
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        # 인코딩 -> 본문 (압축본은 원본보다 작을 때만 보관)
+        self.variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = compressed
+
+    def variant_etag(self, encoding):
+        """표현(인코딩)마다 다른 강한 ETag"""
+        return self.etag if encoding == 'identity' else f'{self.etag}-{encoding}'
+
+    def nbytes(self):
+        return sum(len(body) for body in self.variants.values())
+
+
+class StaticAssetCache:
+    """허용 목록에 있는 파일만 서빙하는 메모리 캐시
+
+    derived: 서빙 이름 -> (원본 파일 이름, 변환 함수 bytes -> bytes, mimetype)
+    원본 파일의 mtime이 바뀌면 변환도 다시 실행된다.
+    """
+
+    def __init__(self, base_dir, allowed, derived=None):
+        self.base_dir = base_dir
+        self.derived = dict(derived or {})
+        self.allowed = frozenset(allowed) | frozenset(self.derived)
+        self._lock = threading.Lock()
+        self._assets = {}
+        self.stats = {'hits': 0, 'loads': 0, 'reloads': 0, 'not_modified': 0, 'partial': 0}
+
+    def _source_name(self, filename):
+        return self.derived[filename][0] if filename in self.derived else filename
+
+    def _load(self, filename, st):
+        path = os.path.join(self.base_dir, self._source_name(filename))
+        with open(path, 'rb') as f:
+            body = f.read()
+        mimetype = None
+        if filename in self.derived:
+            _, transform, mimetype = self.derived[filename]
+            body = transform(body)
+        return StaticAsset(path, st.st_mtime_ns, st.st_size, body, mimetype)
+
+    def get(self, filename):
+        """허용된 파일의 StaticAsset (없거나 허용되지 않으면 None)"""
+        if filename not in self.allowed:
+            return None
+        try:
+            st = os.stat(os.path.join(self.base_dir, self._source_name(filename)))
+        except OSError:
+            with self._lock:
+                self._assets.pop(filename, None)
+            return None
+
+        with self._lock:
+            asset = self._assets.get(filename)
+        if asset is not None and asset.mtime_ns == st.st_mtime_ns and asset.size == st.st_size:
+            with self._lock:
+                self.stats['hits'] += 1
+            return asset
+
+        # 압축은 락 밖에서 (동시에 두 번 읽혀도 결과는 같음)
+        reloaded = asset is not None
+        asset = self._load(filename, st)
+        with self._lock:
+            self._assets[filename] = asset
+            self.stats['reloads' if reloaded else 'loads'] += 1
+        print(f"정적 파일 {'다시 ' if reloaded else ''}로드: {filename} "
+              f"({', '.join(f'{enc} {len(body):,}B' for enc, body in asset.variants.items())})")
+        return asset
+
+    def warm(self):
+        """허용된 파일을 미리 읽고 압축 (서버 시작 시 백그라운드에서 호출)"""
+        for filename in sorted(self.allowed):
+            try:
+                self.get(filename)
+            except (OSError, ValueError) as e:
+                print(f"정적 파일 로드 실패: {filename} - {e}")
+
+    def response(self, filename, request, response_class):
+        """Accept-Encoding에 맞는 사전 압축본으로 응답 - 없으면 None
+
+        If-None-Match/If-Modified-Since가 맞으면 304, Range 요청이면 선택된 표현(압축본)의 부분 206
+        """
+        asset = self.get(filename)
+        if asset is None:
+            return None
+
+        encoding = request.accept_encodings.best_match(
+            [enc for enc in ENCODINGS if enc in asset.variants], default='identity')
+        response = response_class(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+        response.set_etag(asset.variant_etag(encoding))
+        response.last_modified = asset.mtime_ns / 1e9
+        body_length = len(asset.variants[encoding])
+        response = response.make_conditional(request, accept_ranges=True, complete_length=body_length)
+        if response.status_code in (304, 206):
+            with self._lock:
+                self.stats['not_modified' if response.status_code == 304 else 'partial'] += 1
+        return response
+
+    def health(self):
+        with self._lock:
+            return {
+                'files': len(self._assets),
+                'bytes': sum(asset.nbytes() for asset in self._assets.values()),
+                'brotli': brotli is not None,
+                **self.stats,
+            }
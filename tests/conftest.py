@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(sqlite_mcp_setup, risk_scoring 등)을 import할 수 있도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+risk_scoring 슬라이스 배치 점수 테스트 (합성 데이터 큐브 사용)
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from analytics_cube import cube_from_frame  # noqa: E402
+from risk_scoring import score_risk_slices  # noqa: E402
+
+
+def _make_cube():
+    rows = []
+    for i in range(24):
+        rows.append({
+            "시설물유형명": ["방음벽", "건물"][i % 2],
+            "시도명": ["서울특별시", "경기도", "부산광역시"][i % 3],
+            "한글보통명": ["멧비둘기", "직박구리", "참새", "동정불가"][i % 4],
+            "철새유형명": "텃새",
+            "서식지유형명": "산림",
+            "버드세이버여부": ["Y", "N"][i % 2],
+            "조사연도": [2023, 2024][i % 2],
+            "관찰일자": f"{[2023, 2024][i % 2]}-{i % 12 + 1:02d}-15",
+            "개체수": "1",
+        })
+    return cube_from_frame(pd.DataFrame(rows))
+
+
+def test_colliding_labels_keep_every_slice():
+    definitions = [{'year': 2023}, {'label': 'year=2023 #3'}, {'year': 2023}, {'year': 2023}]
+    result = score_risk_slices(_make_cube(), definitions)
+
+    assert result['slice_count'] == len(definitions)
+    labels = [entry['label'] for entry in result['slices']]
+    assert len(set(labels)) == len(definitions)
+    assert [entry['definition'] for entry in result['slices']] == definitions
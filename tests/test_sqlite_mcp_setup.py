@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sqlite_mcp_setup 증분 동기화 테스트 (합성 GeoPackage 원본 사용)
+"""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pandas")
+
+import sqlite_mcp_setup  # noqa: E402
+
+SOURCE_TABLE = "조류유리창_충돌사고_2023_2024_전국"
+
+
+def _make_source(path, observation_number_type):
+    conn = sqlite3.connect(path)
+    conn.execute(f"""
+    CREATE TABLE {SOURCE_TABLE} (
+        관찰번호 {observation_number_type}, 조사연도 INTEGER, 관찰일자 TEXT, 등록일자 TEXT,
+        한글보통명 TEXT, 철새유형명 TEXT, 서식지유형명 TEXT, 학명 TEXT, 영문보통명 TEXT,
+        한글계명 TEXT, 한글문명 TEXT, 한글강명 TEXT, 한글목명 TEXT, 한글과명 TEXT, 한글속명 TEXT,
+        종 TEXT, 위도 TEXT, 경도 TEXT, 개체수 TEXT, 시설물유형명 TEXT, 버드세이버여부 TEXT, 시도명 TEXT
+    )
+    """)
+    species = ["멧비둘기", "직박구리", "참새"]
+    rows = [
+        (1000 + i, 2023, f"2023-{i % 12 + 1:02d}-15", "2024-01-01 00:00:00",
+         species[i % 3], "텃새", "산림", None, None, "동물계", "척삭동물문", "조강", None, None, None,
+         None, "37.5", "127.0", "1", "방음벽", "N", "서울특별시")
+        for i in range(30)
+    ]
+    conn.executemany(f"INSERT INTO {SOURCE_TABLE} VALUES ({', '.join('?' * 22)})", rows)
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def _row_count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM bird_collisions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("observation_number_type", ["INTEGER", "TEXT"])
+def test_noop_sync_does_not_duplicate_rows(tmp_path, observation_number_type):
+    source = str(tmp_path / "source.gpkg")
+    db_path = str(tmp_path / "mcp.db")
+    expected = _make_source(source, observation_number_type)
+
+    assert sqlite_mcp_setup.create_sqlite_mcp_database(db_path, source) == db_path
+    assert _row_count(db_path) == expected
+
+    assert sqlite_mcp_setup.sync_sqlite_mcp_database(db_path, source) == db_path
+    assert _row_count(db_path) == expected
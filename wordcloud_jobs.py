@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+워드클라우드 비동기 작업 큐
+PDF 파싱/토큰화/렌더링을 요청 스레드가 아닌 로컬 워커 프로세스에서 실행 - 대기열 한도, 작업별 제한 시간, 취소 지원
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict, deque
+from multiprocessing.connection import wait as wait_connections
+
+JOB_WORKERS = int(os.environ.get('WORDCLOUD_JOB_WORKERS', os.cpu_count() or 1))
+# 대기 + 실행 중인 작업 수 한도 (넘으면 429)
+JOB_QUEUE_DEPTH = int(os.environ.get('WORDCLOUD_JOB_QUEUE_DEPTH', 32))
+JOB_TIMEOUT = float(os.environ.get('WORDCLOUD_JOB_TIMEOUT', 120))
+# 끝난 작업 결과를 조회할 수 있는 시간
+JOB_RESULT_TTL = float(os.environ.get('WORDCLOUD_JOB_RESULT_TTL', 600))
+JOB_LONG_POLL_MAX = 30.0
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMEOUT = 'timeout'
+FINISHED_STATES = (DONE, FAILED, CANCELLED, TIMEOUT)
+
+_SCHEDULER_TICK = 0.1
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 찬 경우"""
+
+
+class JobInputError(Exception):
+    """입력 문제로 생성할 수 없는 경우 (워커에서 발생, 메시지를 그대로 사용자에게 전달)"""
+
+
+# 워커 프로세스 쪽
+_worker_tokenizers = {}
+
+
+def _worker_tokenizer(user_stopwords_file):
+    """워커 프로세스당 토큰화 엔진 하나 (불용어 파일은 바뀐 경우에만 다시 읽음)"""
+    tokenizer = _worker_tokenizers.get(user_stopwords_file)
+    if tokenizer is None:
+        from wordcloud_text import HangulSuffixStripper, TokenizerEngine, UserStopwordStore
+        tokenizer = TokenizerEngine(UserStopwordStore(user_stopwords_file), normalizer=HangulSuffixStripper())
+        _worker_tokenizers[user_stopwords_file] = tokenizer
+    return tokenizer
+
+
+def run_wordcloud_job(params):
+    """워커에서 실행되는 작업 본체: (필요하면) 단어 빈도 계산 + 렌더링"""
+    from wordcloud_render import render_wordcloud
+    from wordcloud_text import PdfTextStream
+
+    result = {}
+    word_freq = params.get('word_freq')
+    if word_freq is None:
+        tokenizer = _worker_tokenizer(params['user_stopwords_file'])
+        extra_stopwords = frozenset(params.get('extra_stopwords', ()))
+        if params.get('pdf_path'):
+            with open(params['pdf_path'], 'rb') as f:
+                # 작업 자체가 워커에서 돌기 때문에 PDF 페이지 추출은 이 프로세스 안에서 처리
+                text = PdfTextStream(f, workers=1)
+                counts = tokenizer.count_words(text, extra_stopwords)
+            if text.chars < 50:
+                raise JobInputError('최소 50자 이상의 텍스트가 필요합니다.')
+            result.update(pdf_pages=text.pages_read, pdf_truncated=text.truncated,
+                          pdf_timed_out=text.timed_out)
+        else:
+            counts = tokenizer.count_words(params['text'], extra_stopwords)
+        word_freq = counts.most_common(params['word_count'])
+        if not word_freq:
+            raise JobInputError('분석할 수 있는 단어를 찾을 수 없습니다.')
+        result['computed_frequencies'] = True
+
+    word_freq = dict(word_freq)
+    result['word_freq'] = word_freq
+    result['image'] = render_wordcloud(word_freq, params['shape'], params['color_mode'],
+                                       params['width'], params['height'], params.get('font_path'),
+                                       params['image_format'])
+    return result
+
+
+def _worker_main(conn):
+    """워커 루프: (job_id, params)를 받아 (job_id, 상태, 결과)를 돌려줌"""
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        job_id, params = message
+        try:
+            reply = (job_id, DONE, run_wordcloud_job(params))
+        except JobInputError as e:
+            reply = (job_id, FAILED, {'error': str(e), 'input_error': True})
+        except Exception as e:
+            traceback.print_exc()
+            reply = (job_id, FAILED, {'error': f'워드클라우드 생성 중 오류: {str(e)}'})
+        try:
+            conn.send(reply)
+        except (BrokenPipeError, OSError):
+            return
+
+
+# 부모 프로세스 쪽
+class Job:
+    def __init__(self, params, on_finish=None, cleanup=None):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.cancel_requested = False
+        self.on_finish = on_finish
+        self.cleanup = cleanup
+        self.done_event = threading.Event()
+
+    def to_dict(self):
+        info = {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.cancel_requested and self.status == RUNNING:
+            info['cancel_requested'] = True
+        if self.error:
+            info['error'] = self.error
+        return info
+
+
+class _Worker:
+    def __init__(self, context, index):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,),
+                                       name=f'wordcloud-job-{index}', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job = None
+        self.deadline = None
+
+    def stop(self, force=False):
+        if not force:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+
+class JobQueue:
+    """고정 개수의 워커 프로세스 + 스케줄러 스레드
+
+    ProcessPoolExecutor는 실행 중인 작업 하나만 중단할 수 없으므로, 워커마다 파이프를 두고
+    제한 시간 초과/취소 시 해당 워커만 종료 후 다시 띄운다.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_depth=JOB_QUEUE_DEPTH, timeout=JOB_TIMEOUT,
+                 result_ttl=JOB_RESULT_TTL):
+        self.worker_count = max(1, workers)
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        # 멀티스레드 서버에서 fork하지 않도록 spawn 사용
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._workers = []
+        self._scheduler = None
+        self._closed = False
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0,
+                      'timeouts': 0, 'rejected': 0, 'worker_restarts': 0}
+
+    # 공개 API
+    def submit(self, params, on_finish=None, cleanup=None):
+        """작업 등록 -> Job (대기열이 가득 차면 QueueFullError)
+
+        on_finish(job)은 워커 결과를 받은 스케줄러 스레드에서 호출되며 job.result를 가공할 수 있다.
+        cleanup()은 작업이 어떤 상태로 끝나든 한 번 호출된다 (임시 파일 정리 등).
+        """
+        job = Job(params, on_finish, cleanup)
+        with self._lock:
+            if self._closed:
+                raise QueueFullError('작업 큐가 종료되었습니다.')
+            active = len(self._pending) + sum(1 for w in self._workers if w.job is not None)
+            if active >= self.max_depth:
+                self.stats['rejected'] += 1
+                raise QueueFullError(f'대기 중인 작업이 너무 많습니다 (최대 {self.max_depth}개).')
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self.stats['submitted'] += 1
+        self._ensure_started()
+        return job
+
+    def complete(self, result, params=None):
+        """워커를 거치지 않고 바로 끝난 작업 등록 (결과가 이미 캐시에 있는 경우)"""
+        job = Job(params)
+        job.status = DONE
+        job.started_at = job.finished_at = job.created_at
+        job.result = result
+        job.done_event.set()
+        with self._lock:
+            self._jobs[job.id] = job
+            self.stats['submitted'] += 1
+            self.stats['completed'] += 1
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """long-poll: 작업이 끝나거나 timeout(초)이 지날 때까지 대기"""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.done_event.wait(min(timeout, JOB_LONG_POLL_MAX))
+        return job
+
+    def cancel(self, job_id):
+        """대기 중이면 바로 취소, 실행 중이면 스케줄러가 워커를 종료 -> Job 또는 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish_locked(job, CANCELLED, error='작업이 취소되었습니다.')
+                finished = job
+            else:
+                job.cancel_requested = True
+                finished = None
+        if finished is not None:
+            self._after_finish(finished)
+        return job
+
+    def health(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                'workers': self.worker_count,
+                'workers_alive': sum(1 for w in self._workers if w.process.is_alive()),
+                'queued': len(self._pending),
+                'running': sum(1 for w in self._workers if w.job is not None),
+                'max_depth': self.max_depth,
+                'timeout': self.timeout,
+                'jobs': counts,
+                **self.stats,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+            pending = list(self._pending)
+            self._pending.clear()
+            for job in pending:
+                self._finish_locked(job, CANCELLED, error='서버가 종료되어 작업이 취소되었습니다.')
+        for job in pending:
+            self._after_finish(job)
+        for worker in workers:
+            worker.stop(force=worker.job is not None)
+
+    # 내부 구현
+    def _ensure_started(self):
+        """첫 작업이 들어올 때 워커와 스케줄러 시작 (import만으로는 프로세스를 띄우지 않음)"""
+        with self._lock:
+            if self._scheduler is not None:
+                return
+            self._workers = [_Worker(self._context, i) for i in range(self.worker_count)]
+            self._scheduler = threading.Thread(target=self._run, name='wordcloud-job-scheduler', daemon=True)
+            self._scheduler.start()
+        atexit.register(self.shutdown)
+
+    def _finish_locked(self, job, status, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.params = None  # 원문 텍스트는 결과 보관 기간 동안 들고 있지 않음
+        self.stats[{DONE: 'completed', FAILED: 'failed', CANCELLED: 'cancelled',
+                    TIMEOUT: 'timeouts'}[status]] += 1
+
+    def _after_finish(self, job):
+        if job.cleanup is not None:
+            try:
+                job.cleanup()
+            except Exception as e:
+                print(f"작업 정리 중 오류 ({job.id}): {e}")
+        job.done_event.set()
+
+    def _restart_worker(self, worker):
+        worker.stop(force=True)
+        replacement = _Worker(self._context, worker.index)
+        with self._lock:
+            self._workers[worker.index] = replacement
+            self.stats['worker_restarts'] += 1
+
+    def _run(self):
+        while True:
+            if self._closed:
+                return
+            try:
+                self._tick()
+            except Exception:
+                # 스케줄러 스레드가 죽으면 큐 전체가 멈추므로 기록만 하고 계속
+                traceback.print_exc()
+                time.sleep(_SCHEDULER_TICK)
+
+    def _tick(self):
+        with self._lock:
+            if self._closed:
+                return
+            workers = list(self._workers)
+            # 놀고 있는 워커에 대기 작업 배정
+            for worker in workers:
+                if worker.job is None and self._pending:
+                    job = self._pending.popleft()
+                    try:
+                        worker.conn.send((job.id, job.params))
+                    except (BrokenPipeError, OSError):
+                        self._pending.appendleft(job)
+                        continue
+                    job.status = RUNNING
+                    job.started_at = time.time()
+                    worker.job = job
+                    worker.deadline = job.started_at + self.timeout
+
+        busy = [w for w in workers if w.job is not None]
+        ready = wait_connections([w.conn for w in busy], _SCHEDULER_TICK) if busy else []
+        if not busy:
+            time.sleep(_SCHEDULER_TICK)
+
+        for worker in busy:
+            job = worker.job
+            if worker.conn in ready:
+                self._collect(worker, job)
+            elif job.cancel_requested:
+                self._abort(worker, job, CANCELLED, '작업이 취소되었습니다.')
+            elif time.time() > worker.deadline:
+                self._abort(worker, job, TIMEOUT, f'작업 제한 시간({self.timeout:.0f}초)을 초과했습니다.')
+            elif not worker.process.is_alive():
+                self._abort(worker, job, FAILED, '워커 프로세스가 비정상 종료되었습니다.')
+
+        self._expire()
+
+    def _collect(self, worker, job):
+        try:
+            _, status, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            self._abort(worker, job, FAILED, '워커 프로세스가 비정상 종료되었습니다.')
+            return
+        worker.job = None
+        job.result = payload
+        if status == DONE and job.on_finish is not None:
+            try:
+                job.on_finish(job)
+            except Exception as e:
+                traceback.print_exc()
+                status, payload = FAILED, {'error': f'결과 저장 중 오류: {str(e)}'}
+        with self._lock:
+            if status == DONE:
+                self._finish_locked(job, DONE, result=job.result)
+            else:
+                self._finish_locked(job, FAILED, result=payload, error=payload.get('error'))
+        self._after_finish(job)
+
+    def _abort(self, worker, job, status, message):
+        print(f"작업 중단 ({status}): {job.id} - {message}")
+        worker.job = None
+        with self._lock:
+            self._finish_locked(job, status, error=message)
+        self._after_finish(job)
+        if not self._closed:
+            self._restart_worker(worker)
+
+    def _expire(self):
+        """보관 기간이 지난 완료 작업 삭제"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.status in FINISHED_STATES and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
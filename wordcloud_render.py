@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+워드클라우드 렌더링
+matplotlib figure를 거치지 않고 WordCloud 이미지를 바로 PNG/WebP로 인코딩 (pyplot 전역 상태 없음)
+"""
+
+import io
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+from matplotlib import colormaps
+from PIL import Image, ImageDraw
+import wordcloud.wordcloud as wordcloud_module
+from wordcloud import WordCloud
+
+# PNG zlib 압축 수준 (0-9, 낮을수록 빠르고 파일이 큼), WebP 품질/압축 방법
+PNG_COMPRESS_LEVEL = int(os.environ.get('WORDCLOUD_PNG_COMPRESS_LEVEL', 3))
+WEBP_QUALITY = int(os.environ.get('WORDCLOUD_WEBP_QUALITY', 85))
+WEBP_METHOD = int(os.environ.get('WORDCLOUD_WEBP_METHOD', 4))
+
+IMAGE_MIME_TYPES = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+}
+
+# UI에서 고를 수 있는 모양/캔버스 크기 (templates/wordcloud.html) - 시작 시 마스크 캐시 예열 대상
+UI_SHAPES = ['circle', 'heart', 'diamond', 'triangle', 'pentagon', 'star']
+UI_CANVAS_SIZES = [(600, 450), (800, 600), (1200, 900)]
+
+# 마스크 캐시 메모리 한도 (UI 조합 전체 예열 시 약 66MB)
+MASK_CACHE_BYTES = int(os.environ.get('WORDCLOUD_MASK_CACHE_BYTES', 96 * 1024 * 1024))
+
+
+class ColormapColorFunc:
+    """matplotlib 컬러맵을 미리 256단계 RGB 문자열로 만들어 둔 WordCloud color_func
+    
+    WordCloud(colormap=...)는 내부에서 pyplot을 import하므로 대신 사용한다.
+    """
+    
+    def __init__(self, name):
+        cmap = colormaps[name]
+        self._palette = [
+            "rgb({:.0f}, {:.0f}, {:.0f})".format(*np.maximum(0, 255 * np.array(cmap(i / 255))[:3]))
+            for i in range(256)
+        ]
+    
+    def __call__(self, word, font_size, position, orientation, random_state=None, **kwargs):
+        if random_state is None:
+            random_state = np.random
+        return self._palette[int(random_state.uniform(0, 1) * 255)]
+
+
+COLOR_FUNCS = {
+    'color': ColormapColorFunc('viridis'),
+    'grayscale': ColormapColorFunc('gray'),
+}
+
+
+def create_shape_mask(shape, width, height):
+    """다양한 모양의 마스크 생성"""
+    mask = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(mask)
+    
+    center_x, center_y = width // 2, height // 2
+    # 원형일 때는 더 크게, 다른 모양일 때는 적당히
+    if shape == 'circle':
+        size = min(width, height) // 2.2  # 원형을 더 크게
+    else:
+        size = min(width, height) // 3
+    
+    if shape == 'circle':
+        # 완벽한 원형 생성
+        draw.ellipse([center_x - size, center_y - size, 
+                     center_x + size, center_y + size], fill='black')
+        # 가장자리를 부드럽게 하기 위해 작은 원 추가
+        for i in range(3):
+            offset = i * 2
+            draw.ellipse([center_x - size + offset, center_y - size + offset, 
+                         center_x + size - offset, center_y + size - offset], fill='black')
+    
+    elif shape == 'heart':
+        # 하트 모양 그리기
+        heart_points = []
+        for t in np.arange(0, 2 * np.pi, 0.1):
+            x = 16 * np.sin(t)**3
+            y = 13 * np.cos(t) - 5 * np.cos(2*t) - 2 * np.cos(3*t) - np.cos(4*t)
+            heart_points.append((center_x + x * size//20, center_y - y * size//20))
+        draw.polygon(heart_points, fill='black')
+    
+    elif shape == 'diamond':
+        points = [
+            (center_x, center_y - size),
+            (center_x + size, center_y),
+            (center_x, center_y + size),
+            (center_x - size, center_y)
+        ]
+        draw.polygon(points, fill='black')
+    
+    elif shape == 'triangle':
+        points = [
+            (center_x, center_y - size),
+            (center_x + size, center_y + size//2),
+            (center_x - size, center_y + size//2)
+        ]
+        draw.polygon(points, fill='black')
+    
+    elif shape == 'pentagon':
+        points = []
+        for i in range(5):
+            angle = i * 2 * np.pi / 5 - np.pi/2
+            x = center_x + size * np.cos(angle)
+            y = center_y + size * np.sin(angle)
+            points.append((x, y))
+        draw.polygon(points, fill='black')
+    
+    elif shape == 'star':
+        points = []
+        for i in range(10):
+            angle = i * np.pi / 5 - np.pi/2
+            radius = size if i % 2 == 0 else size * 0.4
+            x = center_x + radius * np.cos(angle)
+            y = center_y + radius * np.sin(angle)
+            points.append((x, y))
+        draw.polygon(points, fill='black')
+    
+    # WordCloud는 255(흰색)만 제외 영역으로 보므로 한 채널(L)로 충분
+    return np.array(mask.convert('L'))
+
+
+# 캐시 항목: 마스크, WordCloud용 boolean 마스크, 빈 캔버스의 적분 이미지 (모두 읽기 전용)
+MaskEntry = namedtuple('MaskEntry', ['mask', 'boolean_mask', 'integral', 'nbytes'])
+
+
+class MaskCache:
+    """(shape, width, height) -> 마스크/점유 데이터 LRU 캐시 (바이트 한도)"""
+    
+    def __init__(self, max_bytes=MASK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # id(boolean_mask) -> 항목 (WordCloud 내부에서 적분 이미지를 찾을 때 사용)
+        self._by_boolean_id = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    @staticmethod
+    def _build(shape, width, height):
+        mask = create_shape_mask(shape, width, height)
+        boolean_mask = mask == 255
+        integral = np.cumsum(np.cumsum(255 * boolean_mask, axis=1), axis=0).astype(np.uint32)
+        for array in (mask, boolean_mask, integral):
+            array.flags.writeable = False
+        return MaskEntry(mask, boolean_mask, integral,
+                         mask.nbytes + boolean_mask.nbytes + integral.nbytes)
+    
+    def get(self, shape, width, height):
+        key = (shape, width, height)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            self.stats['misses'] += 1
+        
+        entry = self._build(shape, width, height)
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            if entry.nbytes <= self.max_bytes:
+                self._entries[key] = entry
+                self._by_boolean_id[id(entry.boolean_mask)] = entry
+                self._bytes += entry.nbytes
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._by_boolean_id.pop(id(evicted.boolean_mask), None)
+                    self._bytes -= evicted.nbytes
+                    self.stats['evictions'] += 1
+        return entry
+    
+    def integral_for(self, boolean_mask):
+        """캐시된 boolean 마스크면 미리 계산한 적분 이미지"""
+        with self._lock:
+            entry = self._by_boolean_id.get(id(boolean_mask))
+        if entry is not None and entry.boolean_mask is boolean_mask:
+            return entry.integral
+        return None
+    
+    def warm(self, shapes=UI_SHAPES, sizes=UI_CANVAS_SIZES):
+        """UI 조합을 미리 계산"""
+        started = time.perf_counter()
+        for width, height in sizes:
+            for shape in shapes:
+                self.get(shape, width, height)
+        print(f"마스크 캐시 예열 완료: {len(self._entries)}개, "
+              f"{self._bytes / (1024 * 1024):.1f} MB ({time.perf_counter() - started:.2f}초)")
+    
+    def health(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, **self.stats}
+
+
+MASK_CACHE = MaskCache()
+
+
+class _PrecomputedOccupancyMap(wordcloud_module.IntegralOccupancyMap):
+    """캐시된 마스크면 적분 이미지를 다시 계산하지 않고 복사만 함
+    
+    WordCloud.generate_from_frequencies가 모듈 전역 IntegralOccupancyMap을 직접 생성하므로
+    그 이름만 이 클래스로 바꿔 둔다 (캐시에 없는 마스크는 기존과 동일하게 계산).
+    """
+    
+    def __init__(self, height, width, mask):
+        integral = MASK_CACHE.integral_for(mask) if mask is not None else None
+        if integral is None:
+            super().__init__(height, width, mask)
+            return
+        self.height = height
+        self.width = width
+        # 배치 중 update()가 적분 이미지를 갱신하므로 요청마다 복사본 사용
+        self.integral = integral.copy()
+
+
+wordcloud_module.IntegralOccupancyMap = _PrecomputedOccupancyMap
+
+
+class CachedMaskWordCloud(WordCloud):
+    """캐시된 MaskEntry를 쓰는 WordCloud (boolean 마스크 변환도 건너뜀)"""
+    
+    def __init__(self, mask_entry=None, **kwargs):
+        self._mask_entry = mask_entry
+        if mask_entry is not None:
+            kwargs['mask'] = mask_entry.mask
+        super().__init__(**kwargs)
+    
+    def _get_bolean_mask(self, mask):
+        if self._mask_entry is not None and mask is self._mask_entry.mask:
+            return self._mask_entry.boolean_mask
+        return super()._get_bolean_mask(mask)
+
+
+
+def build_wordcloud(word_freq, shape='circle', color_mode='color', width=600, height=450,
+                    font_path=None):
+    """WordCloud 레이아웃 계산"""
+    # 색상 설정
+    color_func = COLOR_FUNCS['grayscale' if color_mode == 'grayscale' else 'color']
+    
+    # WordCloud 기본 설정
+    wc_config = {
+        'width': width,
+        'height': height,
+        'background_color': 'white',
+        'max_words': len(word_freq),
+        'color_func': color_func,
+        'font_path': font_path if font_path and os.path.exists(font_path) else None,
+        'relative_scaling': 0.5,
+        'min_font_size': 12,
+        'max_font_size': 100,
+        'prefer_horizontal': 0.7
+    }
+    
+    # 모든 모양에 대해 마스크 사용 (원형 포함) - 캐시에서 가져와 래스터화 생략
+    wc_config['mask_entry'] = MASK_CACHE.get(shape, width, height)
+    # 마스크 사용시 추가 설정
+    wc_config['mode'] = 'RGBA'
+    wc_config['contour_width'] = 0
+    wc_config['contour_color'] = 'steelblue'
+    
+    return CachedMaskWordCloud(**wc_config).generate_from_frequencies(word_freq)
+
+
+def encode_image(image, image_format='png'):
+    """PIL 이미지 -> PNG/WebP 바이트"""
+    if image.mode == 'RGBA':
+        # 배경이 불투명 흰색이라 알파 채널은 정보가 없음 - 빼면 인코딩이 빠르고 파일이 작아짐
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    if image_format == 'webp':
+        image.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=WEBP_METHOD)
+    else:
+        image.save(buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+def render_wordcloud(word_freq, shape='circle', color_mode='color', width=600, height=450,
+                     font_path=None, image_format='png'):
+    """워드클라우드 이미지 바이트 (스레드 안전: 요청마다 독립된 WordCloud/PIL 객체만 사용)"""
+    wc = build_wordcloud(word_freq, shape, color_mode, width, height, font_path)
+    return encode_image(wc.to_image(), image_format)
+
+
+def _legacy_render(wc, width, height):
+    """기존 matplotlib 경로 (벤치마크 비교용)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    plt.figure(figsize=(width/100, height/100))
+    plt.imshow(wc, interpolation='bilinear')
+    plt.axis('off')
+    plt.tight_layout(pad=0)
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+    plt.close()
+    return buffer.getvalue()
+
+
+def benchmark(word_freq, width=600, height=450, repeat=5, font_path=None):
+    """레이아웃 이후 이미지 출력 단계만 비교 (matplotlib 경유 vs 직접 인코딩)"""
+    wc = build_wordcloud(word_freq, 'circle', 'color', width, height, font_path)
+    results = {}
+    for name, run in (
+        ('matplotlib', lambda: _legacy_render(wc, width, height)),
+        ('png', lambda: encode_image(wc.to_image(), 'png')),
+        ('webp', lambda: encode_image(wc.to_image(), 'webp')),
+    ):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = run()
+            timings.append(time.perf_counter() - started)
+        results[name] = {'ms': round(min(timings) * 1000, 1), 'bytes': len(data)}
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+    from collections import Counter
+    
+    sample = ' '.join(sys.argv[1:]) or open('comprehensive_policy_document.json', encoding='utf-8').read()
+    freq = dict(Counter(w for w in sample.split() if len(w) >= 2).most_common(100))
+    for name, result in benchmark(freq).items():
+        print(f"   • {name}: {result['ms']} ms, {result['bytes']:,} bytes")
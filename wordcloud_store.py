@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+워드클라우드 결과 저장소 (콘텐츠 해시 키)
+단어 빈도와 렌더링된 이미지를 따로 보관 - 메모리 LRU + 선택적 디스크 계층(크기 기준 정리)
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+MEMORY_BYTES = int(os.environ.get('WORDCLOUD_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# 비워 두면 디스크 계층을 쓰지 않음
+DISK_DIR = os.environ.get('WORDCLOUD_CACHE_DIR', '')
+DISK_BYTES = int(os.environ.get('WORDCLOUD_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+
+# 토큰화/렌더링 방식이 바뀌면 올려서 이전 결과를 무효화
+PIPELINE_VERSION = '1'
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+_FREQUENCIES_EXT = 'json'
+
+
+def content_hash(data):
+    """문자열/바이트 또는 바이트를 내는 파일 객체의 sha256 (파일은 읽은 뒤 처음으로 되돌림)"""
+    digest = hashlib.sha256()
+    if isinstance(data, str):
+        digest.update(data.encode('utf-8'))
+    elif isinstance(data, (bytes, bytearray)):
+        digest.update(data)
+    else:
+        data.seek(0)
+        for block in iter(lambda: data.read(1024 * 1024), b''):
+            digest.update(block)
+        data.seek(0)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """요청 파라미터 조합 -> 64자리 hex 키"""
+    payload = json.dumps([PIPELINE_VERSION, *parts], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class WordcloudStore:
+    def __init__(self, max_bytes=MEMORY_BYTES, disk_dir=DISK_DIR, max_disk_bytes=DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir or None
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        # (key, ext) -> bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+
+    # 메모리 계층
+    def _remember(self, name, data):
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[name] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats['evictions'] += 1
+
+    # 디스크 계층
+    def _disk_path(self, key, ext):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.{ext}")
+
+    def _scan_disk(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _write_disk(self, key, ext, data):
+        path = self._disk_path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_bytes += len(data)
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """오래 안 쓴 파일부터 삭제 (여러 프로세스가 같은 디렉터리를 쓸 수 있어 매번 다시 스캔)"""
+        entries = sorted(self._scan_disk(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.stats['disk_evictions'] += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    def _read_disk(self, key, ext):
+        path = self._disk_path(key, ext)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # 최근 사용 표시 (정리 순서용)
+            return data
+        except OSError:
+            return None
+
+    # 공개 API
+    def get_bytes(self, key, ext):
+        name = (key, ext)
+        with self._lock:
+            data = self._entries.get(name)
+            if data is not None:
+                self._entries.move_to_end(name)
+                self.stats['hits'] += 1
+                return data
+
+        if self.disk_dir:
+            data = self._read_disk(key, ext)
+            if data is not None:
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                self._remember(name, data)
+                return data
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put_bytes(self, key, ext, data):
+        self._remember((key, ext), data)
+        if self.disk_dir:
+            self._write_disk(key, ext, data)
+
+    def get_frequencies(self, key):
+        """저장된 단어 빈도 (빈도 내림차순 dict) 또는 None"""
+        data = self.get_bytes(key, _FREQUENCIES_EXT)
+        if data is None:
+            return None
+        return dict(json.loads(data.decode('utf-8')))
+
+    def put_frequencies(self, key, word_freq):
+        data = json.dumps(list(word_freq.items()), ensure_ascii=False).encode('utf-8')
+        self.put_bytes(key, _FREQUENCIES_EXT, data)
+
+    def get_image(self, key, image_format):
+        return self.get_bytes(key, image_format)
+
+    def put_image(self, key, image_format, data):
+        self.put_bytes(key, image_format, data)
+
+    def health(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_dir': self.disk_dir,
+                'disk_bytes': self._disk_bytes if self.disk_dir else 0,
+                'max_disk_bytes': self.max_disk_bytes if self.disk_dir else 0,
+                **self.stats,
+            }
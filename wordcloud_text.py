@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+워드클라우드 텍스트 처리 엔진
+불용어 사전은 모듈 로드 시 한 번만 만들고, 토큰화는 컴파일된 정규식 한 번으로 처리
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+
+# 한국어 불용어 목록 (확장된 일반적인 불용어 사전)
+KOREAN_STOPWORDS = frozenset([
+    # 조사
+    '이', '가', '을', '를', '에', '에서', '로', '으로', '와', '과', '의', '도', '은', '는',
+    '부터', '까지', '에게', '께', '한테', '에게서', '께서', '로서', '로써', '처럼', '같이',
+    '만큼', '보다', '밖에', '뿐', '조차', '마저', '라도', '나마', '이나', '이라도',
+    
+    # 어미
+    '다', '이다', '었다', '았다', '겠다', '하다', '되다', '있다', '없다', '같다', '이다',
+    '한다', '된다', '한다', '말다', '이며', '이고', '이거나', '거나', '든지', '던지',
+    
+    # 대명사
+    '그', '저', '이', '것', '그것', '저것', '이것', '여기', '거기', '저기', '이곳', '그곳',
+    '저곳', '누구', '무엇', '언제', '어디', '어떻게', '왜', '어느', '얼마', '몇',
+    
+    # 동사/형용사 기본형
+    '하다', '되다', '있다', '없다', '이다', '아니다', '그렇다', '이렇다', '저렇다',
+    '크다', '작다', '좋다', '나쁘다', '높다', '낮다', '많다', '적다', '길다', '짧다',
+    
+    # 부사
+    '더', '덜', '가장', '매우', '너무', '정말', '진짜', '참', '꽤', '상당히', '아주',
+    '조금', '약간', '살짝', '완전', '전혀', '별로', '거의', '대략', '약', '한',
+    '또', '다시', '또다시', '또한', '역시', '역시나', '물론', '당연히', '확실히',
+    
+    # 접속사
+    '그리고', '그런데', '그러나', '하지만', '그래서', '따라서', '그러므로', '왜냐하면',
+    '만약', '만일', '비록', '설령', '아무리', '혹시', '혹은', '또는', '아니면',
+    
+    # 감탄사
+    '아', '어', '오', '우', '에', '와', '어머', '어머나', '어머니', '어이', '음', '흠',
+    
+    # 의존명사
+    '것', '수', '점', '개', '번', '줄', '때', '시', '곳', '데', '바', '뿐', '지', '듯',
+    
+    # 기타 고빈도 기능어
+    '등', '같은', '다른', '새로운', '이런', '저런', '그런', '어떤', '모든', '각', '여러',
+    '일부', '전체', '전부', '부분', '대부분', '소부분', '약간의', '많은', '적은',
+    '있는', '없는', '한', '두', '세', '네', '다섯', '첫', '둘째', '셋째', '마지막',
+    
+    # 추가 불용어 (사용자 요청)
+    '있습니다', '대한', '있도록', '특히', '되는', '통한', '방면에서', '제공합니다', 
+    '이상', '관련', '같은', '이런', '위한', '대해', '통해', '위해', '때문에', '인해',
+    '따른', '따라', '경우', '때문', '관해', '대해서', '에서의', '으로서', '로서의',
+    '에서는', '에는', '으로의', '로의', '에의', '만의', '들의', '들은', '들이',
+    '들을', '라는', '이라는', '다는', '한다는', '된다는', '있다는', '없다는'
+])
+
+# 영어 불용어 목록 (확장된 일반적인 불용어 사전)
+ENGLISH_STOPWORDS = frozenset([
+    # 관사
+    'a', 'an', 'the',
+    
+    # 접속사
+    'and', 'or', 'but', 'nor', 'for', 'so', 'yet', 'because', 'since', 'as', 'while',
+    'although', 'though', 'unless', 'until', 'before', 'after', 'when', 'where',
+    'however', 'therefore', 'moreover', 'furthermore', 'nevertheless', 'nonetheless',
+    
+    # 전치사
+    'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'about', 'into',
+    'through', 'during', 'before', 'after', 'above', 'below', 'up', 'down', 'out',
+    'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there',
+    'between', 'among', 'across', 'around', 'behind', 'beside', 'beyond', 'inside',
+    'outside', 'toward', 'towards', 'within', 'without', 'upon', 'against',
+    
+    # be동사
+    'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    
+    # 조동사
+    'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing', 'done',
+    'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'shall',
+    
+    # 대명사
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'hers',
+    'ours', 'theirs', 'myself', 'yourself', 'himself', 'herself', 'itself',
+    'ourselves', 'yourselves', 'themselves', 'this', 'that', 'these', 'those',
+    'who', 'whom', 'whose', 'which', 'what', 'where', 'when', 'why', 'how',
+    
+    # 기타 고빈도 기능어
+    'not', 'no', 'nor', 'yes', 'all', 'any', 'both', 'each', 'few', 'more', 'most',
+    'other', 'some', 'such', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
+    'just', 'now', 'also', 'back', 'even', 'still', 'way', 'well', 'get', 'go',
+    'know', 'take', 'see', 'come', 'think', 'say', 'get', 'make', 'go', 'know',
+    'take', 'see', 'come', 'could', 'there', 'use', 'her', 'would', 'make',
+    'like', 'into', 'time', 'has', 'look', 'two', 'more', 'go', 'no', 'way',
+    'could', 'my', 'than', 'first', 'been', 'call', 'who', 'oil', 'sit', 'now',
+    'find', 'long', 'down', 'day', 'did', 'get', 'come', 'made', 'may', 'part'
+])
+
+DEFAULT_STOPWORDS = KOREAN_STOPWORDS | ENGLISH_STOPWORDS
+
+# 단어 = 공백 토큰 안의 연속된 \w 문자 (기존 "특수문자 -> 공백 후 split"과 같은 결과), 1글자 토큰은 정규식 단계에서 제외
+TOKEN_PATTERN = re.compile(r'\w{2,}')
+
+# 큰 텍스트는 이 크기 단위로 나눠 토큰 리스트가 한꺼번에 메모리에 올라오지 않게 함
+CHUNK_CHARS = 1 << 20
+
+
+class UserStopwordStore:
+    """사용자 정의 불용어 파일 캐시 (파일 mtime/크기가 바뀔 때만 다시 읽음)"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._words = frozenset()
+    
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+    
+    def get(self):
+        """현재 사용자 불용어 (frozenset)"""
+        signature = self._file_signature()
+        with self._lock:
+            if signature == self._signature:
+                return self._words
+            words = frozenset()
+            if signature is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        words = frozenset(json.load(f).get('stopwords', []))
+                except Exception as e:
+                    print(f"사용자 불용어 로드 오류: {e}")
+            self._signature = signature
+            self._words = words
+            return words
+    
+    def add(self, new_words):
+        """불용어 추가 저장, 저장 후 전체 불용어 반환"""
+        updated = set(self.get()) | set(new_words)
+        data = {
+            'stopwords': list(updated),
+            'last_updated': datetime.now().isoformat(),
+            'total_count': len(updated)
+        }
+        with self._lock:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 방금 쓴 내용을 그대로 캐시 (다음 get에서 다시 읽지 않도록)
+            self._signature = self._file_signature()
+            self._words = frozenset(updated)
+            return self._words
+    
+    def clear(self):
+        """저장된 불용어 삭제"""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._signature = None
+            self._words = frozenset()
+
+
+def _iter_chunks(text, size=CHUNK_CHARS):
+    """공백 경계에서 자른 텍스트 조각 (단어가 조각 사이에서 잘리지 않음)"""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + size
+        if end < length:
+            cut = max(text.rfind(' ', start, end), text.rfind('\n', start, end))
+            if cut > start:
+                end = cut
+        yield text[start:end]
+        start = end
+
+
+# 조사 (명사 뒤)
+JOSA_SUFFIXES = [
+    '이', '가', '을', '를', '은', '는', '에', '의', '도', '만', '와', '과', '로', '으로',
+    '에서', '에게', '에게서', '께', '께서', '한테', '부터', '까지', '처럼', '보다', '마다',
+    '조차', '마저', '라도', '이라도', '이나', '나', '이며', '며', '이랑', '랑', '로서', '으로서',
+    '로써', '으로써', '로부터', '으로부터', '에서부터', '이라', '이라는', '라는', '이란', '란',
+    '같이', '밖에', '뿐', '이다', '입니다', '이었다', '였다',
+]
+
+# 조사 뒤에 다시 붙는 보조사 ('에서' + '는' -> '에서는')
+JOSA_TAILS = ['는', '은', '도', '의', '만']
+JOSA_HEADS = ['에', '에서', '에게', '로', '으로', '와', '과', '까지', '부터', '보다', '처럼',
+              '만', '로서', '으로서']
+
+# 명사 + 하다/되다/적 계열 어미 ('설치하는' -> '설치', '체계적인' -> '체계')
+EOMI_SUFFIXES = [
+    '하다', '한다', '했다', '하였다', '하는', '하고', '하며', '하여', '해', '해서', '했으며',
+    '하였으며', '하기', '함', '합니다', '한', '할', '하면', '하지', '하도록', '하여야', '해야',
+    '되다', '된다', '되었다', '되는', '된', '될', '되어', '되며', '되고', '됨', '됩니다',
+    '되도록', '되어야', '시키는', '시킨', '시켜', '적', '적인', '적으로', '적이다',
+]
+
+
+def _build_korean_suffixes():
+    suffixes = set(JOSA_SUFFIXES) | set(EOMI_SUFFIXES)
+    suffixes |= {head + tail for head in JOSA_HEADS for tail in JOSA_TAILS}
+    # 복수 접미사 '들' + 조사
+    suffixes |= {'들'} | {'들' + josa for josa in list(suffixes) if josa in JOSA_SUFFIXES or josa[-1] in JOSA_TAILS}
+    return frozenset(suffixes)
+
+
+KOREAN_SUFFIXES = _build_korean_suffixes()
+# 어휘 확인 없이 떼는 접미사: 두 글자 이상 하다/되다/적 계열 어미
+# (조사는 '우크라이나' -> '우크라'처럼 명사 끝 글자와 겹치므로 항상 어휘로 확인)
+FREE_SUFFIXES = frozenset(suffix for suffix in EOMI_SUFFIXES if len(suffix) >= 2)
+
+
+def _is_hangul_syllable(char):
+    return '가' <= char <= '힣'
+
+
+class HangulSuffixStripper:
+    """조사/어미 접미사 트라이 기반 어간 추출 (표면형 -> 후보 어간은 LRU로 메모)
+    
+    두 글자 이상 하다/되다 계열 어미는 바로 떼고, 조사와 한 글자 어미는 남는 어간이 같은 문서의
+    어휘에 있을 때만 뗀다 ('효과', '우크라이나' 유지, '방음벽과' -> '방음벽'). 어휘에는 단독으로
+    나온 단어와, 서로 다른 두 표면형 이상의 공통 후보 어간('방음벽에서', '방음벽의')이 포함된다.
+    """
+    
+    def __init__(self, suffixes=KOREAN_SUFFIXES, min_stem=2, cache_size=65536,
+                 free_suffixes=FREE_SUFFIXES):
+        self.min_stem = min_stem
+        self.free_suffixes = free_suffixes
+        # 뒤에서부터 읽는 트라이: 글자 -> 자식 노드, None 키는 접미사 끝 표시
+        self._trie = {}
+        for suffix in suffixes:
+            node = self._trie
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            node[None] = True
+        self._candidates = lru_cache(maxsize=cache_size)(self._compute_candidates)
+    
+    def _compute_candidates(self, word):
+        """(어간, 접미사 길이) 후보 - 긴 접미사 우선"""
+        if not _is_hangul_syllable(word[-1]):
+            return ()
+        candidates = []
+        node = self._trie
+        for length in range(1, len(word) - self.min_stem + 1):
+            node = node.get(word[-length])
+            if node is None:
+                break
+            if None in node:
+                stem = word[:-length]
+                if all(_is_hangul_syllable(c) for c in stem[-1:]):
+                    candidates.append((stem, length))
+        candidates.reverse()
+        return tuple(candidates)
+    
+    def stem(self, word, vocabulary=None):
+        """표면형의 어간 (vocabulary가 있으면 조사/한 글자 어미 판단에 사용)"""
+        for stem, length in self._candidates(word):
+            if word[-length:] in self.free_suffixes or (vocabulary is not None and stem in vocabulary):
+                return stem
+        return word
+    
+    def vocabulary(self, words):
+        """어간 확인용 어휘: 표면형 + 두 개 이상의 표면형이 공유하는 후보 어간"""
+        seen = Counter()
+        for word in words:
+            for stem in {stem for stem, _ in self._candidates(word)}:
+                seen[stem] += 1
+        return set(words) | {stem for stem, count in seen.items() if count >= 2}
+    
+    def collapse(self, counter):
+        """같은 어간의 변이형 빈도를 합침"""
+        vocabulary = self.vocabulary(counter.keys())
+        collapsed = Counter()
+        for word, count in counter.items():
+            collapsed[self.stem(word, vocabulary)] += count
+        return collapsed
+    
+    def cache_info(self):
+        return self._candidates.cache_info()
+
+
+class TokenizerEngine:
+    """불용어 집합과 토큰 정규식을 재사용하는 단어 빈도 계산기"""
+    
+    def __init__(self, user_store=None, base_stopwords=DEFAULT_STOPWORDS, normalizer=None):
+        self.user_store = user_store
+        self.base_stopwords = base_stopwords
+        self.normalizer = normalizer
+        self._merged_lock = threading.Lock()
+        self._merged_key = None
+        self._merged = base_stopwords
+    
+    def stopwords(self, extra=frozenset()):
+        """기본 + 저장된 사용자 + 요청별 불용어"""
+        user = self.user_store.get() if self.user_store is not None else frozenset()
+        with self._merged_lock:
+            # 사용자 불용어가 바뀌었을 때만 합집합을 다시 만듦
+            if self._merged_key is not user:
+                self._merged = self.base_stopwords | user
+                self._merged_key = user
+            merged = self._merged
+        return merged | extra if extra else merged
+    
+    def count_words(self, text, extra_stopwords=frozenset()):
+        """단어 빈도 계산 - 텍스트(str) 또는 텍스트 조각 iterable을 받음"""
+        # 1단계: 공백 기준 원시 토큰 빈도 (str.split + Counter 모두 C 구현)
+        raw = Counter()
+        chunks = (text,) if isinstance(text, str) else text
+        for piece in chunks:
+            for chunk in _iter_chunks(piece):
+                raw.update(chunk.split())
+        
+        # 2단계: 고유 원시 토큰마다 한 번만 소문자화 + 정규식 적용 후 빈도 합산
+        counter = Counter()
+        findall = TOKEN_PATTERN.findall
+        for token, count in raw.items():
+            for word in findall(token.lower()):
+                counter[word] += count
+        
+        # 조사/어미 변이형을 어간으로 합친 뒤 불용어 검사 (고유 단어 단위라 비용이 작음)
+        if self.normalizer is not None:
+            counter = self.normalizer.collapse(counter)
+        
+        # 불용어/숫자 제거는 토큰마다가 아니라 고유 단어 목록에서 한 번만
+        stopwords = self.stopwords(extra_stopwords)
+        for word in [w for w in counter if w in stopwords or w.isdigit()]:
+            del counter[word]
+        return counter
+
+
+# PDF 추출 한도 (35MB 업로드가 워커를 몇 분씩 잡고 있지 않도록)
+PDF_MAX_PAGES = int(os.environ.get('WORDCLOUD_PDF_MAX_PAGES', 500))
+PDF_TIME_BUDGET = float(os.environ.get('WORDCLOUD_PDF_TIME_BUDGET', 30))
+PDF_WORKERS = int(os.environ.get('WORDCLOUD_PDF_WORKERS', os.cpu_count() or 1))
+# 이보다 페이지가 적으면 프로세스 풀을 쓰지 않음 (풀 왕복 비용이 더 큼)
+PDF_PARALLEL_MIN_PAGES = 16
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool():
+    """PDF 페이지 추출용 프로세스 풀 (멀티스레드 서버에서 fork하지 않도록 spawn 사용)
+    
+    spawn 워커는 서버 스크립트를 __mp_main__으로 다시 import하므로, 서버 모듈은 import 시점에
+    캐시 예열이나 싱글턴 생성을 하지 않아야 한다 (flask_wordcloud.init_services 참고).
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _pdf_pool
+
+
+def _reset_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_range(path, start, stop, deadline):
+    """워커 프로세스: [start, stop) 페이지 텍스트 (deadline 이후 페이지는 건너뜀)"""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(path)
+    texts = []
+    for index in range(start, stop):
+        if time.time() > deadline:
+            break
+        texts.append(reader.pages[index].extract_text() or '')
+    return texts
+
+
+class PdfTextStream:
+    """PDF 페이지 텍스트를 순서대로 내보내는 iterable (TokenizerEngine.count_words에 바로 전달)
+    
+    큰 PDF는 페이지 구간을 프로세스 풀에 나눠 추출하고, 페이지 수/시간 한도를 넘으면 중단한다.
+    반복이 끝난 뒤 pages_read, chars, truncated로 결과를 확인할 수 있다.
+    """
+    
+    def __init__(self, file, max_pages=PDF_MAX_PAGES, time_budget=PDF_TIME_BUDGET,
+                 workers=PDF_WORKERS):
+        self.file = file
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.workers = workers
+        self.pages_total = 0
+        self.pages_read = 0
+        self.chars = 0
+        self.truncated = False
+        # 페이지 한도가 아니라 시간 한도로 잘렸는지 (결과가 실행마다 달라질 수 있음)
+        self.timed_out = False
+    
+    def __iter__(self):
+        import PyPDF2
+        
+        deadline = time.time() + self.time_budget
+        try:
+            reader = PyPDF2.PdfReader(self.file)
+            self.pages_total = len(reader.pages)
+        except Exception as e:
+            raise Exception(f"PDF 파일을 처리할 수 없습니다: {str(e)}")
+        
+        limit = min(self.pages_total, self.max_pages) if self.max_pages else self.pages_total
+        if self.workers > 1 and limit >= PDF_PARALLEL_MIN_PAGES:
+            pages = self._parallel_pages(limit, deadline)
+        else:
+            pages = self._serial_pages(reader, 0, limit, deadline)
+        
+        for text in pages:
+            self.pages_read += 1
+            self.chars += len(text)
+            yield text
+        
+        if self.pages_read < self.pages_total:
+            self.truncated = True
+            self.timed_out = self.pages_read < limit
+            print(f"PDF 추출 중단: {self.pages_read}/{self.pages_total} 페이지 "
+                  f"(최대 {self.max_pages}페이지, {self.time_budget:.0f}초 한도)")
+    
+    def _serial_pages(self, reader, start, stop, deadline):
+        for index in range(start, stop):
+            if time.time() > deadline:
+                return
+            try:
+                yield reader.pages[index].extract_text() or ''
+            except Exception as e:
+                raise Exception(f"PDF 파일을 처리할 수 없습니다: {str(e)}")
+    
+    def _parallel_pages(self, limit, deadline):
+        # 워커는 파일 경로로 PDF를 다시 열기 때문에 업로드 스트림을 임시 파일로 복사
+        fd, path = tempfile.mkstemp(suffix='.pdf')
+        futures = []
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if hasattr(self.file, 'seek'):
+                    self.file.seek(0)
+                shutil.copyfileobj(self.file, out)
+            
+            batch = max(4, -(-limit // (self.workers * 4)))
+            pool = _get_pdf_pool()
+            futures = [pool.submit(_extract_page_range, path, start, min(start + batch, limit), deadline)
+                       for start in range(0, limit, batch)]
+            
+            next_page = 0
+            for future in futures:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    texts = future.result(timeout=remaining)
+                except BrokenProcessPool:
+                    # 워커가 죽으면 풀을 새로 만들고 남은 페이지는 현재 프로세스에서 처리
+                    _reset_pdf_pool()
+                    import PyPDF2
+                    yield from self._serial_pages(PyPDF2.PdfReader(path), next_page, limit, deadline)
+                    return
+                except FutureTimeoutError:
+                    return
+                yield from texts
+                next_page += len(texts)
+                if len(texts) < batch and next_page < limit:
+                    return  # 워커 쪽에서 시간 한도 도달
+        finally:
+            for future in futures:
+                future.cancel()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _legacy_count(text, stopwords):
+    """기존 process_text 방식 (벤치마크 비교용)"""
+    words = re.sub(r'[^\w\s가-힣]', ' ', text.lower()).split()
+    return Counter(w for w in words if len(w) >= 2 and w not in stopwords and not w.isdigit())
+
+
+def benchmark(text, repeat=3):
+    """기존 방식 대비 토큰화 처리량 비교 (+ 어간 정규화 적용 시 어휘 크기)"""
+    engine = TokenizerEngine()
+    stemming_engine = TokenizerEngine(normalizer=HangulSuffixStripper())
+    results = {}
+    for name, run in (
+        ('legacy', lambda: _legacy_count(text, set(KOREAN_STOPWORDS) | set(ENGLISH_STOPWORDS))),
+        ('engine', lambda: engine.count_words(text)),
+        ('engine+stem', lambda: stemming_engine.count_words(text)),
+    ):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            counter = run()
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results[name] = {
+            'seconds': round(best, 4),
+            'mb_per_second': round(len(text.encode('utf-8')) / (1024 * 1024) / best, 2),
+            'unique_words': len(counter),
+        }
+    if results['legacy']['unique_words'] != results['engine']['unique_words']:
+        print("⚠️ 기존 방식과 단어 수가 다릅니다")
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+    
+    if len(sys.argv) < 2:
+        print("사용법: python wordcloud_text.py <텍스트 또는 PDF 파일>")
+        sys.exit(1)
+    
+    path = sys.argv[1]
+    if path.lower().endswith('.pdf'):
+        import PyPDF2
+        with open(path, 'rb') as f:
+            sample = ' '.join(page.extract_text() or '' for page in PyPDF2.PdfReader(f).pages)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            sample = f.read()
+    
+    print(f"텍스트 크기: {len(sample.encode('utf-8')) / (1024 * 1024):.2f} MB")
+    for name, result in benchmark(sample).items():
+        print(f"   • {name}: {result['seconds']:.3f}초, {result['mb_per_second']} MB/s, "
+              f"고유 단어 {result['unique_words']:,}개")